@@ -0,0 +1,116 @@
+# Process-local caches for authenticated identity.
+# get_current_user resolves the same token and user on every request, these caches keep the
+# decoded token payload (until its exp) and a snapshot of the user row so steady-state
+# requests skip both the JWT verification and the users query.
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS, TOKEN_CACHE_SIZE
+from app.models.models import User
+
+_MISSING = object()
+
+# Thread-safe LRU cache where each entry also has a deadline
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Return the cached value or default, expired entries count as misses
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] <= now:
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    # Store a value, ttl overrides the cache default for this entry
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
+
+# Resolved users keyed by id, values are column snapshots rather than session-bound objects
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS)
+
+# Verified token payloads keyed by the raw token, each entry lives until the token's exp
+token_cache = TTLCache(TOKEN_CACHE_SIZE, 0)
+
+_USER_COLUMNS = tuple(c.key for c in User.__table__.columns)
+
+# Cached payload for a token that was already verified
+def get_cached_token_payload(token: str) -> Optional[Dict[str, Any]]:
+    return token_cache.get(token)
+
+# Remember a verified payload until the token expires
+def cache_token_payload(token: str, payload: Dict[str, Any]):
+    exp = payload.get("exp")
+    if exp is None:
+        return
+    token_cache.set(token, payload, ttl=float(exp) - time.time())
+
+# Cached column snapshot of a user
+def get_cached_user(user_id: int) -> Optional[Dict[str, Any]]:
+    return user_cache.get(int(user_id))
+
+# Store a column snapshot of a loaded user
+def cache_user(user: User):
+    user_cache.set(user.id, {key: getattr(user, key) for key in _USER_COLUMNS})
+
+# Build a detached User from a snapshot, ready for session.merge(user, load=False)
+def user_from_snapshot(snapshot: Dict[str, Any]) -> User:
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+# Invalidation hook, call from every CRUD path that changes or removes a user
+def invalidate_user(user_id: int):
+    user_cache.pop(int(user_id))
+
+# Hit/miss counters for both caches
+def identity_cache_stats() -> dict:
+    return {"users": user_cache.stats(), "tokens": token_cache.stats()}
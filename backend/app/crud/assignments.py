@@ -0,0 +1,91 @@
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import cast, exists, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.models.models import UserTeams, Workout, Test, GroupWorkout, GroupTest, RoleEnum
+from app.services.leaderboards import leaderboards
+
+# Sorted IDs of the athletes of a group
+def group_athlete_ids(db: Session, group_id: int) -> List[int]:
+    rows = db.execute(
+        select(UserTeams.user_id)
+        .where(UserTeams.group_id == group_id, UserTeams.role == RoleEnum.athlete)
+        .distinct()
+        .order_by(UserTeams.user_id)
+    )
+    return list(rows.scalars())
+
+# Template value for the SELECT list. Postgres resolves untyped parameters in a select list as
+# text, so they are cast to the column type there; SQLite would mangle CAST AS JSON/DATETIME.
+def typed_literal(db: Session, value, type_):
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(literal(value, type_), type_)
+    return literal(value, type_)
+
+# Distinct athletes of the group as a subquery, optionally limited to a user_id range
+def _athletes(group_id: int, user_range: Optional[Sequence[int]]):
+    query = select(UserTeams.user_id).where(UserTeams.group_id == group_id, UserTeams.role == RoleEnum.athlete)
+    if user_range is not None:
+        query = query.where(UserTeams.user_id.between(user_range[0], user_range[1]))
+    return query.distinct().subquery()
+
+# Lock the template row until commit, so concurrent assignments of one template (e.g. a retry
+# while its background job is still running) take turns and each sees the other's copies
+def _lock_template(db: Session, model, template_id: int):
+    db.execute(select(model.id).where(model.id == template_id).with_for_update())
+
+# Copy a GroupWorkout to every athlete of its group with one INSERT ... SELECT from user_teams.
+# An assignment gives each athlete one copy of the template: assigning it again only reaches
+# athletes without a copy yet (e.g. who joined the group since), so retrying an assignment or
+# resuming its chunks never duplicates rows. Returns the rows created.
+def assign_group_workout(db: Session, group_workout: GroupWorkout, user_range: Optional[Sequence[int]] = None) -> int:
+    _lock_template(db, GroupWorkout, group_workout.id)
+    athletes = _athletes(group_workout.group_id, user_range)
+    source = select(
+        athletes.c.user_id,
+        typed_literal(db, group_workout.id, Workout.group_workout_id.type),
+        typed_literal(db, group_workout.title, Workout.title.type),
+        typed_literal(db, group_workout.description, Workout.description.type),
+        typed_literal(db, group_workout.exercises, Workout.exercises.type),
+        typed_literal(db, group_workout.start_date, Workout.start_date.type),
+        typed_literal(db, group_workout.end_date, Workout.end_date.type),
+        typed_literal(db, datetime.now(), Workout.created_at.type),
+    ).where(
+        ~exists().where(Workout.user_id == athletes.c.user_id, Workout.group_workout_id == group_workout.id)
+    )
+    result = db.execute(
+        insert(Workout).from_select(
+            ["user_id", "group_workout_id", "title", "description", "exercises", "start_date", "end_date", "created_at"],
+            source,
+        )
+    )
+    db.commit()
+    return result.rowcount or 0
+
+# Copy a GroupTest to every athlete of its group with one INSERT ... SELECT from user_teams. Like
+# assign_group_workout, each athlete gets one copy and a repeated assignment only reaches athletes
+# without one. Returns the rows created.
+def assign_group_test(db: Session, group_test: GroupTest, user_range: Optional[Sequence[int]] = None) -> int:
+    _lock_template(db, GroupTest, group_test.id)
+    athletes = _athletes(group_test.group_id, user_range)
+    source = select(
+        athletes.c.user_id,
+        typed_literal(db, group_test.id, Test.group_test_id.type),
+        typed_literal(db, group_test.title, Test.title.type),
+        typed_literal(db, group_test.instructions, Test.instructions.type),
+        typed_literal(db, group_test.parameters, Test.parameters.type),
+        typed_literal(db, datetime.now(), Test.created_at.type),
+    ).where(
+        ~exists().where(Test.user_id == athletes.c.user_id, Test.group_test_id == group_test.id)
+    )
+    result = db.execute(
+        insert(Test).from_select(
+            ["user_id", "group_test_id", "title", "instructions", "parameters", "created_at"],
+            source,
+        )
+    )
+    db.commit()
+    leaderboards.invalidate_group_test(group_test.id)
+    return result.rowcount or 0
@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.models.models import JournalEntry
+from app.pagination import paginate
+from app.services.archive import ensure_range
+from app.schemas.journal import JournalEntryCreate
+from app.services.journal_search import index_entry, search_journal
+
+# Length of the text preview returned by the timeline view
+JOURNAL_PREVIEW_CHARS = 200
+
+# One page of a user's journal entries, newest first. summary=True only returns a preview of the text
+def list_journal_entries(
+    db: Session,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    summary: bool = False,
+) -> dict:
+    ensure_range(db, JournalEntry, user_id, since, until)
+    if summary:
+        query = select(
+            JournalEntry.id,
+            JournalEntry.user_id,
+            func.substr(JournalEntry.entry, 1, JOURNAL_PREVIEW_CHARS).label("preview"),
+            JournalEntry.created_at,
+        ).where(JournalEntry.user_id == user_id)
+    else:
+        query = select(JournalEntry).where(JournalEntry.user_id == user_id)
+    return paginate(db, query, JournalEntry, cursor, limit, since, until, scalars=not summary)
+
+# One page of a user's journal entries matching q, rehydrating the archived months since/until
+# reaches into first, like list_journal_entries
+def find_journal_entries(
+    db: Session,
+    user_id: int,
+    q: str,
+    order: str = "rank",
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> dict:
+    ensure_range(db, JournalEntry, user_id, since, until)
+    return search_journal(db, user_id, q, order, cursor, limit, since, until)
+
+# Write a journal entry for a user and add it to the search index
+def create_journal_entry(db: Session, user_id: int, entry_in: JournalEntryCreate) -> JournalEntry:
+    entry = JournalEntry(user_id=user_id, entry=entry_in.entry)
+    db.add(entry)
+    db.commit()
+    db.refresh(entry)
+    index_entry(entry)
+    return entry
@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.models import MoodCheckIn, ObservationSourceEnum
+from app.pagination import paginate
+from app.services.archive import ensure_range
+from app.schemas.mood import MoodCheckInCreate
+from app.services.observations import extract_mood, replace_observations
+
+# One page of a user's mood check-ins, newest first
+def list_mood_checkins(
+    db: Session,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> dict:
+    ensure_range(db, MoodCheckIn, user_id, since, until)
+    query = select(MoodCheckIn).where(MoodCheckIn.user_id == user_id)
+    return paginate(db, query, MoodCheckIn, cursor, limit, since, until)
+
+# Store a mood check-in for a user together with its observations
+def create_mood_checkin(db: Session, user_id: int, checkin_in: MoodCheckInCreate) -> MoodCheckIn:
+    checkin = MoodCheckIn(user_id=user_id, mood=checkin_in.mood)
+    db.add(checkin)
+    db.flush()
+    replace_observations(
+        db,
+        ObservationSourceEnum.mood,
+        [],
+        extract_mood(user_id, checkin.id, checkin.created_at, checkin.mood),
+    )
+    db.commit()
+    db.refresh(checkin)
+    return checkin
@@ -0,0 +1,158 @@
+import logging
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import REFRESH_TOKEN_EXPIRE_DAYS
+from app.models.models import RefreshToken
+from app.utils import new_refresh_token, hash_refresh_token
+
+logger = logging.getLogger("app.auth")
+
+# Statements shared by the sync and async functions below
+
+# A new token and its row, family_id is None for a fresh login
+def _new_token(user_id: int, family_id: Optional[str], now: datetime) -> Tuple[str, dict]:
+    token = new_refresh_token()
+    return token, {
+        "user_id": user_id,
+        "family_id": family_id or secrets.token_hex(16),
+        "token_hash": hash_refresh_token(token),
+        "created_at": now,
+        "expires_at": now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    }
+
+def _purge_expired(user_id: int, now: datetime):
+    return delete(RefreshToken).where(RefreshToken.user_id == user_id, RefreshToken.expires_at <= now)
+
+# Revoke a live token in one statement, so of two concurrent refreshes with the same token only
+# one gets a row back
+def _claim(token_hash: str, now: datetime):
+    return (
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(revoked_at=now)
+        .returning(RefreshToken.user_id, RefreshToken.family_id)
+        .execution_options(synchronize_session=False)
+    )
+
+# Family of a token that was already revoked, i.e. a replayed token
+def _revoked_family(token_hash: str):
+    return select(RefreshToken.family_id).where(
+        RefreshToken.token_hash == token_hash, RefreshToken.revoked_at.is_not(None)
+    )
+
+def _family_of(token_hash: str):
+    return select(RefreshToken.family_id).where(RefreshToken.token_hash == token_hash)
+
+def _revoke_family(family_id: str, now: datetime):
+    return (
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+def _revoke_user(user_id: int, now: datetime):
+    return (
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+def _log_reuse(family_id: str):
+    logger.warning("revoked refresh token presented, revoked token family %s", family_id)
+
+# Start a new token family for a user who just logged in, dropping their expired tokens
+def issue_refresh_token(db: Session, user_id: int) -> str:
+    now = datetime.now()
+    token, row = _new_token(user_id, None, now)
+    db.execute(_purge_expired(user_id, now))
+    db.execute(insert(RefreshToken), [row])
+    db.commit()
+    return token
+
+# Exchange a refresh token for its successor. Returns (user_id, new token), or None when the
+# token is unknown, expired or revoked. A token that was already rotated revokes its family.
+def rotate_refresh_token(db: Session, token: str) -> Optional[Tuple[int, str]]:
+    now = datetime.now()
+    token_hash = hash_refresh_token(token)
+    claimed = db.execute(_claim(token_hash, now)).first()
+    if claimed is None:
+        family_id = db.scalar(_revoked_family(token_hash))
+        if family_id is not None:
+            db.execute(_revoke_family(family_id, now))
+            db.commit()
+            _log_reuse(family_id)
+        else:
+            db.rollback()
+        return None
+    new_token, row = _new_token(claimed.user_id, claimed.family_id, now)
+    db.execute(insert(RefreshToken), [row])
+    db.commit()
+    return claimed.user_id, new_token
+
+# Log out one device: revoke the family of the given token. False when the token is unknown.
+def revoke_refresh_token(db: Session, token: str) -> bool:
+    family_id = db.scalar(_family_of(hash_refresh_token(token)))
+    if family_id is None:
+        return False
+    db.execute(_revoke_family(family_id, datetime.now()))
+    db.commit()
+    return True
+
+# Log out everywhere: revoke every live refresh token of a user
+def revoke_user_refresh_tokens(db: Session, user_id: int) -> int:
+    revoked = db.execute(_revoke_user(user_id, datetime.now())).rowcount
+    db.commit()
+    return revoked
+
+# Async counterparts of the functions above, used when DB_MODE=async
+
+async def issue_refresh_token_async(db: AsyncSession, user_id: int) -> str:
+    now = datetime.now()
+    token, row = _new_token(user_id, None, now)
+    await db.execute(_purge_expired(user_id, now))
+    await db.execute(insert(RefreshToken), [row])
+    await db.commit()
+    return token
+
+async def rotate_refresh_token_async(db: AsyncSession, token: str) -> Optional[Tuple[int, str]]:
+    now = datetime.now()
+    token_hash = hash_refresh_token(token)
+    claimed = (await db.execute(_claim(token_hash, now))).first()
+    if claimed is None:
+        family_id = await db.scalar(_revoked_family(token_hash))
+        if family_id is not None:
+            await db.execute(_revoke_family(family_id, now))
+            await db.commit()
+            _log_reuse(family_id)
+        else:
+            await db.rollback()
+        return None
+    new_token, row = _new_token(claimed.user_id, claimed.family_id, now)
+    await db.execute(insert(RefreshToken), [row])
+    await db.commit()
+    return claimed.user_id, new_token
+
+async def revoke_refresh_token_async(db: AsyncSession, token: str) -> bool:
+    family_id = await db.scalar(_family_of(hash_refresh_token(token)))
+    if family_id is None:
+        return False
+    await db.execute(_revoke_family(family_id, datetime.now()))
+    await db.commit()
+    return True
+
+async def revoke_user_refresh_tokens_async(db: AsyncSession, user_id: int) -> int:
+    revoked = (await db.execute(_revoke_user(user_id, datetime.now()))).rowcount
+    await db.commit()
+    return revoked
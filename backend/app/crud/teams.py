@@ -0,0 +1,62 @@
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload, joinedload
+
+from app.models.models import UserTeams, Team, RoleEnum
+
+# IDs of the athletes that belong to a group
+def get_group_athlete_ids(db: Session, group_id: int) -> List[int]:
+    rows = db.execute(
+        select(UserTeams.user_id)
+        .where(UserTeams.group_id == group_id, UserTeams.role == RoleEnum.athlete)
+        .distinct()
+    )
+    return list(rows.scalars())
+
+# Load a team with its groups and every membership with its user in a fixed number of queries:
+# the team, its groups (selectin) and user_teams joined to users (selectin + joined).
+# The association proxies (Team.users, Group.users) are not used because they lazy load per row.
+def get_team_with_members(db: Session, team_id: int) -> Optional[Team]:
+    return db.execute(
+        select(Team)
+        .where(Team.id == team_id)
+        .options(
+            selectinload(Team.groups),
+            selectinload(Team.user_teams).joinedload(UserTeams.user),
+        )
+    ).scalar_one_or_none()
+
+def _member(membership: UserTeams) -> dict:
+    return {
+        "user_id": membership.user_id,
+        "name": membership.user.name,
+        "email": membership.user.email,
+        "role": membership.role,
+        "is_team_admin": bool(membership.is_team_admin),
+        "joined_at": membership.joined_at,
+    }
+
+# Roster of a team: groups with their members plus memberships without a group, None if no such team
+def get_team_roster(db: Session, team_id: int) -> Optional[dict]:
+    team = get_team_with_members(db, team_id)
+    if team is None:
+        return None
+
+    members_by_group = {group.id: [] for group in team.groups}
+    unassigned = []
+    for membership in team.user_teams:
+        target = members_by_group.get(membership.group_id) if membership.group_id is not None else unassigned
+        if target is not None:
+            target.append(_member(membership))
+
+    return {
+        "id": team.id,
+        "name": team.name,
+        "city": team.city,
+        "groups": [
+            {"id": group.id, "name": group.name, "members": members_by_group[group.id]}
+            for group in sorted(team.groups, key=lambda g: g.name)
+        ],
+        "unassigned": unassigned,
+    }
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.models import Test, ObservationSourceEnum
+from app.schemas.test import TestResult
+from app.services.observations import extract_test, replace_observations
+
+# Retrieve a test by ID
+def get_test(db: Session, test_id: int) -> Optional[Test]:
+    return db.get(Test, test_id)
+
+# Store the results of a taken test, replacing any earlier results and their observations
+def record_test_result(db: Session, test: Test, result_in: TestResult) -> Test:
+    test.taken_at = result_in.taken_at
+    test.results = result_in.model_dump(mode="json")["results"]
+    replace_observations(
+        db,
+        ObservationSourceEnum.test,
+        [test.id],
+        extract_test(test.user_id, test.id, test.taken_at, test.parameters, test.results),
+    )
+    db.commit()
+    db.refresh(test)
+    return test
@@ -1,9 +1,17 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.models.models import User
+from app.cache import invalidate_user
 from app.schemas.user import UserCreate
-from app.utils import hash_password, verify_password
+from app.hashing import (
+    hash_password_pooled,
+    verify_password_pooled,
+    hash_password_async,
+    verify_password_async,
+)
 
 # Retrieve a user by email
 def get_user_by_email(db: Session, email: str):
@@ -13,7 +21,7 @@ def get_user_by_email(db: Session, email: str):
 def get_user_by_id(db: Session, id: int):
     return db.query(User).filter(User.id == id).first()
 
-# Create a new user, ensuring email uniqueness and password hashing
+# Create a new user, ensuring email uniqueness and password hashing (bcrypt runs in the hashing pool)
 def create_user(db: Session, user_in: UserCreate) -> User:
     existing = get_user_by_email(db, user_in.email)
     if existing:
@@ -25,12 +33,13 @@ def create_user(db: Session, user_in: UserCreate) -> User:
     db_user = User(
         name=user_in.name,
         email=user_in.email,
-        password_hash=hash_password(user_in.password),
+        password_hash=hash_password_pooled(user_in.password),
     )
 
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    invalidate_user(db_user.id)
     return db_user
 
 # Authenticate a user by verifying email and password, pylance type checking gives an error, but everything works fine, so ignore it
@@ -38,6 +47,47 @@ def authenticate_user(db: Session, email: str, password: str):
     user = get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.password_hash): # type: ignore
+    if not verify_password_pooled(password, user.password_hash): # type: ignore
+        return None
+    return user
+
+# Async counterparts of the functions above, used when DB_MODE=async
+
+# Retrieve a user by email
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email).limit(1))
+    return result.scalars().first()
+
+# Retrieve a user by ID
+async def get_user_by_id_async(db: AsyncSession, id: int):
+    return await db.get(User, int(id))
+
+# Create a new user, ensuring email uniqueness and password hashing
+async def create_user_async(db: AsyncSession, user_in: UserCreate) -> User:
+    existing = await get_user_by_email_async(db, user_in.email)
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        )
+
+    db_user = User(
+        name=user_in.name,
+        email=user_in.email,
+        password_hash=await hash_password_async(user_in.password),
+    )
+
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    invalidate_user(db_user.id)
+    return db_user
+
+# Authenticate a user by verifying email and password
+async def authenticate_user_async(db: AsyncSession, email: str, password: str):
+    user = await get_user_by_email_async(db, email)
+    if not user:
+        return None
+    if not await verify_password_async(password, user.password_hash): # type: ignore
         return None
     return user
@@ -0,0 +1,159 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, null, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.models import Workout, WorkoutChange, GroupWorkout, ObservationSourceEnum
+from app.crud.assignments import typed_literal
+from app.pagination import paginate
+from app.services.archive import ensure_range
+from app.schemas.workout import WorkoutCreate, UpdateLogEntry
+from app.services.observations import extract_workout, replace_observations
+
+# Turn a validated WorkoutCreate into a row for a Core insert, nested models become plain JSON.
+# "update_log" is not a column, _insert_rows() turns it into WorkoutChange rows.
+def workout_row(user_id: int, workout_in: WorkoutCreate) -> dict:
+    json_fields = workout_in.model_dump(mode="json", include={"exercises", "results", "update_log"})
+    now = datetime.now()
+    return {
+        "user_id": user_id,
+        "group_workout_id": workout_in.group_workout_id,
+        "title": workout_in.title,
+        "description": workout_in.description,
+        "start_date": workout_in.start_date or now,
+        "end_date": workout_in.end_date,
+        "exercises": json_fields["exercises"],
+        "results": json_fields.get("results"),
+        "update_log": json_fields.get("update_log"),
+        "created_at": now,
+    }
+
+# Group of each existing GroupWorkout among the given ids, unknown ids are left out
+def group_workout_groups(db: Session, group_workout_ids: Iterable[int]) -> Dict[int, int]:
+    ids = set(group_workout_ids)
+    if not ids:
+        return {}
+    return dict(db.execute(select(GroupWorkout.id, GroupWorkout.group_id).where(GroupWorkout.id.in_(ids))).all())
+
+# Change log rows for the update_log entries of a new workout
+def _change_rows(workout_id: int, row: dict) -> List[dict]:
+    return [
+        {
+            "workout_id": workout_id,
+            "user_id": row["user_id"],
+            "at": datetime.fromisoformat(entry["at"]),
+            "change": entry["change"],
+            "meta": entry.get("meta"),
+            "created_at": row["created_at"],
+        }
+        for entry in row.get("update_log") or []
+    ]
+
+# Insert workout rows, their change log and metric observations, ids come back in parameter order
+def _insert_rows(db: Session, rows: List[dict]):
+    params = [{key: value for key, value in row.items() if key != "update_log"} for row in rows]
+    ids = db.scalars(insert(Workout).returning(Workout.id, sort_by_parameter_order=True), params).all()
+    observations = []
+    changes = []
+    for workout_id, row in zip(ids, rows):
+        observations.extend(
+            extract_workout(row["user_id"], workout_id, row["start_date"], row["exercises"], row["results"], row["group_workout_id"])
+        )
+        changes.extend(_change_rows(workout_id, row))
+    if changes:
+        db.execute(insert(WorkoutChange), changes)
+    replace_observations(db, ObservationSourceEnum.workout, [], observations)
+
+# Insert a batch of workout rows in one transaction using a multi-row INSERT.
+# If the batch is rejected (e.g. an unknown group_workout_id), rows are retried one by one
+# inside savepoints so only the offending rows fail. Returns (inserted, [(index, message)]).
+def insert_workouts_batch(db: Session, rows: List[dict]) -> Tuple[int, List[Tuple[int, str]]]:
+    if not rows:
+        return 0, []
+    try:
+        _insert_rows(db, rows)
+        db.commit()
+        return len(rows), []
+    except SQLAlchemyError:
+        db.rollback()
+
+    inserted = 0
+    failures = []
+    for index, row in enumerate(rows):
+        try:
+            with db.begin_nested():
+                _insert_rows(db, [row])
+            inserted += 1
+        except SQLAlchemyError as exc:
+            failures.append((index, str(getattr(exc, "orig", exc)).strip()))
+    db.commit()
+    return inserted, failures
+
+# Columns of the timeline view, everything except the heavy JSON
+WORKOUT_SUMMARY_COLUMNS = (
+    Workout.id,
+    Workout.user_id,
+    Workout.group_workout_id,
+    Workout.title,
+    Workout.start_date,
+    Workout.end_date,
+    Workout.created_at,
+)
+
+# One page of a user's workouts, newest first. summary=True skips the exercises/results JSON
+def list_workouts(
+    db: Session,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    summary: bool = False,
+) -> dict:
+    ensure_range(db, Workout, user_id, since, until)
+    if summary:
+        query = select(*WORKOUT_SUMMARY_COLUMNS).where(Workout.user_id == user_id)
+    else:
+        query = select(Workout).where(Workout.user_id == user_id)
+    return paginate(db, query, Workout, cursor, limit, since, until, scalars=not summary)
+
+# Append one entry to the change log of a user's workout in a single INSERT ... SELECT, which
+# also checks ownership. Returns the stored row, or None when the workout does not exist or
+# belongs to someone else.
+def record_workout_change(db: Session, user_id: int, workout_id: int, entry: UpdateLogEntry):
+    now = datetime.now()
+    source = select(
+        Workout.id,
+        Workout.user_id,
+        typed_literal(db, entry.at, WorkoutChange.at.type),
+        typed_literal(db, entry.change, WorkoutChange.change.type),
+        typed_literal(db, entry.meta, WorkoutChange.meta.type) if entry.meta is not None else null(),
+        typed_literal(db, now, WorkoutChange.created_at.type),
+    ).where(Workout.id == workout_id, Workout.user_id == user_id)
+    change = db.execute(
+        insert(WorkoutChange)
+        .from_select(["workout_id", "user_id", "at", "change", "meta", "created_at"], source)
+        .returning(
+            WorkoutChange.id,
+            WorkoutChange.workout_id,
+            WorkoutChange.at,
+            WorkoutChange.change,
+            WorkoutChange.meta,
+            WorkoutChange.created_at,
+        )
+    ).first()
+    db.commit()
+    return change
+
+# One page of a workout's change log, newest first, only for the workout's owner
+def list_workout_changes(
+    db: Session,
+    user_id: int,
+    workout_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> dict:
+    query = select(WorkoutChange).where(WorkoutChange.workout_id == workout_id, WorkoutChange.user_id == user_id)
+    return paginate(db, query, WorkoutChange, cursor, limit)
@@ -1,31 +1,80 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.crud.users import get_user_by_id
+from app.config import DB_MODE
+from app.database import get_db, get_async_db
+from app.crud.users import get_user_by_id, get_user_by_id_async
+from app.cache import (
+    get_cached_token_payload,
+    cache_token_payload,
+    get_cached_user,
+    cache_user,
+    user_from_snapshot,
+)
 from app.utils import decode_access_token
+from app.metrics import timed
 
 # OAuth2 scheme for extracting bearer token from requests
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-# Dependency to get the current authenticated user from the token
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
-    cred_exc = HTTPException(
+# Exception raised for any token or identity failure
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = decode_access_token(token)
-    except Exception:
-        raise cred_exc
+
+# Decode the token and return the user id from its "sub" claim, verified payloads are cached until exp
+def token_subject(token: str):
+    payload = get_cached_token_payload(token)
+    if payload is None:
+        try:
+            with timed("decode_access_token"):
+                payload = decode_access_token(token)
+        except Exception:
+            raise _credentials_exception()
+        cache_token_payload(token, payload)
 
     sub = payload.get("sub")
     if not sub:
-        raise cred_exc
+        raise _credentials_exception()
+    try:
+        return int(sub)
+    except (TypeError, ValueError):
+        raise _credentials_exception()
 
-    user = get_user_by_id(db, sub)
+# Dependency to get the current authenticated user from the token. The user id is kept on
+# request.state so the session layer can apply read-your-writes stickiness.
+def get_current_user_sync(request: Request, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+    user_id = token_subject(token)
+    request.state.user_id = user_id
+    snapshot = get_cached_user(user_id)
+    if snapshot is not None:
+        # Attach the cached row to this session without a round-trip
+        return db.merge(user_from_snapshot(snapshot), load=False)
+
+    user = get_user_by_id(db, user_id)
     if not user:
-        raise cred_exc
+        raise _credentials_exception()
+    cache_user(user)
     return user
+
+# Async variant of get_current_user_sync, used when DB_MODE=async
+async def get_current_user_async(request: Request, db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)):
+    user_id = token_subject(token)
+    request.state.user_id = user_id
+    snapshot = get_cached_user(user_id)
+    if snapshot is not None:
+        return await db.merge(user_from_snapshot(snapshot), load=False)
+
+    user = await get_user_by_id_async(db, user_id)
+    if not user:
+        raise _credentials_exception()
+    cache_user(user)
+    return user
+
+# Dependency used by routes, picked once based on the configured database mode
+get_current_user = get_current_user_async if DB_MODE == "async" else get_current_user_sync
@@ -0,0 +1,138 @@
+# Bounded process pool for bcrypt hashing and verification.
+# bcrypt holds the CPU for ~100-300 ms per call, so it runs in dedicated worker processes
+# instead of the request threadpool. At most HASH_WORKERS + HASH_QUEUE_SIZE calls may be
+# in flight; anything beyond that is rejected with 503 and a Retry-After header.
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from app.config import HASH_WORKERS, HASH_QUEUE_SIZE, HASH_RETRY_AFTER_SECONDS
+from app.metrics import timed
+from app.utils import hash_password, verify_password
+
+# Counters describing the pool, read through hashing_stats()
+class HashingStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, elapsed: float):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self.latency_sum += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": HASH_WORKERS,
+                "queue_limit": HASH_QUEUE_SIZE,
+                "in_flight": self.in_flight,
+                "queue_depth": max(0, self.in_flight - HASH_WORKERS),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "latency_avg_seconds": self.latency_sum / self.completed if self.completed else 0.0,
+                "latency_max_seconds": self.latency_max,
+                "latency_sum_seconds": self.latency_sum,
+            }
+
+stats = HashingStats()
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(1, HASH_WORKERS) + HASH_QUEUE_SIZE)
+
+# Create the worker pool on first use, "spawn" avoids forking a process that already runs threads
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+# Take a slot in the bounded queue or reject the request with 503
+def _acquire_slot():
+    if not _slots.acquire(blocking=False):
+        with stats._lock:
+            stats.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, please retry shortly",
+            headers={"Retry-After": str(HASH_RETRY_AFTER_SECONDS)},
+        )
+    stats.started()
+
+def _release_slot(started_at: float):
+    stats.finished(time.perf_counter() - started_at)
+    _slots.release()
+
+# Run fn in the pool and block the calling thread until it is done, used from sync routes
+def _run(fn, *args):
+    _acquire_slot()
+    started_at = time.perf_counter()
+    try:
+        with timed(fn.__name__):
+            if HASH_WORKERS <= 0:
+                return fn(*args)
+            return _get_executor().submit(fn, *args).result()
+    finally:
+        _release_slot(started_at)
+
+# Run fn in the pool without blocking the event loop, used from async routes
+async def _run_async(fn, *args):
+    _acquire_slot()
+    started_at = time.perf_counter()
+    try:
+        with timed(fn.__name__):
+            if HASH_WORKERS <= 0:
+                return fn(*args)
+            return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+    finally:
+        _release_slot(started_at)
+
+# Hash a plain password in the pool
+def hash_password_pooled(plain_password: str) -> str:
+    return _run(hash_password, plain_password)
+
+# Verify a plain password against a hashed password in the pool
+def verify_password_pooled(plain_password: str, hashed_password: str) -> bool:
+    return _run(verify_password, plain_password, hashed_password)
+
+# Async variant of hash_password_pooled
+async def hash_password_async(plain_password: str) -> str:
+    return await _run_async(hash_password, plain_password)
+
+# Async variant of verify_password_pooled
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_async(verify_password, plain_password, hashed_password)
+
+# Current queue depth, rejection count and latency figures
+def hashing_stats() -> dict:
+    return stats.snapshot()
+
+# Stop the worker processes, called on application shutdown
+def shutdown_hashing_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
@@ -1,15 +1,49 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.database import Base, engine
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from app.config import GZIP_ENABLED, GZIP_MIN_SIZE, METRICS_ENABLED, DATABASE_REPLICA_URLS
+from app.database import StickyPrimaryMiddleware
+from app.hashing import shutdown_hashing_pool
+from app.metrics import MetricsMiddleware
 from app.routes import auth as auth_routes
 from app.routes import users as users_routes
-from app.models import models
-from dotenv import load_dotenv
+from app.routes import workouts as workouts_routes
+from app.routes import analytics as analytics_routes
+from app.routes import tests as tests_routes
+from app.routes import leaderboards as leaderboards_routes
+from app.routes import observations as observations_routes
+from app.routes import mood as mood_routes
+from app.routes import journal as journal_routes
+from app.routes import teams as teams_routes
+from app.routes import assignments as assignments_routes
+from app.routes import archive as archive_routes
+from app.routes import live as live_routes
+from app.routes import metrics as metrics_routes
+
+# Release background resources when the worker stops
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    shutdown_hashing_pool()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Carries the read-your-writes window between workers in a cookie, only needed with replicas
+if DATABASE_REPLICA_URLS:
+    app.add_middleware(StickyPrimaryMiddleware)
 
-load_dotenv()  
+# Compress large responses (workout lists), small ones are not worth the CPU
+if GZIP_ENABLED:
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
 
-app = FastAPI()
+# Added last so it is outermost and times compression as well
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
-Base.metadata.create_all(bind=engine)
+# The schema is managed by Alembic migrations (run `alembic upgrade head` once per deploy),
+# workers no longer create tables at import
 
 @app.get("/")
 def root():
@@ -17,3 +51,16 @@ def root():
 
 app.include_router(auth_routes.router)
 app.include_router(users_routes.router)
+app.include_router(workouts_routes.router)
+app.include_router(analytics_routes.router)
+app.include_router(tests_routes.router)
+app.include_router(leaderboards_routes.router)
+app.include_router(observations_routes.router)
+app.include_router(mood_routes.router)
+app.include_router(journal_routes.router)
+app.include_router(teams_routes.router)
+app.include_router(assignments_routes.router)
+app.include_router(archive_routes.router)
+app.include_router(live_routes.router)
+if METRICS_ENABLED:
+    app.include_router(metrics_routes.router)
@@ -0,0 +1,227 @@
+# Request, database and hot-path instrumentation exported in the Prometheus text format.
+#
+# MetricsMiddleware times every request and labels it with the matched route template (not the
+# raw path, which would explode label cardinality). SQLAlchemy cursor events on every Engine count
+# statements and database time, attributed to the current request through a context variable that
+# is inherited by the threadpool running sync routes. Hot paths (bcrypt, JWT decode) are wrapped in
+# timed(). All series live in process memory, each worker exposes its own on /metrics.
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import METRICS_ENABLED, SLOW_REQUEST_SECONDS, SLOW_REQUEST_MAX_STATEMENTS
+
+logger = logging.getLogger("app.slow_requests")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+_INF_BUCKET = 'le="+Inf"'
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+# Monotonic counter with optional labels
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+# Cumulative histogram with fixed buckets, observations are O(log buckets)
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, _INF_BUCKET)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+# Gauge lines for values computed at scrape time, e.g. pool and cache statistics
+def render_gauges(name: str, documentation: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+    return lines
+
+request_latency = Histogram(
+    "http_request_duration_seconds", "Request latency by route template", ("method", "route", "status"),
+)
+db_query_latency = Histogram(
+    "db_query_duration_seconds", "Latency of individual SQL statements", buckets=QUERY_BUCKETS,
+)
+db_queries = Counter("db_queries_total", "SQL statements executed, by route", ("route",))
+db_seconds = Counter("db_seconds_total", "Time spent executing SQL statements, by route", ("route",))
+operation_latency = Histogram(
+    "app_operation_duration_seconds", "Latency of instrumented hot paths (password hashing, token decode)", ("operation",),
+)
+
+REGISTRY = (request_latency, db_query_latency, db_queries, db_seconds, operation_latency)
+
+# Statement counters of the request being served
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "statements")
+
+    def __init__(self, capture_statements: bool):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements: Optional[List[str]] = [] if capture_statements else None
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+# Counters of the current request, None outside of a request (CLI jobs, background threads)
+def current_request_stats() -> Optional[RequestStats]:
+    return _current_request.get()
+
+# Time a block and record it under app_operation_duration_seconds{operation=...}
+@contextmanager
+def timed(operation: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        operation_latency.observe(time.perf_counter() - started, operation)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    db_query_latency.observe(elapsed)
+    stats = _current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        if stats.statements is not None and len(stats.statements) < SLOW_REQUEST_MAX_STATEMENTS:
+            stats.statements.append(f"[{elapsed * 1000:.1f} ms] {statement}")
+
+# Failed statements never reach after_cursor_execute, drop their start time
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None:
+        starts = conn.info.get("metrics_query_start")
+        if starts:
+            starts.pop()
+
+# Listen on the Engine class so every engine is covered, including ones created lazily later and
+# the sync engine behind an AsyncEngine
+if METRICS_ENABLED:
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+# Plain ASGI middleware (no BaseHTTPMiddleware) so streaming responses are not buffered
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(capture_statements=SLOW_REQUEST_SECONDS > 0)
+        token = _current_request.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_request.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            request_latency.observe(elapsed, scope["method"], template, str(status_code))
+            if stats.queries:
+                db_queries.inc(stats.queries, template)
+                db_seconds.inc(stats.db_seconds, template)
+            if 0 < SLOW_REQUEST_SECONDS <= elapsed:
+                _log_slow_request(scope, template, status_code, elapsed, stats)
+
+def _log_slow_request(scope, template: str, status_code: int, elapsed: float, stats: RequestStats):
+    statements = "\n".join(f"  {i}. {sql}" for i, sql in enumerate(stats.statements or [], start=1))
+    logger.warning(
+        "slow request %s %s (%s) status=%s %.1f ms, %d queries, %.1f ms in DB\n%s",
+        scope["method"],
+        scope.get("path"),
+        template,
+        status_code,
+        elapsed * 1000,
+        stats.queries,
+        stats.db_seconds * 1000,
+        statements,
+    )
+
+# All registered series in the Prometheus text exposition format
+def render_metrics(extra: Iterable[List[str]] = ()) -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for block in extra:
+        lines.extend(block)
+    return "\n".join(lines) + "\n"
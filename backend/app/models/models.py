@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, JSON, Boolean, UniqueConstraint, ForeignKeyConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, JSON, Boolean, Float, Index, UniqueConstraint, ForeignKeyConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.associationproxy import association_proxy
 from datetime import datetime
@@ -20,6 +21,15 @@ class StatusEnum(str, enum.Enum):
     in_progress = "in_progress"
     completed = "completed"
 
+class ObservationSourceEnum(str, enum.Enum):
+    test = "test"
+    workout = "workout"
+    mood = "mood"
+
+# Exercise lists, JSONB on Postgres so they can be indexed. Migration 0004 adds GIN indexes on
+# exercise_names(exercises) for workouts and group_workouts, see app.services.exercise_search.
+ExercisesJSON = JSON().with_variant(JSONB(), "postgresql")
+
 # User model
 class User(Base):
     __tablename__ = "users"
@@ -41,9 +51,29 @@ class User(Base):
     teams = association_proxy("user_teams", "team")
     groups = association_proxy("user_teams", "group")
 
+# RefreshToken model, one row per issued refresh token. Only an HMAC of the token is stored.
+# Tokens rotate on every use; the tokens descending from one login share family_id, so presenting
+# an already rotated token revokes the whole family.
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        UniqueConstraint("token_hash", name="uq_refresh_tokens_token_hash"),  # lookup on refresh
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    family_id = Column(String(32), index=True, nullable=False)
+    token_hash = Column(String(64), nullable=False)  # hex HMAC-SHA256, see app.utils
+    created_at = Column(DateTime, default=datetime.now)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)  # set when rotated, logged out or revoked
+
 # Workout model
 class Workout(Base):
     __tablename__ = "workouts"
+    __table_args__ = (
+        Index("ix_workouts_user_created_id", "user_id", "created_at", "id"),  # keyset pagination of a user's history
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
@@ -52,12 +82,30 @@ class Workout(Base):
     start_date = Column(DateTime, default=datetime.now)
     end_date = Column(DateTime)
     description = Column(String, nullable=False)
-    exercises = Column(JSON, nullable=False)  # list of exercises with sets and details 
+    exercises = Column(ExercisesJSON, nullable=False)  # list of exercises with sets and details
     results = Column(JSON, nullable=True)  # actual performed exercises and results
-    update_log = Column(JSON, nullable=True)   # history of changes, deload weeks, notes
     created_at = Column(DateTime, default=datetime.now)
 
     user = relationship("User", back_populates="workouts")
+    changes = relationship("WorkoutChange", back_populates="workout", passive_deletes=True)
+
+# WorkoutChange model, append-only history of a workout (deload weeks, notes, edits). One row per
+# change so logging never rewrites the workout row.
+class WorkoutChange(Base):
+    __tablename__ = "workout_changes"
+    __table_args__ = (
+        Index("ix_workout_changes_workout_created_id", "workout_id", "created_at", "id"),  # keyset pagination of a workout's log
+    )
+
+    id = Column(Integer, primary_key=True)
+    workout_id = Column(Integer, ForeignKey("workouts.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)  # owner of the workout
+    at = Column(DateTime, nullable=False)  # when the change happened, given by the client
+    change = Column(String, nullable=False)
+    meta = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+
+    workout = relationship("Workout", back_populates="changes")
 
 # Test model for fitness tests
 class Test(Base):
@@ -92,6 +140,9 @@ class Goal(Base):
 # MoodCheckIn model for daily mood tracking
 class MoodCheckIn(Base):
     __tablename__ = "mood_checkins"
+    __table_args__ = (
+        Index("ix_mood_checkins_user_created_id", "user_id", "created_at", "id"),  # keyset pagination of a user's history
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
@@ -100,9 +151,14 @@ class MoodCheckIn(Base):
 
     user = relationship("User", back_populates="mood_checkins")
 
-# JournalEntry model for user journals
+# JournalEntry model for user journals. On Postgres the table also has a generated
+# search_vector tsvector column with a GIN index (migration 0002), it is deliberately not mapped
+# so entries load without it, see app.services.journal_search.
 class JournalEntry(Base):
     __tablename__ = "journal_entries"
+    __table_args__ = (
+        Index("ix_journal_entries_user_created_id", "user_id", "created_at", "id"),  # keyset pagination of a user's history
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
@@ -115,10 +171,16 @@ class JournalEntry(Base):
 class Summary(Base):
     __tablename__ = "summaries"
 
+    __table_args__ = (
+        UniqueConstraint("user_id", "period", "period_start", name="uq_summary_user_period_start"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
     period = Column(Enum(PeriodEnum), default=PeriodEnum.daily, nullable=False)
+    period_start = Column(DateTime, nullable=True)  # first day of the day/week/month covered
     created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     mood = Column(String, nullable=False)
     journal = Column(String, nullable=False)
     workout = Column(String, nullable=False)
@@ -127,6 +189,14 @@ class Summary(Base):
 
     user = relationship("User", back_populates="summaries")
 
+# SummaryWatermark model, rows created up to summarized_until are already folded into summaries
+class SummaryWatermark(Base):
+    __tablename__ = "summary_watermarks"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    summarized_until = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
 # Team model for multi-user collaboration
 class Team(Base):
     __tablename__ = "teams"
@@ -190,7 +260,7 @@ class GroupWorkout(Base):
     start_date = Column(DateTime, default=datetime.now)
     end_date = Column(DateTime)
     description = Column(String, nullable=False)
-    exercises = Column(JSON, nullable=False)  
+    exercises = Column(ExercisesJSON, nullable=False)
     created_at = Column(DateTime, default=datetime.now)
 
     group = relationship("Group", back_populates="group_workouts")
@@ -209,4 +279,26 @@ class GroupTest(Base):
     created_at = Column(DateTime, default=datetime.now)
 
     group = relationship("Group", back_populates="group_tests")
-    coach = relationship("User")
\ No newline at end of file
+    coach = relationship("User")
+
+# MetricObservation model, one typed row per measured value mirrored from the JSON columns of
+# Test.results, Workout.results/exercises and MoodCheckIn.mood so lookups can use indexes
+class MetricObservation(Base):
+    __tablename__ = "metric_observations"
+    __table_args__ = (
+        Index("ix_observations_user_name_metric_time", "user_id", "name", "metric_type", "observed_at"),
+        Index("ix_observations_name_metric_value", "name", "metric_type", "value"),
+        Index("ix_observations_user_time", "user_id", "observed_at"),
+        Index("ix_observations_source", "source", "source_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    source = Column(Enum(ObservationSourceEnum), nullable=False)
+    source_id = Column(Integer, nullable=False)  # id of the Test/Workout/MoodCheckIn row
+    name = Column(String, nullable=False)  # lowercased exercise, test parameter or mood dimension
+    metric_type = Column(String, nullable=False)  # MetricTypeEnum value, or "mood"
+    value = Column(Float, nullable=False)  # in the canonical unit of metric_type
+    unit = Column(String, nullable=True)
+    set_index = Column(Integer, nullable=True)  # 1-based set number for workout sets
+    observed_at = Column(DateTime, nullable=False)
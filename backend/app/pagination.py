@@ -0,0 +1,69 @@
+# Keyset (cursor) pagination over (created_at, id), newest first.
+# The cursor is an opaque token encoding the last row of the previous page, so each page is an
+# index range scan on (user_id, created_at, id) no matter how deep the client pages.
+
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import Session
+
+# Encode the position after the given row
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+# Decode a cursor produced by encode_cursor, malformed cursors are a client error
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+# Run query for one page. model supplies the created_at/id columns. Queries selecting the full
+# entity return ORM objects, column projections (scalars=False) return rows with attribute access.
+def paginate(
+    db: Session,
+    query: Select,
+    model,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    scalars: bool = True,
+) -> dict:
+    if since is not None:
+        query = query.where(model.created_at >= since)
+    if until is not None:
+        query = query.where(model.created_at < until)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+
+    query = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    result = db.execute(query)
+    rows = result.scalars().all() if scalars else result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return {"items": rows, "next_cursor": next_cursor}
+
+# Cursor for results ordered by a score (e.g. search rank) then id, highest first. repr() keeps
+# the float exact so the next page starts right after the last row.
+def encode_score_cursor(score: float, row_id: int) -> str:
+    raw = f"{float(score)!r}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_score_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        score, row_id = raw.split("|", 1)
+        return float(score), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
@@ -0,0 +1,221 @@
+# Cached membership and permission resolver for team/group authorization.
+#
+# A user's full membership map (team -> admin flag, groups -> roles, plus every group of the teams
+# the user administers) is loaded in one query and cached per process, so authorization checks
+# need no database round-trip on the hot path.
+#
+# Entries are validated by per-user and global version counters. ORM writes to UserTeams or Group
+# are collected at flush and bump the versions once the transaction commits (and already at flush,
+# for the writing session itself), so a load racing with the commit cannot cache pre-commit rows.
+# The counters only exist in this process: other workers pick up a change when their entry
+# expires after MEMBERSHIP_CACHE_TTL_SECONDS.
+#
+# Bulk statements that bypass the ORM (e.g. INSERT ... SELECT into user_teams) must call
+# invalidate_memberships() themselves, passing their session so it happens on commit.
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional, Set
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.config import USER_CACHE_SIZE, MEMBERSHIP_CACHE_TTL_SECONDS
+from app.database import get_db
+from app.dependencies import get_current_user
+from app.models.models import UserTeams, Group, RoleEnum
+
+# Memberships of one user
+@dataclass(frozen=True)
+class MembershipMap:
+    user_id: int
+    admin_teams: FrozenSet[int] = frozenset()
+    teams: FrozenSet[int] = frozenset()
+    group_roles: Dict[int, FrozenSet[RoleEnum]] = field(default_factory=dict)
+    group_team: Dict[int, int] = field(default_factory=dict)  # group -> team for every group the user can see
+
+    def is_team_admin(self, team_id: int) -> bool:
+        return team_id in self.admin_teams
+
+    def coached_groups(self) -> Set[int]:
+        return {gid for gid, roles in self.group_roles.items() if RoleEnum.coach in roles}
+
+    # Coach of the group, or admin of the team that owns it
+    def can_manage_group(self, group_id: int) -> bool:
+        if RoleEnum.coach in self.group_roles.get(group_id, ()):
+            return True
+        team_id = self.group_team.get(group_id)
+        return team_id is not None and team_id in self.admin_teams
+
+    # Admin of the team, or coach of one of its groups
+    def can_manage_team(self, team_id: int) -> bool:
+        if team_id in self.admin_teams:
+            return True
+        return any(self.group_team.get(gid) == team_id for gid in self.coached_groups())
+
+    # Any membership in the group, or admin of its team
+    def can_view_group(self, group_id: int) -> bool:
+        return group_id in self.group_roles or self.can_manage_group(group_id)
+
+    # Coach of one of the athlete's groups, or admin of one of the athlete's teams
+    def is_coach_of(self, athlete: "MembershipMap") -> bool:
+        athlete_groups = {gid for gid, roles in athlete.group_roles.items() if RoleEnum.athlete in roles}
+        if self.coached_groups() & athlete_groups:
+            return True
+        return bool(self.admin_teams & athlete.teams)
+
+# Load the membership map of a user in a single query. user_teams is outer-joined to the groups of
+# each team the user belongs to, which is how admins learn which groups their teams own.
+def load_memberships(db: Session, user_id: int) -> MembershipMap:
+    rows = db.execute(
+        select(UserTeams.team_id, UserTeams.group_id, UserTeams.role, UserTeams.is_team_admin, Group.id)
+        .outerjoin(Group, (Group.team_id == UserTeams.team_id) & UserTeams.is_team_admin.is_(True))
+        .where(UserTeams.user_id == user_id)
+    )
+    teams, admin_teams = set(), set()
+    group_roles: Dict[int, Set[RoleEnum]] = {}
+    group_team: Dict[int, int] = {}
+    for team_id, group_id, role, is_admin, team_group_id in rows:
+        teams.add(team_id)
+        if is_admin:
+            admin_teams.add(team_id)
+        if group_id is not None:
+            group_roles.setdefault(group_id, set()).add(RoleEnum(role))
+            group_team[group_id] = team_id
+        if team_group_id is not None:
+            group_team[team_group_id] = team_id
+    return MembershipMap(
+        user_id=user_id,
+        admin_teams=frozenset(admin_teams),
+        teams=frozenset(teams),
+        group_roles={gid: frozenset(roles) for gid, roles in group_roles.items()},
+        group_team=group_team,
+    )
+
+# Process-local LRU cache of membership maps, validated by per-user and global version counters
+# and expiring after ttl seconds
+class MembershipCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._global_version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _version(self, user_id: int) -> tuple:
+        return (self._global_version, self._versions.get(user_id, 0))
+
+    def get(self, db: Session, user_id: int) -> MembershipMap:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            version = self._version(user_id)
+            if entry is not None and entry[0] == version and entry[1] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        memberships = load_memberships(db, user_id)
+        with self._lock:
+            # Store only if nothing changed while loading, otherwise the next call reloads
+            if self._version(user_id) == version and self.ttl > 0:
+                self._entries[user_id] = (version, time.monotonic() + self.ttl, memberships)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return memberships
+
+    # Bump the version of one user, or of everyone when user_id is None
+    def invalidate(self, user_id: Optional[int] = None):
+        with self._lock:
+            if user_id is None:
+                self._global_version += 1
+                self._entries.clear()
+            else:
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+                self._entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses, "version": self._global_version}
+
+membership_cache = MembershipCache(max(1, USER_CACHE_SIZE), MEMBERSHIP_CACHE_TTL_SECONDS)
+
+# Users whose memberships the session changed, None meaning everyone
+_PENDING = "membership_changes"
+_EVERYONE = None
+
+def _defer(db: Session, user_id: Optional[int]):
+    db.info.setdefault(_PENDING, set()).add(user_id)
+    membership_cache.invalidate(user_id)
+
+# Invalidation hook for code that changes memberships without going through the ORM. With a
+# session the invalidation is repeated once that session commits.
+def invalidate_memberships(user_id: Optional[int] = None, db: Optional[Session] = None):
+    if db is None:
+        membership_cache.invalidate(user_id)
+    else:
+        _defer(db, user_id)
+
+# Any ORM write to a UserTeams row changes that user's map. Admin flags affect other users' view
+# of the team only through their own rows, so per-user invalidation is enough. New or removed
+# groups change what team admins can manage, which invalidates everyone.
+@event.listens_for(Session, "after_flush")
+def _collect_membership_changes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, UserTeams):
+            _defer(session, obj.user_id)
+        elif isinstance(obj, Group) and (obj in session.new or obj in session.deleted):
+            _defer(session, _EVERYONE)
+
+@event.listens_for(Session, "after_commit")
+def _apply_membership_changes(session):
+    for user_id in session.info.pop(_PENDING, ()):
+        membership_cache.invalidate(user_id)
+
+# Rolled-back changes were already invalidated at flush, the next load sees the old rows again
+@event.listens_for(Session, "after_rollback")
+def _discard_membership_changes(session):
+    session.info.pop(_PENDING, None)
+
+# Membership map of a user, served from the cache when current
+def get_memberships(db: Session, user_id: int) -> MembershipMap:
+    return membership_cache.get(db, user_id)
+
+# FastAPI dependency: membership map of the authenticated user
+def current_memberships(db: Session = Depends(get_db), current_user = Depends(get_current_user)) -> MembershipMap:
+    return get_memberships(db, current_user.id)
+
+def _forbidden(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+# FastAPI dependency for routes with a {group_id} path parameter that need a coach or team admin
+def require_group_manager(group_id: int, memberships: MembershipMap = Depends(current_memberships)) -> MembershipMap:
+    if not memberships.can_manage_group(group_id):
+        raise _forbidden("Not allowed to manage this group")
+    return memberships
+
+# FastAPI dependency for routes with a {group_id} path parameter open to any group member
+def require_group_viewer(group_id: int, memberships: MembershipMap = Depends(current_memberships)) -> MembershipMap:
+    if not memberships.can_view_group(group_id):
+        raise _forbidden("Not allowed to view this group")
+    return memberships
+
+# FastAPI dependency for routes with a {user_id} path parameter: the user themself or one of their coaches
+def require_self_or_coach(user_id: int, db: Session = Depends(get_db), memberships: MembershipMap = Depends(current_memberships)) -> MembershipMap:
+    if user_id != memberships.user_id and not memberships.is_coach_of(get_memberships(db, user_id)):
+        raise _forbidden("Not allowed to access this athlete")
+    return memberships
+
+# Plain helpers for code that already has a session
+def can_manage_group(db: Session, user_id: int, group_id: int) -> bool:
+    return get_memberships(db, user_id).can_manage_group(group_id)
+
+def is_coach_of(db: Session, coach_id: int, athlete_id: int) -> bool:
+    return get_memberships(db, coach_id).is_coach_of(get_memberships(db, athlete_id))
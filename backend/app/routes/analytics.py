@@ -0,0 +1,45 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.database import get_read_db
+from app.dependencies import get_current_user
+from app.crud.teams import get_group_athlete_ids
+from app.permissions import require_group_manager, require_self_or_coach
+from app.schemas.analytics import TrainingLoadOut
+from app.services.training_load import training_load_report
+from app.serialization import trusted_response
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+# Training load of the current user
+@router.get("/me/training-load", response_model=TrainingLoadOut)
+def my_training_load(
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user),
+):
+    return trusted_response(training_load_report(db, [current_user.id], since, until))
+
+# Training load of one athlete, for the athlete and their coaches
+@router.get("/users/{user_id}/training-load", response_model=TrainingLoadOut, dependencies=[Depends(require_self_or_coach)])
+def athlete_training_load(
+    user_id: int,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+):
+    return trusted_response(training_load_report(db, [user_id], since, until))
+
+# Training load of every athlete in a group, only for the group's coaches and team admins
+@router.get("/groups/{group_id}/training-load", response_model=TrainingLoadOut, dependencies=[Depends(require_group_manager)])
+def group_training_load(
+    group_id: int,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+):
+    return trusted_response(training_load_report(db, get_group_athlete_ids(db, group_id), since, until))
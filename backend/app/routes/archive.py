@@ -0,0 +1,31 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.dependencies import get_current_user
+from app.schemas.archive import ArchivePartitionOut, RehydrateRequest, RehydrateOut
+from app.services.archive import ARCHIVED_MODELS, describe_archive, rehydrate
+from app.serialization import trusted_response
+
+router = APIRouter(prefix="/archive", tags=["archive"])
+
+# Months of the current user's history that are in cold storage
+@router.get("", response_model=List[ArchivePartitionOut])
+def read_archive(current_user = Depends(get_current_user)):
+    return trusted_response(describe_archive(current_user.id))
+
+# Restore an archived range of the current user's history into the database
+@router.post("/rehydrate", response_model=RehydrateOut)
+def rehydrate_archive(
+    request_in: RehydrateRequest,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+):
+    tables = [table.value for table in request_in.tables] if request_in.tables else list(ARCHIVED_MODELS)
+    rows = {
+        table: rehydrate(db, ARCHIVED_MODELS[table], current_user.id, request_in.since, request_in.until)
+        for table in tables
+    }
+    return trusted_response({"rows": rows})
@@ -0,0 +1,109 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
+
+from app.config import ASSIGN_BACKGROUND_THRESHOLD, ASSIGN_CHUNK_SIZE
+from app.database import get_db, get_read_db, SessionLocal
+from app.crud.assignments import group_athlete_ids, assign_group_workout, assign_group_test
+from app.models.models import GroupWorkout, GroupTest
+from app.permissions import MembershipMap, current_memberships
+from app.schemas.assignment import AssignmentOut
+from app.schemas.group_workout import GroupWorkoutSummaryOut
+from app.schemas.pagination import Page
+from app.schemas.workout import ExerciseMatchEnum
+from app.serialization import page_response
+from app.services.exercise_search import find_group_workouts
+from app.services.jobs import jobs, Job
+
+router = APIRouter(tags=["assignments"])
+
+# Run a large assignment chunk by chunk (each chunk a user_id range) in its own session
+def _run_assignment_job(job: Job, model, template_id: int, chunks: list, assign):
+    db = SessionLocal()
+    try:
+        for user_range, size in chunks:
+            template = db.get(model, template_id)
+            if template is None:
+                raise LookupError("Template was deleted while being assigned")
+            jobs.progress(job, size, assign(db, template, user_range))
+        jobs.finish(job)
+    except Exception as exc:
+        db.rollback()
+        jobs.finish(job, str(exc))
+    finally:
+        db.close()
+
+# Assign inline for small groups, as a background job with progress for large ones
+def _assign(db: Session, background_tasks: BackgroundTasks, response: Response, kind: str, model, template, assign) -> dict:
+    athlete_ids = group_athlete_ids(db, template.group_id)
+    total = len(athlete_ids)
+    if total <= ASSIGN_BACKGROUND_THRESHOLD:
+        created = assign(db, template)
+        return {"kind": kind, "status": "completed", "total": total, "done": total, "created": created}
+
+    chunks = []
+    for start in range(0, total, ASSIGN_CHUNK_SIZE):
+        part = athlete_ids[start:start + ASSIGN_CHUNK_SIZE]
+        chunks.append(((part[0], part[-1]), len(part)))
+    job = jobs.create(kind, total, template.group_id)
+    background_tasks.add_task(_run_assignment_job, job, model, template.id, chunks, assign)
+    response.status_code = status.HTTP_202_ACCEPTED
+    return job.as_dict()
+
+def _load_template(db: Session, model, template_id: int, memberships: MembershipMap):
+    template = db.get(model, template_id)
+    if template is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    if not memberships.can_manage_group(template.group_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to manage this group")
+    return template
+
+# A group's workout templates containing any (or all) of the given exercises, newest first,
+# for members of the group and admins of its team
+@router.get("/groups/{group_id}/group-workouts/by-exercise", response_model=Page[GroupWorkoutSummaryOut])
+def read_group_workouts_by_exercise(
+    group_id: int,
+    name: List[str] = Query(min_length=1, max_length=20),
+    match: ExerciseMatchEnum = ExerciseMatchEnum.any,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    memberships: MembershipMap = Depends(current_memberships),
+):
+    if not memberships.can_view_group(group_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
+    page = find_group_workouts(db, group_id, name, match.value, cursor, limit)
+    return page_response(page, GroupWorkoutSummaryOut)
+
+# Give every athlete of the group their own copy of a GroupWorkout
+@router.post("/group-workouts/{group_workout_id}/assign", response_model=AssignmentOut)
+def assign_workout_to_group(
+    group_workout_id: int,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    db: Session = Depends(get_db),
+    memberships: MembershipMap = Depends(current_memberships),
+):
+    template = _load_template(db, GroupWorkout, group_workout_id, memberships)
+    return _assign(db, background_tasks, response, "group_workout", GroupWorkout, template, assign_group_workout)
+
+# Give every athlete of the group their own copy of a GroupTest
+@router.post("/group-tests/{group_test_id}/assign", response_model=AssignmentOut)
+def assign_test_to_group(
+    group_test_id: int,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    db: Session = Depends(get_db),
+    memberships: MembershipMap = Depends(current_memberships),
+):
+    template = _load_template(db, GroupTest, group_test_id, memberships)
+    return _assign(db, background_tasks, response, "group_test", GroupTest, template, assign_group_test)
+
+# Progress of a background assignment, for managers of the group it assigns to
+@router.get("/assignments/jobs/{job_id}", response_model=AssignmentOut)
+def read_assignment_job(job_id: str, memberships: MembershipMap = Depends(current_memberships)):
+    job = jobs.get(job_id)
+    if job is None or not memberships.can_manage_group(job.group_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job.as_dict()
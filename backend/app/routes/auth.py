@@ -1,22 +1,102 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.config import DB_MODE, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.database import get_db, get_async_db
+from app.dependencies import get_current_user
 from app.schemas.user import UserCreate, UserOut
-from app.schemas.auth import Login, Token
-from app.crud.users import create_user, authenticate_user
+from app.schemas.auth import Login, Token, RefreshRequest
+from app.crud.users import create_user, authenticate_user, create_user_async, authenticate_user_async
+from app.crud.refresh_tokens import (
+    issue_refresh_token,
+    rotate_refresh_token,
+    revoke_refresh_token,
+    revoke_user_refresh_tokens,
+    issue_refresh_token_async,
+    rotate_refresh_token_async,
+    revoke_refresh_token_async,
+    revoke_user_refresh_tokens_async,
+)
 from app.utils import create_access_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-@router.post("/signup", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def signup(user_in: UserCreate, db: Session = Depends(get_db)):
-    return create_user(db, user_in)
-
-@router.post("/login", response_model=Token)
-def login(payload: Login, db: Session = Depends(get_db)):
-    user = authenticate_user(db, payload.email, payload.password)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
-    token = create_access_token({"sub": user.id})
-    return {"access_token": token, "token_type": "bearer"}
+# Build the token response for a user, JWT requires "sub" to be a string
+def _token_response(user_id: int, refresh_token: str) -> dict:
+    token = create_access_token({"sub": str(user_id)})
+    return {
+        "access_token": token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "refresh_token": refresh_token,
+    }
+
+# Response of /auth/refresh in both DB modes: the rotated token pair, or 401 when the token was
+# unknown, expired or revoked (rotate_refresh_token has already revoked a replayed token's family)
+def _refresh_response(rotated: Optional[Tuple[int, str]]) -> dict:
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return _token_response(*rotated)
+
+# Login verifies the password (bcrypt) and starts a refresh token family. /auth/refresh renews
+# the access token with a keyed-hash lookup instead, rotating the refresh token on every call;
+# replaying a rotated refresh token revokes the family, logging that device out.
+if DB_MODE == "async":
+    @router.post("/signup", response_model=UserOut, status_code=status.HTTP_201_CREATED)
+    async def signup(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
+        return await create_user_async(db, user_in)
+
+    @router.post("/login", response_model=Token)
+    async def login(payload: Login, db: AsyncSession = Depends(get_async_db)):
+        user = await authenticate_user_async(db, payload.email, payload.password)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+        return _token_response(user.id, await issue_refresh_token_async(db, user.id))
+
+    @router.post("/refresh", response_model=Token)
+    async def refresh(payload: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+        return _refresh_response(await rotate_refresh_token_async(db, payload.refresh_token))
+
+    @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+    async def logout(payload: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+        await revoke_refresh_token_async(db, payload.refresh_token)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    @router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+    async def logout_all(db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
+        await revoke_user_refresh_tokens_async(db, current_user.id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+else:
+    @router.post("/signup", response_model=UserOut, status_code=status.HTTP_201_CREATED)
+    def signup(user_in: UserCreate, db: Session = Depends(get_db)):
+        return create_user(db, user_in)
+
+    @router.post("/login", response_model=Token)
+    def login(payload: Login, db: Session = Depends(get_db)):
+        user = authenticate_user(db, payload.email, payload.password)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+        return _token_response(user.id, issue_refresh_token(db, user.id))
+
+    @router.post("/refresh", response_model=Token)
+    def refresh(payload: RefreshRequest, db: Session = Depends(get_db)):
+        return _refresh_response(rotate_refresh_token(db, payload.refresh_token))
+
+    # Log out the device holding this refresh token, unknown tokens are ignored
+    @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+    def logout(payload: RefreshRequest, db: Session = Depends(get_db)):
+        revoke_refresh_token(db, payload.refresh_token)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    # Revoke every refresh token of the current user, access tokens expire on their own
+    @router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+    def logout_all(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+        revoke_user_refresh_tokens(db, current_user.id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
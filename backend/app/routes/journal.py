@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Optional, Union
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db, get_read_db
+from app.dependencies import get_current_user
+from app.crud.journal import list_journal_entries, create_journal_entry, find_journal_entries
+from app.schemas.journal import (
+    JournalEntryOut,
+    JournalEntrySummaryOut,
+    JournalEntryCreate,
+    JournalSearchHitOut,
+    SearchOrderEnum,
+)
+from app.schemas.pagination import Page, ViewEnum
+from app.serialization import page_response, object_response
+
+router = APIRouter(prefix="/journal", tags=["journal"])
+
+# Journal history of the current user, newest first, paginated with an opaque cursor
+@router.get("", response_model=Union[Page[JournalEntryOut], Page[JournalEntrySummaryOut]])
+def read_journal_entries(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    view: ViewEnum = ViewEnum.full,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user),
+):
+    summary = view == ViewEnum.summary
+    page = list_journal_entries(db, current_user.id, cursor, limit, since, until, summary=summary)
+    return page_response(page, JournalEntrySummaryOut if summary else JournalEntryOut)
+
+# Write a journal entry for the current user
+@router.post("", response_model=JournalEntryOut, status_code=status.HTTP_201_CREATED)
+def write_journal_entry(
+    entry_in: JournalEntryCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+):
+    return object_response(create_journal_entry(db, current_user.id, entry_in), JournalEntryOut, status_code=status.HTTP_201_CREATED)
+
+# Full-text search over the current user's journal, best matches first (or newest first with
+# order=recent), paginated with an opaque cursor
+@router.get("/search", response_model=Page[JournalSearchHitOut])
+def search_journal_entries(
+    q: str = Query(min_length=1, max_length=256),
+    order: SearchOrderEnum = SearchOrderEnum.rank,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user),
+):
+    page = find_journal_entries(db, current_user.id, q, order.value, cursor, limit, since, until)
+    return page_response(page, JournalSearchHitOut)
@@ -0,0 +1,68 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.database import get_read_db
+from app.permissions import MembershipMap, current_memberships
+from app.models.models import GroupTest
+from app.schemas.test import MetricTypeEnum, CANONICAL_UNITS
+from app.schemas.leaderboard import LeaderboardOut, LeaderboardStanding, LeaderboardInfo
+from app.services.leaderboards import leaderboards
+
+router = APIRouter(prefix="/leaderboards", tags=["leaderboards"])
+
+# Leaderboards are visible to everyone in the group plus the team admins
+def _check_access(db: Session, memberships: MembershipMap, group_test_id: int):
+    group_test = db.get(GroupTest, group_test_id)
+    if not group_test:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group test not found")
+    if not memberships.can_view_group(group_test.group_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to view this group test")
+
+def _not_found() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No results for this parameter and metric")
+
+# Parameter/metric combinations that have results
+@router.get("/group-tests/{group_test_id}", response_model=List[LeaderboardInfo])
+def list_leaderboards(group_test_id: int, db: Session = Depends(get_read_db), memberships: MembershipMap = Depends(current_memberships)):
+    _check_access(db, memberships, group_test_id)
+    return leaderboards.describe(db, group_test_id)
+
+# Top k athletes for a parameter/metric
+@router.get("/group-tests/{group_test_id}/top", response_model=LeaderboardOut)
+def top_athletes(
+    group_test_id: int,
+    parameter: str,
+    metric: MetricTypeEnum,
+    k: int = Query(default=10, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    memberships: MembershipMap = Depends(current_memberships),
+):
+    _check_access(db, memberships, group_test_id)
+    entries = leaderboards.top(db, group_test_id, parameter, metric, k)
+    if entries is None:
+        raise _not_found()
+    return {
+        "group_test_id": group_test_id,
+        "parameter": parameter,
+        "metric": metric,
+        "unit": CANONICAL_UNITS.get(metric),
+        "entries": entries,
+    }
+
+# Rank and percentile of one athlete
+@router.get("/group-tests/{group_test_id}/users/{user_id}", response_model=LeaderboardStanding)
+def athlete_standing(
+    group_test_id: int,
+    user_id: int,
+    parameter: str,
+    metric: MetricTypeEnum,
+    db: Session = Depends(get_read_db),
+    memberships: MembershipMap = Depends(current_memberships),
+):
+    _check_access(db, memberships, group_test_id)
+    standing = leaderboards.standing(db, group_test_id, parameter, metric, user_id)
+    if standing is None:
+        raise _not_found()
+    return standing
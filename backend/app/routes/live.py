@@ -0,0 +1,160 @@
+import asyncio
+from typing import Optional
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import HTTPConnection, Request
+
+from app.config import LIVE_HEARTBEAT_SECONDS
+from app.database import SessionLocal
+from app.dependencies import token_subject
+from app.permissions import MembershipMap, current_memberships, get_memberships
+from app.schemas.live import LiveSetIn, LiveSetInAdapter, LivePublishOut
+from app.services.live import HubFull, Subscriber, hub
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+# Bearer token from the Authorization header, or from ?token= since browsers cannot set headers
+# on WebSocket and EventSource requests
+def _connection_token(conn: HTTPConnection) -> Optional[str]:
+    scheme, _, value = conn.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and value:
+        return value
+    return conn.query_params.get("token")
+
+# Memberships in a short-lived session of its own, long-lived connections must not hold one
+def _load_memberships(user_id: int) -> MembershipMap:
+    db = SessionLocal(read_only=True)
+    try:
+        return get_memberships(db, user_id)
+    finally:
+        db.close()
+
+# Authenticate a WebSocket/SSE connection, raises the usual 401 HTTPException
+async def _connection_memberships(conn: HTTPConnection) -> MembershipMap:
+    user_id = token_subject(_connection_token(conn) or "")
+    conn.state.user_id = user_id
+    return await run_in_threadpool(_load_memberships, user_id)
+
+# Access check repeated every LIVE_HEARTBEAT_SECONDS on open connections, so a coach or athlete
+# removed from the group stops receiving (and sending) its events. Memberships come from the
+# membership cache, which another worker's change reaches within MEMBERSHIP_CACHE_TTL_SECONDS.
+async def _still_allowed(user_id: int, group_id: int, manage: bool) -> bool:
+    memberships = await run_in_threadpool(_load_memberships, user_id)
+    return memberships.can_manage_group(group_id) if manage else memberships.can_view_group(group_id)
+
+def _encode(message: dict) -> str:
+    return orjson.dumps(message).decode()
+
+# Publish a completed set to the coaches watching the group, for clients without a WebSocket
+@router.post("/groups/{group_id}/sets", response_model=LivePublishOut, status_code=status.HTTP_202_ACCEPTED)
+async def publish_set(group_id: int, entry: LiveSetIn, memberships: MembershipMap = Depends(current_memberships)):
+    if not memberships.can_view_group(group_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
+    return {"subscribers": hub.publish_set(group_id, memberships.user_id, entry.model_dump())}
+
+# Server-sent events of a group for its coaches and team admins: one "batch" event per flush,
+# keep-alive comments while the group is quiet
+@router.get("/groups/{group_id}/events")
+async def group_events(group_id: int, request: Request):
+    memberships = await _connection_memberships(request)
+    if not memberships.can_manage_group(group_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
+    try:
+        subscriber = hub.subscribe(group_id, memberships.user_id)
+    except HubFull:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many live connections", headers={"Retry-After": "5"})
+
+    async def stream():
+        loop = asyncio.get_running_loop()
+        next_check = loop.time() + LIVE_HEARTBEAT_SECONDS
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                batch = await subscriber.next_batch(timeout=LIVE_HEARTBEAT_SECONDS)
+                if loop.time() >= next_check:
+                    # the reconnect that follows is answered with 404
+                    if not await _still_allowed(memberships.user_id, group_id, manage=True):
+                        return
+                    next_check = loop.time() + LIVE_HEARTBEAT_SECONDS
+                if batch is None:
+                    yield b": ping\n\n"
+                else:
+                    yield b"event: batch\ndata: " + orjson.dumps(batch) + b"\n\n"
+        finally:
+            hub.unsubscribe(subscriber)
+
+    # identity encoding keeps GZipMiddleware from buffering the stream
+    headers = {"Cache-Control": "no-cache", "Content-Encoding": "identity", "X-Accel-Buffering": "no"}
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=headers)
+
+async def _receive_sets(websocket: WebSocket, group_id: int, user_id: int, send_lock: asyncio.Lock):
+    while True:
+        message = await websocket.receive_text()
+        try:
+            entry = LiveSetInAdapter.validate_json(message)
+        except ValidationError as exc:
+            errors = exc.errors(include_url=False, include_context=False, include_input=False)
+            async with send_lock:
+                await websocket.send_text(_encode({"type": "error", "errors": errors}))
+            continue
+        hub.publish_set(group_id, user_id, entry.model_dump())
+
+async def _send_batches(websocket: WebSocket, subscriber: Subscriber, send_lock: asyncio.Lock):
+    while True:
+        batch = await subscriber.next_batch()
+        async with send_lock:
+            await websocket.send_text(_encode(batch))
+
+# Returns once the user lost the access the connection was opened with
+async def _watch_access(user_id: int, group_id: int, manage: bool):
+    while True:
+        await asyncio.sleep(LIVE_HEARTBEAT_SECONDS)
+        if not await _still_allowed(user_id, group_id, manage):
+            return
+
+# Two-way group channel. Every member may send LiveSetIn messages, which are published to the
+# group; coaches and team admins also receive the group's events as "batch" messages.
+@router.websocket("/groups/{group_id}/ws")
+async def group_socket(websocket: WebSocket, group_id: int):
+    try:
+        memberships = await _connection_memberships(websocket)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if not memberships.can_view_group(group_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    subscriber = None
+    if memberships.can_manage_group(group_id):
+        try:
+            subscriber = hub.subscribe(group_id, memberships.user_id)
+        except HubFull:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+            return
+
+    send_lock = asyncio.Lock()
+    tasks = []
+    try:
+        await websocket.accept()
+        tasks.append(asyncio.create_task(_receive_sets(websocket, group_id, memberships.user_id, send_lock)))
+        if subscriber is not None:
+            tasks.append(asyncio.create_task(_send_batches(websocket, subscriber, send_lock)))
+        watcher = asyncio.create_task(_watch_access(memberships.user_id, group_id, subscriber is not None))
+        tasks.append(watcher)
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc is not None and not isinstance(exc, WebSocketDisconnect):
+                raise exc
+        if watcher in done:
+            async with send_lock:
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+    finally:
+        for task in tasks:
+            task.cancel()
+        if subscriber is not None:
+            hub.unsubscribe(subscriber)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.cache import identity_cache_stats
+from app.database import pool_status, replicas
+from app.hashing import hashing_stats
+from app.metrics import render_metrics, render_gauges
+from app.permissions import membership_cache
+from app.services.live import hub
+
+router = APIRouter(tags=["metrics"])
+
+# Gauges read from the pools and caches at scrape time
+def _gauges():
+    hashing = hashing_stats()
+    yield render_gauges(
+        "password_hash_pool",
+        "Password hashing pool state",
+        [({"field": key}, hashing[key]) for key in ("workers", "queue_limit", "in_flight", "queue_depth", "completed", "rejected")],
+    )
+    caches = {**identity_cache_stats(), "memberships": membership_cache.stats()}
+    yield render_gauges(
+        "app_cache",
+        "Process-local cache counters",
+        [
+            ({"cache": name, "field": key}, value)
+            for name, stats in caches.items()
+            for key, value in stats.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        ],
+    )
+    yield render_gauges(
+        "db_pool_connections",
+        "Connections of the SQLAlchemy pools",
+        [({"engine": engine, "state": state}, value) for engine, states in pool_status().items() for state, value in states.items()],
+    )
+    yield render_gauges(
+        "live_hub",
+        "Live group-session connections and event counters",
+        [({"field": key}, value) for key, value in hub.stats().items()],
+    )
+    replica_status = replicas.status()
+    yield render_gauges(
+        "db_replica_healthy",
+        "1 while the read replica is in rotation",
+        [({"replica": replica["name"]}, int(replica["healthy"])) for replica in replica_status],
+    )
+    yield render_gauges(
+        "db_replica_lag_seconds",
+        "Replication lag seen by the last health probe (Postgres)",
+        [({"replica": replica["name"]}, replica["lag"]) for replica in replica_status if replica["lag"] is not None],
+    )
+
+# Prometheus text exposition of this worker's metrics
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(_gauges()), media_type="text/plain; version=0.0.4")
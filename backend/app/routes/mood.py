@@ -0,0 +1,59 @@
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db, get_read_db
+from app.dependencies import get_current_user
+from app.crud.mood import list_mood_checkins, create_mood_checkin
+from app.schemas.mood import MoodCheckInOut, MoodCheckInCreate, MoodChartOut, MoodCorrelationOut
+from app.schemas.pagination import Page
+from app.serialization import page_response, object_response, trusted_response
+from app.services.mood_series import mood_chart, mood_training_correlation
+
+router = APIRouter(prefix="/mood", tags=["mood"])
+
+# Mood check-in history of the current user, newest first, paginated with an opaque cursor
+@router.get("", response_model=Page[MoodCheckInOut])
+def read_mood_checkins(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user),
+):
+    return page_response(list_mood_checkins(db, current_user.id, cursor, limit, since, until), MoodCheckInOut)
+
+# Record a mood check-in for the current user
+@router.post("", response_model=MoodCheckInOut, status_code=status.HTTP_201_CREATED)
+def write_mood_checkin(
+    checkin_in: MoodCheckInCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+):
+    return object_response(create_mood_checkin(db, current_user.id, checkin_in), MoodCheckInOut, status_code=status.HTTP_201_CREATED)
+
+# Chart series of the current user's mood, downsampled to at most `points` points per dimension
+@router.get("/chart", response_model=MoodChartOut)
+def read_mood_chart(
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    points: int = Query(default=300, ge=10, le=5000),
+    window: int = Query(default=7, ge=1, le=365),
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user),
+):
+    return trusted_response(mood_chart(db, current_user.id, since, until, points, window))
+
+# Correlation of the current user's mood with their daily training volume
+@router.get("/correlation", response_model=MoodCorrelationOut)
+def read_mood_correlation(
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    lag: int = Query(default=0, ge=0, le=14),
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user),
+):
+    return trusted_response(mood_training_correlation(db, current_user.id, since, until, lag))
@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_read_db
+from app.dependencies import get_current_user
+from app.models.models import ObservationSourceEnum
+from app.schemas.observation import ObservationOut
+from app.services.observations import query_observations
+
+router = APIRouter(prefix="/observations", tags=["observations"])
+
+# Search the current user's measurements, e.g. ?name=squat&metric_type=weight&min_value=150
+@router.get("", response_model=List[ObservationOut])
+def list_observations(
+    name: Optional[str] = None,
+    metric_type: Optional[str] = None,
+    source: Optional[ObservationSourceEnum] = None,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(default=500, ge=1, le=5000),
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user),
+):
+    return query_observations(
+        db,
+        current_user.id,
+        name=name,
+        metric_type=metric_type,
+        source=source,
+        min_value=min_value,
+        max_value=max_value,
+        since=since,
+        until=until,
+        limit=limit,
+    )
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.database import get_read_db
+from app.crud.teams import get_team_roster
+from app.permissions import MembershipMap, current_memberships
+from app.schemas.team import TeamRosterOut, ExportKindEnum, ExportFormatEnum
+from app.services.export import MEDIA_TYPES, stream_export
+
+router = APIRouter(prefix="/teams", tags=["teams"])
+
+# Roster of a team with groups and members (including their emails), for team admins and the
+# team's coaches
+@router.get("/{team_id}/roster", response_model=TeamRosterOut)
+def read_team_roster(team_id: int, db: Session = Depends(get_read_db), memberships: MembershipMap = Depends(current_memberships)):
+    if not memberships.can_manage_team(team_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
+    roster = get_team_roster(db, team_id)
+    if roster is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
+    return roster
+
+# Stream a team's workouts (one row per set) or tests (one row per result) as CSV or Parquet,
+# for team admins and the team's coaches. Memory use does not grow with the size of the team.
+@router.get("/{team_id}/export")
+def export_team_data(
+    team_id: int,
+    kind: ExportKindEnum = ExportKindEnum.workouts,
+    format: ExportFormatEnum = ExportFormatEnum.csv,
+    memberships: MembershipMap = Depends(current_memberships),
+):
+    if not memberships.can_manage_team(team_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
+    filename = f"team-{team_id}-{kind.value}.{format.value}"
+    return StreamingResponse(
+        stream_export(team_id, kind.value, format.value),
+        media_type=MEDIA_TYPES[format.value],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
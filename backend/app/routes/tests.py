@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.dependencies import get_current_user
+from app.crud.tests import get_test, record_test_result
+from app.schemas.test import TestOut, TestResult
+from app.services.leaderboards import leaderboards
+from app.serialization import object_response
+
+router = APIRouter(prefix="/tests", tags=["tests"])
+
+# Record the results of one of the current user's tests
+@router.put("/{test_id}/results", response_model=TestOut)
+def submit_test_results(
+    test_id: int,
+    result_in: TestResult,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+):
+    test = get_test(db, test_id)
+    if not test or test.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test not found")
+    test = record_test_result(db, test, result_in)
+    leaderboards.record(test)
+    return object_response(test, TestOut)
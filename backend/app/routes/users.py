@@ -4,6 +4,7 @@ from app.dependencies import get_current_user
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# Declared async so no threadpool slot is taken, the user is already resolved by the dependency
 @router.get("/me", response_model=UserOut)
-def read_me(current_user = Depends(get_current_user)):
+async def read_me(current_user = Depends(get_current_user)):
     return current_user
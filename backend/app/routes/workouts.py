@@ -0,0 +1,197 @@
+from datetime import datetime
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import BULK_BATCH_SIZE, BULK_MAX_REPORTED_ERRORS, BULK_MAX_LINE_BYTES
+from app.database import get_db, get_read_db
+from app.dependencies import get_current_user
+from app.permissions import MembershipMap, current_memberships
+from app.crud.workouts import (
+    workout_row,
+    group_workout_groups,
+    insert_workouts_batch,
+    list_workouts,
+    record_workout_change,
+    list_workout_changes,
+)
+from app.schemas.workout import (
+    WorkoutCreateAdapter,
+    BulkIngestResult,
+    BulkLineError,
+    WorkoutOut,
+    WorkoutSummaryOut,
+    UpdateLogEntry,
+    WorkoutChangeOut,
+    ExerciseMatchEnum,
+    ExerciseHistoryOut,
+)
+from app.schemas.pagination import Page, ViewEnum
+from app.serialization import page_response, object_response
+from app.services.exercise_search import find_workouts, exercise_history
+
+router = APIRouter(prefix="/workouts", tags=["workouts"])
+
+# Workout history of the current user, newest first, paginated with an opaque cursor
+@router.get("", response_model=Union[Page[WorkoutOut], Page[WorkoutSummaryOut]])
+def read_workouts(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    view: ViewEnum = ViewEnum.full,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user),
+):
+    summary = view == ViewEnum.summary
+    page = list_workouts(db, current_user.id, cursor, limit, since, until, summary=summary)
+    return page_response(page, WorkoutSummaryOut if summary else WorkoutOut)
+
+# Workouts of the current user containing any (or all) of the given exercises, newest first.
+# Names are matched case-insensitively against the planned exercises.
+@router.get("/by-exercise", response_model=Union[Page[WorkoutOut], Page[WorkoutSummaryOut]])
+def read_workouts_by_exercise(
+    name: List[str] = Query(min_length=1, max_length=20),
+    match: ExerciseMatchEnum = ExerciseMatchEnum.any,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    view: ViewEnum = ViewEnum.summary,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user),
+):
+    summary = view == ViewEnum.summary
+    page = find_workouts(db, current_user.id, name, match.value, cursor, limit, since, until, summary=summary)
+    return page_response(page, WorkoutSummaryOut if summary else WorkoutOut)
+
+# Planned and performed sets of one exercise across the current user's workouts, newest first
+@router.get("/exercise-history", response_model=Page[ExerciseHistoryOut])
+def read_exercise_history(
+    name: str = Query(min_length=1, max_length=120),
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user),
+):
+    return page_response(exercise_history(db, current_user.id, name, cursor, limit, since, until), ExerciseHistoryOut)
+
+# Collects per-line outcomes of a bulk upload while keeping the reported error list bounded
+class _BulkIngest:
+    def __init__(self, db: Session, memberships: MembershipMap):
+        self.db = db
+        self.memberships = memberships
+        self.user_id = memberships.user_id
+        self.result = BulkIngestResult()
+        self.rows = []
+        self.row_lines = []
+
+    def fail(self, line_no: int, errors: list):
+        self.result.failed += 1
+        if len(self.result.errors) < BULK_MAX_REPORTED_ERRORS:
+            self.result.errors.append(BulkLineError(line=line_no, errors=errors))
+        else:
+            self.result.errors_truncated = True
+
+    def add_line(self, line_no: int, line: bytes):
+        line = line.strip()
+        if not line:
+            return
+        self.result.received += 1
+        try:
+            workout_in = WorkoutCreateAdapter.validate_json(line)
+        except ValidationError as exc:
+            self.fail(line_no, exc.errors(include_url=False, include_context=False, include_input=False))
+            return
+        self.rows.append(workout_row(self.user_id, workout_in))
+        self.row_lines.append(line_no)
+
+    # Drop rows linked to a GroupWorkout of a group the user is not in (or that does not exist),
+    # one query per batch
+    def _check_templates(self, rows: list, row_lines: list) -> tuple:
+        groups = group_workout_groups(self.db, (row["group_workout_id"] for row in rows if row["group_workout_id"] is not None))
+        kept, kept_lines = [], []
+        for row, line_no in zip(rows, row_lines):
+            template_id = row["group_workout_id"]
+            if template_id is not None and not (template_id in groups and self.memberships.can_view_group(groups[template_id])):
+                self.fail(line_no, [{"type": "group_workout_not_found", "loc": ["group_workout_id"], "msg": "Group workout not found"}])
+                continue
+            kept.append(row)
+            kept_lines.append(line_no)
+        return kept, kept_lines
+
+    async def flush(self):
+        if not self.rows:
+            return
+        rows, row_lines = self.rows, self.row_lines
+        self.rows, self.row_lines = [], []
+        if any(row["group_workout_id"] is not None for row in rows):
+            rows, row_lines = await run_in_threadpool(self._check_templates, rows, row_lines)
+        inserted, failures = await run_in_threadpool(insert_workouts_batch, self.db, rows)
+        self.result.inserted += inserted
+        for index, message in failures:
+            self.fail(row_lines[index], [{"type": "database_error", "msg": message}])
+
+# Bulk upload of workouts as NDJSON (one WorkoutCreate object per line).
+# The body is consumed as a stream and inserted in chunks of BULK_BATCH_SIZE, each chunk in its
+# own transaction, so memory stays flat regardless of upload size. Invalid lines, including ones
+# whose group_workout_id is not a template of one of the user's groups, are reported with their
+# 1-based line number and do not stop the rest of the upload.
+@router.post("/bulk", response_model=BulkIngestResult)
+async def bulk_create_workouts(
+    request: Request,
+    db: Session = Depends(get_db),
+    memberships: MembershipMap = Depends(current_memberships),
+):
+    ingest = _BulkIngest(db, memberships)
+    buffer = b""
+    line_no = 0
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > BULK_MAX_LINE_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Line {line_no + len(lines) + 1} exceeds {BULK_MAX_LINE_BYTES} bytes",
+            )
+        for line in lines:
+            line_no += 1
+            ingest.add_line(line_no, line)
+        if len(ingest.rows) >= BULK_BATCH_SIZE:
+            await ingest.flush()
+
+    if buffer:
+        line_no += 1
+        ingest.add_line(line_no, buffer)
+    await ingest.flush()
+    return ingest.result
+
+# Append an entry (deload week, note, edit) to the change log of one of the current user's workouts
+@router.post("/{workout_id}/changes", response_model=WorkoutChangeOut, status_code=status.HTTP_201_CREATED)
+def add_workout_change(
+    workout_id: int,
+    entry: UpdateLogEntry,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+):
+    change = record_workout_change(db, current_user.id, workout_id, entry)
+    if change is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workout not found")
+    return object_response(change, WorkoutChangeOut, status_code=status.HTTP_201_CREATED)
+
+# Change log of one of the current user's workouts, newest first, paginated with an opaque cursor
+@router.get("/{workout_id}/changes", response_model=Page[WorkoutChangeOut])
+def read_workout_changes(
+    workout_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user),
+):
+    return page_response(list_workout_changes(db, current_user.id, workout_id, cursor, limit), WorkoutChangeOut)
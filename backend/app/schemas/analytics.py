@@ -0,0 +1,32 @@
+# Training-load analytics response schemas
+from datetime import date
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+# Best estimated one-rep max for an exercise on a given day
+class E1RMPoint(BaseModel):
+    date: date
+    e1rm: float
+
+
+# Daily series for one athlete, every list has one element per day from `since` to `until`
+class AthleteTrainingLoad(BaseModel):
+    user_id: int
+    total_tonnage: float
+    total_sets: int
+    tonnage: List[Optional[float]]
+    sets: List[int]
+    acute_load: List[Optional[float]]
+    chronic_load: List[Optional[float]]
+    acwr: List[Optional[float]]  # acute (7-day) / chronic (28-day) workload ratio
+    e1rm: Dict[str, List[E1RMPoint]]
+
+
+# Training-load report for one athlete or a whole group
+class TrainingLoadOut(BaseModel):
+    since: date
+    until: date
+    days: int
+    athletes: List[AthleteTrainingLoad]
@@ -0,0 +1,33 @@
+# Cold-storage archive schemas
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+# Tables whose old rows are moved to cold storage
+class ArchivedTableEnum(str, Enum):
+    mood_checkins = "mood_checkins"
+    journal_entries = "journal_entries"
+    workouts = "workouts"
+
+
+# One archived month of a table
+class ArchivePartitionOut(BaseModel):
+    table: ArchivedTableEnum
+    month: str  # YYYY-MM
+    parts: int
+    rows: int
+
+
+# Input schema for restoring archived rows, no tables means all of them
+class RehydrateRequest(BaseModel):
+    tables: Optional[List[ArchivedTableEnum]] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+
+# Rows restored per table
+class RehydrateOut(BaseModel):
+    rows: Dict[str, int]
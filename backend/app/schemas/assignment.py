@@ -0,0 +1,18 @@
+# Assignment (GroupWorkout/GroupTest fan-out) schemas
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+# Outcome of an assignment, id is set when it runs as a background job
+class AssignmentOut(BaseModel):
+    id: Optional[str] = None
+    kind: str
+    status: str
+    total: int  # athletes in the group
+    done: int  # athletes processed so far
+    created: int  # new athlete copies, athletes that already had one are skipped
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
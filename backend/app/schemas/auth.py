@@ -5,7 +5,14 @@ class Login(BaseModel):
     email: EmailStr
     password: str = Field(min_length=8)
 
-# Schema for authentication token response
+# Schema for authentication token response. refresh_token renews the pair at /auth/refresh and
+# is replaced on every use
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    expires_in: int  # access token lifetime in seconds
+    refresh_token: str
+
+# Schema for renewing tokens or logging out with a refresh token
+class RefreshRequest(BaseModel):
+    refresh_token: str = Field(min_length=1, max_length=200)
@@ -39,3 +39,14 @@ class GroupWorkoutOut(BaseModel):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+# Output schema for listing GroupWorkouts without the exercises JSON
+class GroupWorkoutSummaryOut(BaseModel):
+    id: int
+    group_id: int
+    title: str
+    start_date: Optional[datetime]
+    end_date: Optional[datetime]
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,47 @@
+# Journal entry schemas
+from datetime import datetime
+from enum import Enum
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Output schema for returning a journal entry
+class JournalEntryOut(BaseModel):
+    id: int
+    user_id: int
+    entry: str
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Timeline view of a journal entry, only the first characters of the text
+class JournalEntrySummaryOut(BaseModel):
+    id: int
+    user_id: int
+    preview: str
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Input schema for writing a journal entry
+class JournalEntryCreate(BaseModel):
+    entry: str = Field(min_length=1, max_length=20000)
+
+
+# Ordering of search results, by relevance or newest first
+class SearchOrderEnum(str, Enum):
+    rank = "rank"
+    recent = "recent"
+
+
+# Journal entry matching a search, rank is higher for better matches
+class JournalSearchHitOut(BaseModel):
+    id: int
+    user_id: int
+    entry: str
+    created_at: datetime
+    rank: float
+
+    model_config = ConfigDict(from_attributes=True)
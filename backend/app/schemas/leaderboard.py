@@ -0,0 +1,36 @@
+# Leaderboard response schemas
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from .test import MetricTypeEnum
+
+
+# One ranked athlete, value is in the canonical unit of the metric
+class LeaderboardEntry(BaseModel):
+    user_id: int
+    rank: int
+    value: float
+
+
+# Top of a leaderboard for one parameter/metric of a group test
+class LeaderboardOut(BaseModel):
+    group_test_id: int
+    parameter: str
+    metric: MetricTypeEnum
+    unit: Optional[str] = None
+    entries: List[LeaderboardEntry]
+
+
+# Position of a single athlete on a leaderboard
+class LeaderboardStanding(LeaderboardEntry):
+    total: int
+    percentile: float
+
+
+# Parameter/metric combination that has a leaderboard
+class LeaderboardInfo(BaseModel):
+    parameter: str
+    metric: MetricTypeEnum
+    unit: Optional[str] = None
+    athletes: int
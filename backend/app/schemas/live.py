@@ -0,0 +1,21 @@
+# Live group-session event schemas
+from typing import Optional
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+from .workout import SetEntry
+
+
+# A set an athlete just completed, published to the coaches watching the group
+class LiveSetIn(SetEntry):
+    workout_id: Optional[int] = Field(default=None, description="Athlete's Workout the set belongs to")
+    exercise: str = Field(min_length=1, max_length=120)
+
+
+# Validator for WebSocket messages, built once and reused
+LiveSetInAdapter = TypeAdapter(LiveSetIn)
+
+
+# Result of publishing over HTTP
+class LivePublishOut(BaseModel):
+    subscribers: int
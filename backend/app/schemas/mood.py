@@ -0,0 +1,67 @@
+# Mood check-in schemas
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Output schema for returning a mood check-in, e.g. mood={"energy": 7, "stress": 3, "focus": 8}
+class MoodCheckInOut(BaseModel):
+    id: int
+    user_id: int
+    mood: Dict[str, float]
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Input schema for a mood check-in, dimension names map to numeric ratings
+class MoodCheckInCreate(BaseModel):
+    mood: Dict[str, float] = Field(min_length=1)
+
+
+# One check-in value of a dimension
+class MoodPoint(BaseModel):
+    t: datetime
+    value: Optional[float]
+
+
+# Trailing-window mean and variance of a dimension on one day
+class MoodRollingPoint(BaseModel):
+    date: date
+    mean: Optional[float]
+    variance: Optional[float]
+
+
+# Downsampled chart series of one dimension, count/mean/std cover every check-in in range
+class MoodDimensionSeries(BaseModel):
+    count: int
+    mean: Optional[float]
+    std: Optional[float]
+    points: List[MoodPoint]
+    rolling: List[MoodRollingPoint]
+
+
+# Mood chart of one user
+class MoodChartOut(BaseModel):
+    since: date
+    until: date
+    days: int
+    window: int
+    check_ins: int
+    dimensions: Dict[str, MoodDimensionSeries]
+
+
+# Pearson correlation of a dimension's daily mean with daily training volume, None if too few days
+class MoodCorrelation(BaseModel):
+    days: int
+    tonnage: Optional[float]
+    sets: Optional[float]
+
+
+# Mood vs training volume, lag=N compares mood with training N days earlier
+class MoodCorrelationOut(BaseModel):
+    since: date
+    until: date
+    lag: int
+    dimensions: Dict[str, MoodCorrelation]
@@ -0,0 +1,22 @@
+# Metric observation schemas
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from app.models.models import ObservationSourceEnum
+
+
+# A single typed measurement mirrored from a test, workout set or mood check-in
+class ObservationOut(BaseModel):
+    id: int
+    source: ObservationSourceEnum
+    source_id: int
+    name: str
+    metric_type: str
+    value: float
+    unit: Optional[str] = None
+    set_index: Optional[int] = None
+    observed_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,19 @@
+# Generic page schema for cursor-paginated list endpoints
+from enum import Enum
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+# One page of results, pass next_cursor back as ?cursor= to get the following page
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+# Projection of list endpoints, "summary" leaves out heavy JSON/text columns for timeline views
+class ViewEnum(str, Enum):
+    full = "full"
+    summary = "summary"
@@ -0,0 +1,46 @@
+# Team roster schemas
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.models.models import RoleEnum
+
+
+# A user's membership as shown on a roster
+class RosterMember(BaseModel):
+    user_id: int
+    name: str
+    email: str
+    role: RoleEnum
+    is_team_admin: bool = False
+    joined_at: Optional[datetime] = None
+
+
+# A group with its members
+class RosterGroup(BaseModel):
+    id: int
+    name: str
+    members: List[RosterMember]
+
+
+# Full roster of a team, unassigned holds team memberships without a group
+class TeamRosterOut(BaseModel):
+    id: int
+    name: str
+    city: Optional[str] = None
+    groups: List[RosterGroup]
+    unassigned: List[RosterMember]
+
+
+# Data sets of a team export
+class ExportKindEnum(str, Enum):
+    workouts = "workouts"
+    tests = "tests"
+
+
+# File formats of a team export
+class ExportFormatEnum(str, Enum):
+    csv = "csv"
+    parquet = "parquet"
@@ -1,8 +1,9 @@
 # Test data validation and serialization schemas
 from datetime import datetime
+from types import MappingProxyType
 from typing import List, Optional
 
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
 from enum import Enum
 
 # Enum for metrics types
@@ -50,17 +51,58 @@ METRIC_UNITS = {
     # reps, heart_rate, rpe are unitless
 }
 
+# Canonical unit per metric type, results are converted to these before being compared
+CANONICAL_UNITS = {
+    MetricTypeEnum.weight: WeightEnum.kilograms.value,
+    MetricTypeEnum.distance: DistanceEnum.meters.value,
+    MetricTypeEnum.time: TimeEnum.seconds.value,
+    MetricTypeEnum.height: HeightEnum.centymeters.value,
+    MetricTypeEnum.length: LengthEnum.centymeters.value,
+}
+
+# Multiplier from a unit to the canonical unit of its metric type
+UNIT_FACTORS = {
+    (MetricTypeEnum.weight, "kg"): 1.0,
+    (MetricTypeEnum.weight, "lb"): 0.45359237,
+    (MetricTypeEnum.distance, "m"): 1.0,
+    (MetricTypeEnum.distance, "km"): 1000.0,
+    (MetricTypeEnum.distance, "mi"): 1609.344,
+    (MetricTypeEnum.distance, "yd"): 0.9144,
+    (MetricTypeEnum.time, "s"): 1.0,
+    (MetricTypeEnum.time, "min"): 60.0,
+    (MetricTypeEnum.time, "h"): 3600.0,
+    (MetricTypeEnum.height, "cm"): 1.0,
+    (MetricTypeEnum.height, "in"): 2.54,
+    (MetricTypeEnum.length, "cm"): 1.0,
+    (MetricTypeEnum.length, "m"): 100.0,
+    (MetricTypeEnum.length, "in"): 2.54,
+}
+
+# Convert a value to the canonical unit of its metric type, unitless metrics are returned as is
+def to_canonical(metric_type: MetricTypeEnum, value: float, unit: Optional[str]) -> float:
+    metric_type = MetricTypeEnum(metric_type)
+    if metric_type not in CANONICAL_UNITS:
+        return float(value)
+    factor = UNIT_FACTORS.get((metric_type, unit))
+    if factor is None:
+        raise ValueError(f"Cannot convert unit '{unit}' for metric type '{metric_type.value}'")
+    return float(value) * factor
+
+# Allowed units per metric type, computed once. Unitless types (reps, heart_rate, rpe) map to an empty set.
+ALLOWED_UNITS = MappingProxyType({
+    metric_type: frozenset(e.value for e in METRIC_UNITS[metric_type]) if metric_type in METRIC_UNITS else frozenset()
+    for metric_type in MetricTypeEnum
+})
+
 # Helper function to validate unit based on metric type
 def validate_unit_for_type(metric_type: MetricTypeEnum, unit: Optional[str]) -> Optional[str]:
-    unit_enum = METRIC_UNITS.get(metric_type)
+    allowed = ALLOWED_UNITS[metric_type]
 
-    if unit_enum:
-        allowed = {e.value for e in unit_enum}
+    if allowed:
         if unit not in allowed:
-            raise ValueError(f"Invalid unit '{unit}' for metric type '{metric_type}'. Allowed: {allowed}")
-    else:
-        if unit is not None:
-            raise ValueError(f"Metric type '{metric_type}' should not have a unit")
+            raise ValueError(f"Invalid unit '{unit}' for metric type '{MetricTypeEnum(metric_type).value}'. Allowed: {sorted(allowed)}")
+    elif unit is not None:
+        raise ValueError(f"Metric type '{MetricTypeEnum(metric_type).value}' should not have a unit")
 
     return unit
 
@@ -69,13 +111,11 @@ class MetricEntry(BaseModel):
     type: MetricTypeEnum
     unit: Optional[str] = None  # Unit depends on type
 
-    @field_validator("unit")
-    @classmethod
-    def validate_unit(cls, v, values):
-        metric_type = values.get("type")
-        if metric_type is None:
-            return v
-        return validate_unit_for_type(metric_type, v)
+    # Checked once the whole entry is parsed, so the type is always available
+    @model_validator(mode="after")
+    def validate_unit(self):
+        validate_unit_for_type(self.type, self.unit)
+        return self
 
 # Schema for parameters of a test
 class TestParameter(BaseModel):
@@ -96,13 +136,11 @@ class MetricResult(BaseModel):
     value: float = Field(..., ge=0)
     unit: Optional[str] = None  # Unit depends on type
 
-    @field_validator("unit")
-    @classmethod
-    def validate_unit(cls, v, values):
-        metric_type = values.get("type")
-        if metric_type is None:
-            return v
-        return validate_unit_for_type(metric_type, v)
+    # Checked once the whole entry is parsed, so the type is always available
+    @model_validator(mode="after")
+    def validate_unit(self):
+        validate_unit_for_type(self.type, self.unit)
+        return self
     
 #base schema for Test, shared by create and update schemas
 class TestBase(BaseModel):
@@ -153,4 +191,4 @@ class TestOut(TestBase):
     taken_at: Optional[datetime] = None
     results: Optional[List[MetricResult]] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
@@ -1,8 +1,9 @@
 # Workout data validation and serialization schemas
 from datetime import datetime
-from typing import List, Optional, Annotated
+from enum import Enum
+from typing import Any, List, Optional, Annotated
 
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, field_validator
 
 
 # SetEntry schema for individual set details in an exercise
@@ -58,7 +59,7 @@ class WorkoutBase(BaseModel):
     )
 
 
-# Schema for creating a new Workout
+# Schema for creating a new Workout, update_log entries are stored as the first change log rows
 class WorkoutCreate(WorkoutBase):
     exercises: List[Exercise]
     results: Optional[List[ExerciseResult]] = None
@@ -80,10 +81,10 @@ class WorkoutUpdate(BaseModel):
     end_date: Optional[datetime] = None
     exercises: Optional[List[Exercise]] = None
     results: Optional[List[ExerciseResult]] = None
-    update_log: Optional[List[UpdateLogEntry]] = None
 
 
-# Output schema for returning Workout data to clients
+# Output schema for returning Workout data to clients, the change log is paginated separately
+# (GET /workouts/{id}/changes)
 class WorkoutOut(BaseModel):
     id: int
     user_id: int
@@ -94,7 +95,68 @@ class WorkoutOut(BaseModel):
     end_date: Optional[datetime]
     exercises: List[Exercise]
     results: Optional[List[ExerciseResult]] = None
-    update_log: Optional[List[UpdateLogEntry]] = None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# Output schema for one entry of a workout's change log
+class WorkoutChangeOut(BaseModel):
+    id: int
+    workout_id: int
+    at: datetime
+    change: str
+    meta: Optional[dict] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Validator for WorkoutCreate built once and reused, validate_json parses and validates a raw line in one pass
+WorkoutCreateAdapter = TypeAdapter(WorkoutCreate)
+
+
+# Error reported for a single NDJSON line of a bulk upload
+class BulkLineError(BaseModel):
+    line: int
+    errors: List[Any]
+
+
+# Result of a bulk NDJSON workout upload
+class BulkIngestResult(BaseModel):
+    received: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[BulkLineError] = []
+    errors_truncated: bool = False
+
+
+# Lightweight timeline view of a Workout without the exercises/results JSON
+class WorkoutSummaryOut(BaseModel):
+    id: int
+    user_id: int
+    group_workout_id: Optional[int]
+    title: str
+    start_date: Optional[datetime]
+    end_date: Optional[datetime]
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# How several exercise names are matched: workouts containing any of them, or all of them
+class ExerciseMatchEnum(str, Enum):
+    any = "any"
+    all = "all"
+
+
+# One workout in the history of an exercise, with the planned and performed sets of that exercise
+class ExerciseHistoryOut(BaseModel):
+    id: int
+    title: str
+    start_date: Optional[datetime]
+    created_at: datetime
+    planned: List[SetEntry]
+    performed: List[SetEntry]
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,48 @@
+# Fast response path for read endpoints.
+#
+# Rows read from the database were validated when they were written, so read endpoints can skip
+# pydantic re-validation of the nested exercises/results JSON: trusted_dump() copies the fields of
+# an output schema straight off the ORM object (or row) and the result is encoded with orjson.
+# FAST_JSON_RESPONSES=false switches back to full validation through the schema.
+
+from typing import Any, Dict, Iterable, List, Tuple, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from app.config import FAST_JSON_RESPONSES
+from app.schemas.pagination import Page
+
+_FIELDS: Dict[Type[BaseModel], Tuple[str, ...]] = {}
+
+def _fields(schema: Type[BaseModel]) -> Tuple[str, ...]:
+    fields = _FIELDS.get(schema)
+    if fields is None:
+        fields = _FIELDS[schema] = tuple(schema.model_fields)
+    return fields
+
+# Plain dict with the schema's fields taken from obj as is, without validation
+def trusted_dump(obj: Any, schema: Type[BaseModel]) -> dict:
+    return {name: getattr(obj, name, None) for name in _fields(schema)}
+
+def trusted_dump_many(objs: Iterable[Any], schema: Type[BaseModel]) -> List[dict]:
+    fields = _fields(schema)
+    return [{name: getattr(obj, name, None) for name in fields} for obj in objs]
+
+# Response for a single DB-sourced object
+def object_response(obj: Any, schema: Type[BaseModel], status_code: int = 200):
+    if FAST_JSON_RESPONSES:
+        return ORJSONResponse(trusted_dump(obj, schema), status_code=status_code)
+    return schema.model_validate(obj, from_attributes=True)
+
+# Response for a page produced by app.pagination.paginate
+def page_response(page: dict, schema: Type[BaseModel]):
+    if FAST_JSON_RESPONSES:
+        return ORJSONResponse({"items": trusted_dump_many(page["items"], schema), "next_cursor": page["next_cursor"]})
+    return Page[schema].model_validate(page, from_attributes=True)
+
+# Response for content computed by the server itself (e.g. analytics reports)
+def trusted_response(content: Any):
+    if FAST_JSON_RESPONSES:
+        return ORJSONResponse(content)
+    return content
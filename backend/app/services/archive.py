@@ -0,0 +1,351 @@
+# Cold-storage archival of raw history.
+#
+# Whole months of mood check-ins, journal entries and workouts older than ARCHIVE_AFTER_DAYS are
+# moved out of the hot tables into zstd-compressed Parquet files, once the user's Summary rows
+# cover them (the rollup watermark is past the archived range). Files are partitioned as
+#
+#   ARCHIVE_DIR/<table>/user_id=<id>/month=<YYYY-MM>/part-<first id>-<last id>.parquet
+#
+# and every partition has a manifest.json listing its parts, row counts and id ranges. Rows are
+# archived in batches: the part file is written and fsynced, the manifest updated, and only then
+# are the rows deleted and the batch committed. A crash in between leaves rows both on disk and in
+# the table, which rehydration tolerates because it skips ids that still exist.
+#
+# Rehydration inserts an archived range back with its original ids and removes its files. List
+# and search endpoints call ensure_range() so a `since` reaching into archived months rehydrates
+# them transparently. Several workers may try to rehydrate the same month at once: on Postgres
+# each partition is restored under a transaction-scoped advisory lock, and whoever gets it second
+# finds the rows present (or the files gone) and skips them; inserts also ignore ids that already
+# exist. A workout's change log is archived and restored together with the workout.
+# MetricObservation rows of archived workouts and check-ins are kept.
+#
+# Usage:
+#   python -m app.services.archive run [--user-id ID ...] [--after-days N]
+#   python -m app.services.archive rehydrate --user-id ID [--table T] [--since DATE] [--until DATE]
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import orjson
+from sqlalchemy import JSON, Boolean, DateTime, Float, Integer, delete, func, insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.config import ARCHIVE_DIR, ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+from app.database import SessionLocal, use_primary
+from app.models.models import User, MoodCheckIn, JournalEntry, Workout, WorkoutChange, SummaryWatermark, PeriodEnum
+from app.services.journal_search import journal_index
+from app.services.rollup import period_start, period_end, rollup_user
+
+# Tables moved to cold storage, keyed by table name
+ARCHIVED_MODELS = {model.__tablename__: model for model in (MoodCheckIn, JournalEntry, Workout)}
+
+# Rows that would be lost through ON DELETE CASCADE, archived into the parent's month partition:
+# parent table -> (child model, foreign key column)
+ARCHIVED_CHILDREN = {Workout.__tablename__: (WorkoutChange, "workout_id")}
+
+MANIFEST = "manifest.json"
+
+# Serializes rehydration within a worker, across workers see _lock_partition
+_rehydrate_lock = threading.Lock()
+
+def _month(moment: datetime) -> str:
+    return moment.strftime("%Y-%m")
+
+def _month_range(month: str) -> tuple:
+    start = datetime.strptime(month, "%Y-%m")
+    return start, period_end(start, PeriodEnum.monthly)
+
+def _user_dir(table: str, user_id: int) -> str:
+    return os.path.join(ARCHIVE_DIR, table, f"user_id={user_id}")
+
+def partition_dir(table: str, user_id: int, month: str) -> str:
+    return os.path.join(_user_dir(table, user_id), f"month={month}")
+
+def read_manifest(directory: str) -> dict:
+    try:
+        with open(os.path.join(directory, MANIFEST)) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {"parts": []}
+
+# Replace the manifest atomically so readers never see a partial file
+def _write_manifest(directory: str, manifest: dict):
+    path = os.path.join(directory, MANIFEST)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as fh:
+        json.dump(manifest, fh, indent=1, default=str)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+# Arrow type of a column, JSON documents are stored as JSON text
+def _arrow_type(column):
+    import pyarrow as pa
+
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+def _json_columns(model) -> List[str]:
+    return [column.name for column in model.__table__.columns if isinstance(column.type, JSON)]
+
+# Write one part file of a partition and register it in the manifest
+def _write_part(model, user_id: int, month: str, rows: List[dict]) -> dict:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = list(model.__table__.columns)
+    json_columns = set(_json_columns(model))
+    schema = pa.schema([(column.name, _arrow_type(column)) for column in columns])
+    data = {
+        column.name: [
+            orjson.dumps(row[column.name]).decode() if column.name in json_columns and row[column.name] is not None else row[column.name]
+            for row in rows
+        ]
+        for column in columns
+    }
+
+    directory = partition_dir(model.__tablename__, user_id, month)
+    os.makedirs(directory, exist_ok=True)
+    ids = [row["id"] for row in rows]
+    name = f"part-{min(ids)}-{max(ids)}.parquet"
+    path = os.path.join(directory, name)
+    pq.write_table(pa.table(data, schema=schema), path + ".tmp", compression="zstd")
+    with open(path + ".tmp", "rb") as fh:
+        os.fsync(fh.fileno())
+    os.replace(path + ".tmp", path)
+
+    part = {
+        "file": name,
+        "rows": len(rows),
+        "min_id": min(ids),
+        "max_id": max(ids),
+        "archived_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    manifest = read_manifest(directory)
+    manifest.update(table=model.__tablename__, user_id=user_id, month=month)
+    manifest["parts"] = [p for p in manifest["parts"] if p["file"] != name] + [part]
+    _write_manifest(directory, manifest)
+    return part
+
+# Move one user's rows of one table created before `before` to Parquet, returns rows archived
+def archive_table(db: Session, model, user_id: int, before: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    columns = list(model.__table__.columns)
+    archived = 0
+    last = None
+    while True:
+        query = select(*columns).where(model.user_id == user_id, model.created_at < before)
+        if last is not None:
+            query = query.where(tuple_(model.created_at, model.id) > tuple_(*last))
+        batch = [dict(row._mapping) for row in db.execute(query.order_by(model.created_at, model.id).limit(batch_size))]
+        if not batch:
+            return archived
+
+        by_month: Dict[str, List[dict]] = {}
+        for row in batch:
+            by_month.setdefault(_month(row["created_at"]), []).append(row)
+        for month, rows in by_month.items():
+            _write_part(model, user_id, month, rows)
+        _archive_children(db, model, user_id, batch)
+
+        db.execute(delete(model).where(model.id.in_([row["id"] for row in batch])))
+        db.commit()
+        archived += len(batch)
+        last = (batch[-1]["created_at"], batch[-1]["id"])
+
+# Write the child rows of an archived batch next to their parents, before the parents are deleted
+def _archive_children(db: Session, model, user_id: int, batch: List[dict]):
+    if model.__tablename__ not in ARCHIVED_CHILDREN:
+        return
+    child, foreign_key = ARCHIVED_CHILDREN[model.__tablename__]
+    parent_month = {row["id"]: _month(row["created_at"]) for row in batch}
+    rows = db.execute(
+        select(*child.__table__.columns).where(getattr(child, foreign_key).in_(list(parent_month))).order_by(child.id)
+    )
+    by_month: Dict[str, List[dict]] = {}
+    for row in rows:
+        row = dict(row._mapping)
+        by_month.setdefault(parent_month[row[foreign_key]], []).append(row)
+    for month, rows in by_month.items():
+        _write_part(child, user_id, month, rows)
+
+# Start of the oldest month that stays in the hot tables
+def archive_horizon(after_days: int = ARCHIVE_AFTER_DAYS, now: Optional[datetime] = None) -> datetime:
+    return period_start((now or datetime.now()) - timedelta(days=after_days), PeriodEnum.monthly)
+
+# Roll up the user, then archive every table up to the horizon. Users whose summaries do not
+# cover the horizon yet are skipped.
+def archive_user(db: Session, user_id: int, before: datetime) -> Dict[str, int]:
+    rollup_user(db, user_id)
+    watermark = db.get(SummaryWatermark, user_id)
+    if watermark is None or watermark.summarized_until < before:
+        return {}
+    counts = {table: archive_table(db, model, user_id, before) for table, model in ARCHIVED_MODELS.items()}
+    if counts.get(JournalEntry.__tablename__):
+        journal_index.invalidate_user(user_id)
+    return counts
+
+def archive_all(user_ids: Optional[List[int]] = None, after_days: int = ARCHIVE_AFTER_DAYS) -> dict:
+    started = time.perf_counter()
+    before = archive_horizon(after_days)
+    totals = {table: 0 for table in ARCHIVED_MODELS}
+    db = SessionLocal()
+    try:
+        if user_ids is None:
+            user_ids = list(db.execute(select(User.id).order_by(User.id)).scalars())
+        for user_id in user_ids:
+            for table, count in archive_user(db, user_id, before).items():
+                totals[table] += count
+    finally:
+        db.close()
+    return {"before": before, "users": len(user_ids), "rows": totals, "seconds": round(time.perf_counter() - started, 3)}
+
+# Archived months of one user's table, oldest first
+def archived_months(table: str, user_id: int) -> List[str]:
+    try:
+        names = os.listdir(_user_dir(table, user_id))
+    except FileNotFoundError:
+        return []
+    return sorted(name[len("month="):] for name in names if name.startswith("month="))
+
+# Partitions of a user, for listing what is in cold storage
+def describe_archive(user_id: int) -> List[dict]:
+    out = []
+    for table in ARCHIVED_MODELS:
+        for month in archived_months(table, user_id):
+            parts = read_manifest(partition_dir(table, user_id, month))["parts"]
+            out.append({"table": table, "month": month, "parts": len(parts), "rows": sum(p["rows"] for p in parts)})
+    return out
+
+def _overlaps(month: str, since: Optional[datetime], until: Optional[datetime]) -> bool:
+    start, end = _month_range(month)
+    return (since is None or end > since) and (until is None or start < until)
+
+# Insert the archived rows of one partition back without committing, returns rows restored
+def _restore_parts(db: Session, model, directory: str) -> int:
+    import pyarrow.parquet as pq
+
+    json_columns = _json_columns(model)
+    restored = 0
+    for part in read_manifest(directory)["parts"]:
+        path = os.path.join(directory, part["file"])
+        try:
+            rows = pq.read_table(path).to_pylist()
+        except FileNotFoundError:
+            # removed by a worker that already committed these rows
+            continue
+        for row in rows:
+            for name in json_columns:
+                if row[name] is not None:
+                    row[name] = orjson.loads(row[name])
+        existing = set(db.execute(select(model.id).where(model.id.in_([row["id"] for row in rows]))).scalars())
+        rows = [row for row in rows if row["id"] not in existing]
+        if rows:
+            db.execute(_insert_missing(db, model), rows)
+        restored += len(rows)
+    return restored
+
+# INSERT that skips rows whose id already exists, where the dialect supports it
+def _insert_missing(db: Session, model):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing(index_elements=["id"])
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing(index_elements=["id"])
+    return insert(model)
+
+# Lock one partition for the rest of the transaction across all workers (Postgres advisory lock
+# keyed by table, user and month). Other databases only have the in-process _rehydrate_lock.
+def _lock_partition(db: Session, table: str, user_id: int, month: str):
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    digest = hashlib.blake2b(f"archive/{table}/{user_id}/{month}".encode(), digest_size=8).digest()
+    db.execute(select(func.pg_advisory_xact_lock(int.from_bytes(digest, "big", signed=True))))
+
+# Restore one archived month of a table (and its child rows) and delete its files
+def _rehydrate_partition(db: Session, model, user_id: int, month: str) -> int:
+    directory = partition_dir(model.__tablename__, user_id, month)
+    child = ARCHIVED_CHILDREN[model.__tablename__][0] if model.__tablename__ in ARCHIVED_CHILDREN else None
+    child_directory = partition_dir(child.__tablename__, user_id, month) if child is not None else None
+
+    _lock_partition(db, model.__tablename__, user_id, month)
+    # another worker restored the partition while this one waited for the lock
+    if not os.path.isdir(directory) and not (child_directory and os.path.isdir(child_directory)):
+        db.commit()
+        return 0
+    restored = _restore_parts(db, model, directory)
+    if child is not None:
+        _restore_parts(db, child, child_directory)
+    db.commit()
+    shutil.rmtree(directory, ignore_errors=True)
+    if child_directory is not None:
+        shutil.rmtree(child_directory, ignore_errors=True)
+    return restored
+
+# Bring an archived range of one table back into the database, returns rows restored
+def rehydrate(db: Session, model, user_id: int, since: Optional[datetime] = None, until: Optional[datetime] = None) -> int:
+    table = model.__tablename__
+    restored = 0
+    with _rehydrate_lock:
+        for month in archived_months(table, user_id):
+            if _overlaps(month, since, until):
+                restored += _rehydrate_partition(db, model, user_id, month)
+    if restored and model is JournalEntry:
+        journal_index.invalidate_user(user_id)
+    return restored
+
+# Hook for list endpoints: rehydrate the archived months a since/until range reaches into. Costs
+# one directory listing when nothing is archived; without `since` nothing is rehydrated.
+def ensure_range(db: Session, model, user_id: int, since: Optional[datetime], until: Optional[datetime]) -> int:
+    if since is None or not archived_months(model.__tablename__, user_id):
+        return 0
+    # rehydration reads then inserts, and the page read after it must see the restored rows
+    use_primary(db)
+    return rehydrate(db, model, user_id, since, until)
+
+def _date(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old raw history to Parquet files and back")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="archive rows older than the horizon")
+    run_parser.add_argument("--user-id", type=int, action="append", dest="user_ids", help="only archive these users")
+    run_parser.add_argument("--after-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    rehydrate_parser = subparsers.add_parser("rehydrate", help="restore archived rows of one user")
+    rehydrate_parser.add_argument("--user-id", type=int, required=True)
+    rehydrate_parser.add_argument("--table", choices=sorted(ARCHIVED_MODELS), action="append", dest="tables")
+    rehydrate_parser.add_argument("--since", type=_date)
+    rehydrate_parser.add_argument("--until", type=_date)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = archive_all(args.user_ids, args.after_days)
+        rows = ", ".join(f"{table}: {count}" for table, count in report["rows"].items())
+        print(f"Archived rows created before {report['before']:%Y-%m-%d} for {report['users']} users in {report['seconds']}s ({rows})")
+        return
+
+    db = SessionLocal()
+    try:
+        for table in args.tables or sorted(ARCHIVED_MODELS):
+            count = rehydrate(db, ARCHIVED_MODELS[table], args.user_id, args.since, args.until)
+            print(f"{table}: {count} rows restored")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# "Which workouts contain exercise X" lookups over the exercises JSON of workouts and group workouts.
+#
+# On Postgres the exercises columns are JSONB and migration 0004 adds exercise_names(jsonb), an
+# immutable SQL function returning the distinct lowercased exercise names of a list as text[],
+# with a GIN index on exercise_names(exercises) for both tables. "Contains all of these names"
+# (@>) and "contains any of them" (&&) are answered from that index, so only matching rows are
+# read and decoded. Queries must call the function exactly as the index
+# expression does, which is what _names_match() builds.
+#
+# Other databases (SQLite test runs) run the same filter as a correlated json_each() subquery.
+# It is evaluated in SQL but without an index.
+#
+# Names are compared trimmed and lowercased, like MetricObservation.name. The match is on the
+# planned exercises, which is what the index covers; history entries also carry the performed
+# sets recorded for the exercise in results.
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Text, distinct, exists, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from app.crud.workouts import WORKOUT_SUMMARY_COLUMNS
+from app.models.models import Workout, GroupWorkout
+from app.pagination import paginate
+from app.services.archive import ensure_range
+
+# Name of the SQL function of migration 0004, also the indexed expression
+NAMES_FUNCTION = "exercise_names"
+
+# One workout in the history of an exercise
+@dataclass
+class HistoryEntry:
+    id: int
+    title: str
+    start_date: Optional[datetime]
+    created_at: datetime
+    planned: List[dict]
+    performed: List[dict]
+
+def normalize_names(names: Sequence[str]) -> List[str]:
+    return sorted({name.strip().lower() for name in names if name and name.strip()})
+
+def _uses_jsonb(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+# WHERE clause matching rows whose exercises column lists all (match="all") or any of names
+def _names_match(db: Session, column, names: List[str], match: str):
+    if _uses_jsonb(db):
+        indexed = getattr(func, NAMES_FUNCTION)(column, type_=ARRAY(Text))
+        return indexed.contains(names) if match == "all" else indexed.overlap(names)
+
+    elements = func.json_each(column).table_valued("value").alias("exercise")
+    name = func.lower(func.trim(func.json_extract(elements.c.value, "$.name")))
+    if match == "all":
+        found = select(func.count(distinct(name))).select_from(elements).where(name.in_(names))
+        return found.scalar_subquery() == len(names)
+    return exists(select(1).select_from(elements).where(name.in_(names)))
+
+# Sets of the exercises named name in a workout's exercises or results, in list order
+def exercise_sets(exercises: Optional[list], name: str) -> List[dict]:
+    sets = []
+    for exercise in exercises or []:
+        if (exercise.get("name") or "").strip().lower() == name:
+            sets.extend(exercise.get("sets") or [])
+    return sets
+
+# One page of the user's workouts that contain the named exercises, newest first.
+# summary=True skips the exercises/results JSON of the matches.
+def find_workouts(
+    db: Session,
+    user_id: int,
+    names: Sequence[str],
+    match: str = "any",
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    summary: bool = True,
+) -> dict:
+    names = normalize_names(names)
+    if not names:
+        return {"items": [], "next_cursor": None}
+    ensure_range(db, Workout, user_id, since, until)
+    query = select(*WORKOUT_SUMMARY_COLUMNS) if summary else select(Workout)
+    query = query.where(Workout.user_id == user_id, _names_match(db, Workout.exercises, names, match))
+    return paginate(db, query, Workout, cursor, limit, since, until, scalars=not summary)
+
+# One page of a group's workout templates that contain the named exercises, newest first
+def find_group_workouts(
+    db: Session,
+    group_id: int,
+    names: Sequence[str],
+    match: str = "any",
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> dict:
+    names = normalize_names(names)
+    if not names:
+        return {"items": [], "next_cursor": None}
+    query = select(
+        GroupWorkout.id,
+        GroupWorkout.group_id,
+        GroupWorkout.title,
+        GroupWorkout.start_date,
+        GroupWorkout.end_date,
+        GroupWorkout.created_at,
+    ).where(GroupWorkout.group_id == group_id, _names_match(db, GroupWorkout.exercises, names, match))
+    return paginate(db, query, GroupWorkout, cursor, limit, scalars=False)
+
+# History of one exercise for a user, newest workout first: the planned and performed sets of the
+# exercise in every workout that contains it. Only the JSON of the matching page is read.
+def exercise_history(
+    db: Session,
+    user_id: int,
+    name: str,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> dict:
+    names = normalize_names([name])
+    if not names:
+        return {"items": [], "next_cursor": None}
+    ensure_range(db, Workout, user_id, since, until)
+    query = select(
+        Workout.id,
+        Workout.title,
+        Workout.start_date,
+        Workout.created_at,
+        Workout.exercises,
+        Workout.results,
+    ).where(Workout.user_id == user_id, _names_match(db, Workout.exercises, names, "all"))
+    page = paginate(db, query, Workout, cursor, limit, since, until, scalars=False)
+    page["items"] = [
+        HistoryEntry(
+            id=row.id,
+            title=row.title,
+            start_date=row.start_date,
+            created_at=row.created_at,
+            planned=exercise_sets(row.exercises, names[0]),
+            performed=exercise_sets(row.results, names[0]),
+        )
+        for row in page["items"]
+    ]
+    return page
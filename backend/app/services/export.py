@@ -0,0 +1,249 @@
+# Constant-memory export of a team's workouts and tests as CSV or Parquet.
+#
+# Source rows are read with a server-side cursor (stream_results + yield_per), so at most one
+# batch of Workout/Test JSON is in memory at a time. Every batch is flattened to one output row per
+# set (workouts) or per result (tests) and written out immediately: CSV text chunks, or one Parquet
+# row group per batch. Memory use therefore depends on EXPORT_BATCH_SIZE, not on team size.
+#
+# Usage: python -m app.services.export --team-id ID [--kind workouts|tests] [--format csv|parquet] [-o FILE]
+
+import argparse
+import csv
+import io
+import logging
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import EXPORT_BATCH_SIZE
+from app.database import SessionLocal
+from app.models.models import Workout, Test, UserTeams, RoleEnum
+from app.services.leaderboards import result_keys
+
+logger = logging.getLogger("app.export")
+
+WORKOUT_COLUMNS = (
+    ("workout_id", "int64"),
+    ("user_id", "int64"),
+    ("group_workout_id", "int64"),
+    ("title", "string"),
+    ("start_date", "timestamp"),
+    ("created_at", "timestamp"),
+    ("source", "string"),  # "planned" or "performed"
+    ("exercise", "string"),
+    ("set", "int64"),
+    ("reps", "int64"),
+    ("weight", "float64"),
+    ("rest_sec", "int64"),
+)
+
+TEST_COLUMNS = (
+    ("test_id", "int64"),
+    ("user_id", "int64"),
+    ("group_test_id", "int64"),
+    ("title", "string"),
+    ("taken_at", "timestamp"),
+    ("created_at", "timestamp"),
+    ("parameter", "string"),
+    ("metric", "string"),
+    ("value", "float64"),
+    ("unit", "string"),
+)
+
+# Athletes of a team, as a subquery
+def _team_athletes(team_id: int):
+    return select(UserTeams.user_id).where(UserTeams.team_id == team_id, UserTeams.role == RoleEnum.athlete)
+
+def _workouts_query(team_id: int):
+    return (
+        select(
+            Workout.id, Workout.user_id, Workout.group_workout_id, Workout.title,
+            Workout.start_date, Workout.created_at, Workout.exercises, Workout.results,
+        )
+        .where(Workout.user_id.in_(_team_athletes(team_id)))
+        .order_by(Workout.user_id, Workout.id)
+    )
+
+def _tests_query(team_id: int):
+    return (
+        select(
+            Test.id, Test.user_id, Test.group_test_id, Test.title,
+            Test.taken_at, Test.created_at, Test.parameters, Test.results,
+        )
+        .where(Test.user_id.in_(_team_athletes(team_id)))
+        .order_by(Test.user_id, Test.id)
+    )
+
+# One row per planned and per performed set, a workout without sets still gets one row
+def _flatten_workout(row) -> List[tuple]:
+    workout_id, user_id, group_workout_id, title, start_date, created_at, exercises, results = row
+    head = (workout_id, user_id, group_workout_id, title, start_date, created_at)
+    out = []
+    for source, items in (("planned", exercises), ("performed", results)):
+        for exercise in items or []:
+            name = exercise.get("name")
+            for entry in exercise.get("sets") or []:
+                out.append(head + (source, name, entry.get("set"), entry.get("reps"), entry.get("weight"), entry.get("rest_sec")))
+    return out or [head + (None,) * 6]
+
+# One row per recorded result, a test without results still gets one row
+def _flatten_test(row) -> List[tuple]:
+    test_id, user_id, group_test_id, title, taken_at, created_at, parameters, results = row
+    head = (test_id, user_id, group_test_id, title, taken_at, created_at)
+    out = [
+        head + (parameter or None, result.get("type"), result.get("value"), result.get("unit"))
+        for parameter, result in result_keys(parameters, results)
+    ]
+    return out or [head + (None,) * 4]
+
+EXPORTS = {
+    "workouts": (_workouts_query, _flatten_workout, WORKOUT_COLUMNS),
+    "tests": (_tests_query, _flatten_test, TEST_COLUMNS),
+}
+
+# Row counters of a running export
+class ExportStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.source_rows = 0
+        self.rows = 0
+
+    @property
+    def seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        seconds = self.seconds
+        return self.rows / seconds if seconds > 0 else 0.0
+
+# Flattened rows of the team in batches, read through a server-side cursor
+def iter_batches(db: Session, team_id: int, kind: str, stats: ExportStats, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[tuple]]:
+    build_query, flatten, _ = EXPORTS[kind]
+    result = db.execute(build_query(team_id).execution_options(stream_results=True, yield_per=batch_size))
+    for partition in result.partitions():
+        out = []
+        for row in partition:
+            out.extend(flatten(row))
+        stats.source_rows += len(partition)
+        stats.rows += len(out)
+        yield out
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _write_csv(batches: Iterator[List[tuple]], columns) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for batch in batches:
+        writer.writerows([_csv_value(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+# Write-only file object collecting what pyarrow writes until it is drained
+class _ChunkSink:
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _write_parquet(batches: Iterator[List[tuple]], columns) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"int64": pa.int64(), "float64": pa.float64(), "string": pa.string(), "timestamp": pa.timestamp("us")}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            if batch:
+                arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*batch), schema)]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+WRITERS = {"csv": _write_csv, "parquet": _write_parquet}
+
+MEDIA_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+# Stream an export as bytes in its own session, since it outlives the request's dependencies.
+# The session is read-only, so the export runs on a replica when one is configured.
+def stream_export(team_id: int, kind: str, fmt: str, batch_size: int = EXPORT_BATCH_SIZE, on_done: Optional[Callable[[ExportStats], None]] = None) -> Iterator[bytes]:
+    stats = ExportStats()
+    db = SessionLocal(read_only=True)
+    try:
+        yield from WRITERS[fmt](iter_batches(db, team_id, kind, stats, batch_size), EXPORTS[kind][2])
+    finally:
+        db.close()
+        logger.info(
+            "export team=%s kind=%s format=%s: %d rows from %d %s in %.2fs (%.0f rows/s)",
+            team_id, kind, fmt, stats.rows, stats.source_rows, kind, stats.seconds, stats.rows_per_second,
+        )
+        if on_done is not None:
+            on_done(stats)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a team's workouts or tests")
+    parser.add_argument("--team-id", type=int, required=True)
+    parser.add_argument("--kind", choices=sorted(EXPORTS), default="workouts")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="csv", dest="fmt")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    parser.add_argument("-o", "--output", help="output file, defaults to stdout")
+    args = parser.parse_args()
+
+    report: List[ExportStats] = []
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in stream_export(args.team_id, args.kind, args.fmt, args.batch_size, report.append):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+    stats = report[0]
+    print(
+        f"Exported {stats.rows} rows from {stats.source_rows} {args.kind} in {stats.seconds:.2f}s "
+        f"({stats.rows_per_second:.0f} rows/s)",
+        file=sys.stderr,
+    )
+
+if __name__ == "__main__":
+    main()
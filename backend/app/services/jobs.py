@@ -0,0 +1,58 @@
+# In-process registry of background jobs with progress reporting.
+# Jobs run in the worker that accepted the request, so their status is only visible there.
+
+import threading
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Dict, Optional
+
+_MAX_FINISHED_JOBS = 1000
+
+@dataclass
+class Job:
+    kind: str
+    total: int
+    group_id: Optional[int] = None  # group the job acts on, only its managers may read it
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "pending"  # pending, running, completed, failed
+    done: int = 0
+    created: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+class JobRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+
+    def create(self, kind: str, total: int, group_id: Optional[int] = None) -> Job:
+        job = Job(kind=kind, total=total, group_id=group_id)
+        with self._lock:
+            finished = [j for j in self._jobs.values() if j.finished_at is not None]
+            for old in sorted(finished, key=lambda j: j.finished_at)[: max(0, len(finished) - _MAX_FINISHED_JOBS + 1)]:
+                self._jobs.pop(old.id, None)
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def progress(self, job: Job, done: int, created: int):
+        with self._lock:
+            job.status = "running"
+            job.done += done
+            job.created += created
+
+    def finish(self, job: Job, error: Optional[str] = None):
+        with self._lock:
+            job.status = "failed" if error else "completed"
+            job.error = error
+            job.finished_at = datetime.now()
+
+jobs = JobRegistry()
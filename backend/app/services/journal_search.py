@@ -0,0 +1,244 @@
+# Full-text search over a user's journal entries.
+#
+# On Postgres, journal_entries.search_vector is a stored generated column
+# (to_tsvector('english', entry)) with a GIN index, added by migration 0002. The database
+# maintains it on every insert/update, so searches are an index lookup plus ts_rank_cd on the
+# matches. The column is not mapped on JournalEntry and is referenced by name here.
+#
+# Other databases (SQLite test runs) use a process-local inverted index per user, built from the
+# user's entries on their first search and updated by index_entry() on write. It tokenizes on
+# word characters and drops English stop words but does not stem, and it is ranked with BM25, so
+# ranks are comparable within one backend only. Like the leaderboards it only sees writes served
+# by its own process.
+#
+# Results are ordered by rank (or by recency) and paginated with a keyset cursor, every query is
+# scoped to one user_id.
+
+import math
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import Double, cast, func, literal_column, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.models import JournalEntry
+from app.pagination import paginate, decode_cursor, encode_cursor, decode_score_cursor, encode_score_cursor
+
+# Text search configuration, must match the generated column of migration 0002
+SEARCH_CONFIG = "english"
+
+_search_vector = literal_column("journal_entries.search_vector")
+
+# Same projection for both backends, rows expose id/user_id/entry/created_at/rank
+@dataclass
+class SearchHit:
+    id: int
+    user_id: int
+    entry: str
+    created_at: datetime
+    rank: float
+
+def _uses_tsvector(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+# Ranked search on the tsvector column, websearch syntax ("quoted phrase", -excluded, or)
+def _search_postgres(db: Session, user_id: int, q: str, order: str, cursor, limit, since, until) -> dict:
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    # double precision so the rank written into the cursor compares exactly on the next page
+    rank = cast(func.ts_rank_cd(_search_vector, tsquery), Double)
+    query = select(
+        JournalEntry.id,
+        JournalEntry.user_id,
+        JournalEntry.entry,
+        JournalEntry.created_at,
+        rank.label("rank"),
+    ).where(JournalEntry.user_id == user_id, _search_vector.op("@@")(tsquery))
+
+    if order == "recent":
+        return paginate(db, query, JournalEntry, cursor, limit, since, until, scalars=False)
+
+    if since is not None:
+        query = query.where(JournalEntry.created_at >= since)
+    if until is not None:
+        query = query.where(JournalEntry.created_at < until)
+    if cursor:
+        last_rank, last_id = decode_score_cursor(cursor)
+        query = query.where(tuple_(rank, JournalEntry.id) < tuple_(last_rank, last_id))
+    rows = db.execute(query.order_by(rank.desc(), JournalEntry.id.desc()).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_score_cursor(rows[-1].rank, rows[-1].id)
+    return {"items": rows, "next_cursor": next_cursor}
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from had has have he her his i if in into is it its me my no "
+    "not of on or our she so than that the their them then there these they this to too was we "
+    "were what when which who will with you your".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOP_WORDS]
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+# Inverted index of one user's entries
+@dataclass
+class _UserIndex:
+    postings: Dict[str, Dict[int, int]] = field(default_factory=dict)  # term -> entry id -> term frequency
+    created_at: Dict[int, datetime] = field(default_factory=dict)
+    lengths: Dict[int, int] = field(default_factory=dict)
+    total_length: int = 0
+
+    def add(self, entry_id: int, text: str, created_at: datetime):
+        self.remove(entry_id)
+        tokens = tokenize(text)
+        for token in tokens:
+            frequencies = self.postings.setdefault(token, {})
+            frequencies[entry_id] = frequencies.get(entry_id, 0) + 1
+        self.created_at[entry_id] = created_at
+        self.lengths[entry_id] = len(tokens)
+        self.total_length += len(tokens)
+
+    def remove(self, entry_id: int):
+        if entry_id not in self.lengths:
+            return
+        self.total_length -= self.lengths.pop(entry_id)
+        self.created_at.pop(entry_id, None)
+        for term in [term for term, frequencies in self.postings.items() if entry_id in frequencies]:
+            del self.postings[term][entry_id]
+            if not self.postings[term]:
+                del self.postings[term]
+
+    # Entries containing every term, intersecting the shortest posting lists first
+    def matches(self, terms: List[str]) -> Set[int]:
+        lists = sorted((self.postings.get(term, {}) for term in terms), key=len)
+        if not lists or not lists[0]:
+            return set()
+        found = set(lists[0])
+        for frequencies in lists[1:]:
+            found &= frequencies.keys()
+            if not found:
+                break
+        return found
+
+    def score(self, entry_id: int, terms: List[str]) -> float:
+        n = len(self.lengths)
+        average = self.total_length / n if n else 0.0
+        length = self.lengths[entry_id]
+        total = 0.0
+        for term in terms:
+            frequencies = self.postings[term]
+            tf = frequencies[entry_id]
+            idf = math.log(1.0 + (n - len(frequencies) + 0.5) / (len(frequencies) + 0.5))
+            norm = _K1 * (1.0 - _B + _B * length / average) if average else _K1
+            total += idf * tf * (_K1 + 1.0) / (tf + norm)
+        return total
+
+# Per-user inverted indexes for databases without tsvector support
+class JournalIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._users: Dict[int, _UserIndex] = {}
+
+    def _load(self, db: Session, user_id: int) -> _UserIndex:
+        index = _UserIndex()
+        rows = db.execute(
+            select(JournalEntry.id, JournalEntry.entry, JournalEntry.created_at).where(JournalEntry.user_id == user_id)
+        )
+        for entry_id, text, created_at in rows:
+            index.add(entry_id, text or "", created_at)
+        return index
+
+    def for_user(self, db: Session, user_id: int) -> _UserIndex:
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is None:
+                index = self._users[user_id] = self._load(db, user_id)
+            return index
+
+    # Write hook, users whose index is not loaded yet pick the entry up when it is built
+    def add(self, entry: JournalEntry):
+        with self._lock:
+            index = self._users.get(entry.user_id)
+            if index is not None:
+                index.add(entry.id, entry.entry or "", entry.created_at)
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    # Ordered (sort key, entry id, rank) of one page plus the cursor of the next one
+    def search(self, db: Session, user_id: int, q: str, order: str, cursor, limit, since, until) -> tuple:
+        terms = sorted(set(tokenize(q)))
+        if not terms:
+            return [], None
+        with self._lock:
+            index = self.for_user(db, user_id)
+            hits = []
+            for entry_id in index.matches(terms):
+                created_at = index.created_at[entry_id]
+                if (since is not None and created_at < since) or (until is not None and created_at >= until):
+                    continue
+                rank = index.score(entry_id, terms)
+                hits.append(((rank if order == "rank" else created_at), entry_id, rank))
+
+        if cursor:
+            last = decode_score_cursor(cursor) if order == "rank" else decode_cursor(cursor)
+            hits = [hit for hit in hits if (hit[0], hit[1]) < last]
+        hits.sort(key=lambda hit: (hit[0], hit[1]), reverse=True)
+
+        next_cursor = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            key, entry_id, _ = hits[-1]
+            next_cursor = encode_score_cursor(key, entry_id) if order == "rank" else encode_cursor(key, entry_id)
+        return hits, next_cursor
+
+journal_index = JournalIndex()
+
+def _search_index(db: Session, user_id: int, q: str, order: str, cursor, limit, since, until) -> dict:
+    hits, next_cursor = journal_index.search(db, user_id, q, order, cursor, limit, since, until)
+    if not hits:
+        return {"items": [], "next_cursor": None}
+    rows = db.execute(
+        select(JournalEntry.id, JournalEntry.entry, JournalEntry.created_at).where(
+            JournalEntry.user_id == user_id,
+            JournalEntry.id.in_([entry_id for _, entry_id, _ in hits]),
+        )
+    )
+    found = {entry_id: (text, created_at) for entry_id, text, created_at in rows}
+    items = [
+        SearchHit(id=entry_id, user_id=user_id, entry=found[entry_id][0], created_at=found[entry_id][1], rank=rank)
+        for _, entry_id, rank in hits
+        if entry_id in found
+    ]
+    return {"items": items, "next_cursor": next_cursor}
+
+# One page of the user's entries matching q, ordered by rank ("rank") or newest first ("recent")
+def search_journal(
+    db: Session,
+    user_id: int,
+    q: str,
+    order: str = "rank",
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> dict:
+    if _uses_tsvector(db):
+        return _search_postgres(db, user_id, q, order, cursor, limit, since, until)
+    return _search_index(db, user_id, q, order, cursor, limit, since, until)
+
+# Keep the in-process index current after an entry is written, a no-op on Postgres where the
+# generated column is maintained by the database
+def index_entry(entry: JournalEntry):
+    journal_index.add(entry)
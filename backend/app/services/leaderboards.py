@@ -0,0 +1,236 @@
+# In-memory GroupTest leaderboards.
+#
+# Each (group_test, parameter, metric) pair keeps a sorted list of (sort_value, user_id) with
+# results normalized to canonical units (schemas.test.CANONICAL_UNITS). A group test is loaded
+# from the database once, on first use, and afterwards every recorded result updates the ranking
+# in place, so top-k, rank and percentile queries are binary searches over the list.
+#
+# Test.results is a flat list of MetricResult. A result belongs to the parameter whose metric has
+# the same position in the flattened Test.parameters metrics, falling back to the first unused
+# metric of the same type.
+#
+# Rankings are process-local: each worker builds its own copy and applies the writes it serves
+# itself in place. A loaded group test is rebuilt after LEADERBOARD_TTL_SECONDS, which is how
+# results recorded by other workers show up, and write paths that change a group test's rows in
+# bulk call invalidate_group_test(). A write whose taken_at is older than the athlete's result on
+# the board (a backdated retest) would not win a rebuild either, so it drops the group test
+# instead of being applied. Loading runs outside the registry lock, concurrent requests
+# for the same group test wait for one load instead of each querying.
+
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import LEADERBOARD_TTL_SECONDS
+from app.database import use_primary
+from app.models.models import Test
+from app.schemas.test import MetricTypeEnum, CANONICAL_UNITS, to_canonical
+
+# Metric types where a smaller value ranks higher, everything else ranks larger values first
+LOWER_IS_BETTER = frozenset({MetricTypeEnum.time})
+
+_INF = float("inf")
+
+# Sorted ranking of athletes for one parameter/metric of a group test
+class Leaderboard:
+    def __init__(self, metric_type: MetricTypeEnum):
+        self.metric_type = MetricTypeEnum(metric_type)
+        self._sign = 1.0 if self.metric_type in LOWER_IS_BETTER else -1.0
+        self._entries: List[Tuple[float, int]] = []
+        self._by_user: Dict[int, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Insert or replace the user's canonical value
+    def upsert(self, user_id: int, value: float):
+        self.remove(user_id)
+        key = self._sign * value
+        insort(self._entries, (key, user_id))
+        self._by_user[user_id] = key
+
+    def remove(self, user_id: int):
+        key = self._by_user.pop(user_id, None)
+        if key is None:
+            return
+        index = bisect_left(self._entries, (key, user_id))
+        if index < len(self._entries) and self._entries[index] == (key, user_id):
+            del self._entries[index]
+
+    def _entry(self, key: float, user_id: int, rank: int) -> dict:
+        return {"user_id": user_id, "rank": rank, "value": self._sign * key}
+
+    # First k entries, tied values share the same (competition) rank
+    def top(self, k: int) -> List[dict]:
+        out = []
+        for position, (key, user_id) in enumerate(self._entries[:k]):
+            rank = position + 1 if position == 0 or self._entries[position - 1][0] != key else out[-1]["rank"]
+            out.append(self._entry(key, user_id, rank))
+        return out
+
+    # Rank (1 = best) and percentile rank of a user, None if the user has no result
+    def standing(self, user_id: int) -> Optional[dict]:
+        key = self._by_user.get(user_id)
+        if key is None:
+            return None
+        n = len(self._entries)
+        better = bisect_left(self._entries, (key, -_INF))
+        not_worse = bisect_right(self._entries, (key, _INF))
+        equal = not_worse - better
+        percentile = 100.0 * ((n - not_worse) + 0.5 * equal) / n
+        return {**self._entry(key, user_id, better + 1), "total": n, "percentile": round(percentile, 2)}
+
+# Assign (parameter name, metric type) to every result of a test
+def result_keys(parameters: Optional[list], results: Optional[list]) -> List[Tuple[str, dict]]:
+    slots = [
+        (parameter.get("name") or "", metric.get("type"))
+        for parameter in parameters or []
+        for metric in parameter.get("metrics") or []
+    ]
+    used = set()
+    out = []
+    for position, result in enumerate(results or []):
+        metric_type = result.get("type")
+        index = position if position < len(slots) and slots[position][1] == metric_type and position not in used else None
+        if index is None:
+            index = next((i for i, slot in enumerate(slots) if slot[1] == metric_type and i not in used), None)
+        if index is not None:
+            used.add(index)
+        out.append((slots[index][0] if index is not None else "", result))
+    return out
+
+# Whether a result taken at `taken_at` sorts before one taken at `current` (NULLs first, as in _load)
+def _older(taken_at: Optional[datetime], current: Optional[datetime]) -> bool:
+    if current is None:
+        return False
+    return taken_at is None or taken_at < current
+
+# All leaderboards of loaded group tests, keyed by group_test_id then (parameter, metric)
+class LeaderboardRegistry:
+    def __init__(self, ttl: float = LEADERBOARD_TTL_SECONDS, load_locks: int = 64):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        # group_test_id -> (deadline, boards, taken_at of each athlete's result on the boards)
+        self._boards: Dict[int, Tuple[float, Dict[Tuple[str, MetricTypeEnum], Leaderboard], Dict[int, Optional[datetime]]]] = {}
+        self._generations: Dict[int, int] = {}  # bumped by writes, a load that raced one is not kept
+        self._load_locks = [threading.Lock() for _ in range(load_locks)]
+
+    def _apply(self, boards: dict, user_id: int, parameters: Optional[list], results: Optional[list]):
+        for parameter, result in result_keys(parameters, results):
+            try:
+                metric_type = MetricTypeEnum(result.get("type"))
+                value = to_canonical(metric_type, result.get("value"), result.get("unit"))
+            except (TypeError, ValueError):
+                continue
+            board = boards.get((parameter, metric_type))
+            if board is None:
+                board = boards[(parameter, metric_type)] = Leaderboard(metric_type)
+            board.upsert(user_id, value)
+
+    # Build the leaderboards of a group test from its Test rows, the latest result per athlete wins.
+    # Read from the primary: the result is cached, a lagging replica would be served until the TTL.
+    def _load(self, db: Session, group_test_id: int) -> Tuple[dict, dict]:
+        use_primary(db)
+        boards: Dict[Tuple[str, MetricTypeEnum], Leaderboard] = {}
+        taken: Dict[int, Optional[datetime]] = {}
+        rows = db.execute(
+            select(Test.user_id, Test.taken_at, Test.parameters, Test.results)
+            .where(Test.group_test_id == group_test_id, Test.results.isnot(None))
+            .order_by(Test.taken_at.asc().nullsfirst(), Test.id.asc())
+        )
+        for user_id, taken_at, parameters, results in rows:
+            self._apply(boards, user_id, parameters, results)
+            taken[user_id] = taken_at
+        return boards, taken
+
+    def _cached(self, group_test_id: int) -> Optional[dict]:
+        with self._lock:
+            entry = self._boards.get(group_test_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._boards[group_test_id]
+                return None
+            return entry[1]
+
+    def _store(self, group_test_id: int, generation: int, boards: dict, taken: dict):
+        with self._lock:
+            if self._generations.get(group_test_id, 0) != generation or self.ttl <= 0:
+                return
+            now = time.monotonic()
+            for expired in [gid for gid, entry in self._boards.items() if entry[0] <= now]:
+                del self._boards[expired]
+            self._boards[group_test_id] = (now + self.ttl, boards, taken)
+
+    def boards_for(self, db: Session, group_test_id: int) -> Dict[Tuple[str, MetricTypeEnum], Leaderboard]:
+        boards = self._cached(group_test_id)
+        if boards is not None:
+            return boards
+        with self._load_locks[group_test_id % len(self._load_locks)]:
+            boards = self._cached(group_test_id)
+            if boards is not None:
+                return boards
+            with self._lock:
+                generation = self._generations.get(group_test_id, 0)
+            boards, taken = self._load(db, group_test_id)
+            self._store(group_test_id, generation, boards, taken)
+            return boards
+
+    def _board(self, db: Session, group_test_id: int, parameter: str, metric_type: MetricTypeEnum) -> Optional[Leaderboard]:
+        return self.boards_for(db, group_test_id).get((parameter, MetricTypeEnum(metric_type)))
+
+    # Best k athletes, None if the group test has no such parameter/metric
+    def top(self, db: Session, group_test_id: int, parameter: str, metric_type: MetricTypeEnum, k: int) -> Optional[List[dict]]:
+        board = self._board(db, group_test_id, parameter, metric_type)
+        with self._lock:
+            return board.top(k) if board is not None else None
+
+    # Rank and percentile of one athlete, None if the athlete has no result
+    def standing(self, db: Session, group_test_id: int, parameter: str, metric_type: MetricTypeEnum, user_id: int) -> Optional[dict]:
+        board = self._board(db, group_test_id, parameter, metric_type)
+        with self._lock:
+            return board.standing(user_id) if board is not None else None
+
+    # Write hook, call after a test's results are stored. Unloaded group tests are skipped,
+    # they pick the result up when they are first loaded; a load already running is discarded.
+    def record(self, test: Test):
+        if test.group_test_id is None:
+            return
+        with self._lock:
+            self._generations[test.group_test_id] = self._generations.get(test.group_test_id, 0) + 1
+            entry = self._boards.get(test.group_test_id)
+            if entry is None:
+                return
+            _, boards, taken = entry
+            if test.user_id in taken and _older(test.taken_at, taken[test.user_id]):
+                del self._boards[test.group_test_id]
+                return
+            self._apply(boards, test.user_id, test.parameters, test.results)
+            taken[test.user_id] = test.taken_at
+
+    # Drop a group test's rankings, the next read rebuilds them from the database
+    def invalidate_group_test(self, group_test_id: int):
+        with self._lock:
+            self._generations[group_test_id] = self._generations.get(group_test_id, 0) + 1
+            self._boards.pop(group_test_id, None)
+
+    # Available (parameter, metric, unit, size) combinations of a group test
+    def describe(self, db: Session, group_test_id: int) -> List[dict]:
+        boards = self.boards_for(db, group_test_id)
+        with self._lock:
+            return [
+                {
+                    "parameter": parameter,
+                    "metric": metric_type.value,
+                    "unit": CANONICAL_UNITS.get(metric_type),
+                    "athletes": len(board),
+                }
+                for (parameter, metric_type), board in boards.items()
+            ]
+
+leaderboards = LeaderboardRegistry()
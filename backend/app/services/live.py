@@ -0,0 +1,123 @@
+# Live group-session events: athletes publish completed sets, coaches watch them as they happen
+# instead of polling every athlete's Workout.results.
+#
+# LiveHub is an asyncio pub/sub keyed by group id. It belongs to the worker's event loop and is
+# only called from coroutines, so it needs no locks. Every subscriber (one WebSocket or SSE
+# connection) has a bounded buffer of pending events keyed by (athlete, workout, exercise, set):
+#   - a newer update for a pending key replaces it in place (coalescing), so an athlete editing
+#     a set three times in a second costs the coach one event
+#   - once LIVE_BUFFER_SIZE keys are pending the oldest is dropped and the next batch reports
+#     how many were missed, so the client can refetch instead of the hub queueing without bound
+# Publishing is O(subscribers of the group) dict writes and never waits for a slow connection.
+# A connection's sender wakes on the first pending event, waits LIVE_FLUSH_SECONDS for more and
+# sends everything pending as one frame.
+#
+# The hub is process-local: publishers and subscribers of a group must reach the same worker
+# (route by group id at the load balancer, or run the live routes on a dedicated worker).
+# Events are not stored, athletes still save their results through the workout endpoints.
+
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+from app.config import LIVE_BUFFER_SIZE, LIVE_FLUSH_SECONDS, LIVE_MAX_CONNECTIONS
+
+# Raised when the worker already serves LIVE_MAX_CONNECTIONS subscribers
+class HubFull(Exception):
+    pass
+
+# One connection's view of a group: pending events plus the wake-up for its sender
+class Subscriber:
+    def __init__(self, hub: "LiveHub", group_id: int, user_id: int, limit: int):
+        self.hub = hub
+        self.group_id = group_id
+        self.user_id = user_id
+        self.limit = limit
+        self.pending: "OrderedDict[tuple, dict]" = OrderedDict()
+        self.dropped = 0
+        self._wake = asyncio.Event()
+
+    def offer(self, key: tuple, event: dict):
+        if key in self.pending:
+            self.pending[key] = event
+            self.hub.coalesced += 1
+        else:
+            if len(self.pending) >= self.limit:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+                self.hub.dropped += 1
+            self.pending[key] = event
+        self._wake.set()
+
+    # Everything pending as one batch, waiting up to timeout seconds for the first event.
+    # None when nothing arrived in time (the caller sends a keep-alive).
+    async def next_batch(self, timeout: Optional[float] = None, flush_seconds: float = LIVE_FLUSH_SECONDS) -> Optional[dict]:
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if flush_seconds > 0:
+            await asyncio.sleep(flush_seconds)
+        self._wake.clear()
+        events = list(self.pending.values())
+        self.pending.clear()
+        dropped, self.dropped = self.dropped, 0
+        self.hub.delivered += len(events)
+        return {"type": "batch", "group_id": self.group_id, "events": events, "dropped": dropped}
+
+class LiveHub:
+    def __init__(self, buffer_size: int = LIVE_BUFFER_SIZE, max_connections: int = LIVE_MAX_CONNECTIONS):
+        self.buffer_size = buffer_size
+        self.max_connections = max_connections
+        self._groups: Dict[int, Set[Subscriber]] = {}
+        self.connections = 0
+        self.published = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def subscribe(self, group_id: int, user_id: int) -> Subscriber:
+        if self.connections >= self.max_connections:
+            raise HubFull()
+        subscriber = Subscriber(self, group_id, user_id, self.buffer_size)
+        self._groups.setdefault(group_id, set()).add(subscriber)
+        self.connections += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscribers = self._groups.get(subscriber.group_id)
+        if subscribers is None or subscriber not in subscribers:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._groups[subscriber.group_id]
+        self.connections -= 1
+
+    # Fan a completed set out to the group's subscribers, returns how many were reached
+    def publish_set(self, group_id: int, user_id: int, entry: dict) -> int:
+        event = {
+            "type": "set",
+            "group_id": group_id,
+            "user_id": user_id,
+            **entry,
+            "at": datetime.now().isoformat(),
+        }
+        key = (user_id, entry.get("workout_id"), (entry.get("exercise") or "").strip().lower(), entry.get("set"))
+        self.published += 1
+        subscribers = self._groups.get(group_id, ())
+        for subscriber in subscribers:
+            subscriber.offer(key, event)
+        return len(subscribers)
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "groups": len(self._groups),
+            "published": self.published,
+            "delivered": self.delivered,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+        }
+
+hub = LiveHub()
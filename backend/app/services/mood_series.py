@@ -0,0 +1,238 @@
+# Vectorized mood time series.
+#
+# A user's check-ins are loaded once into a (dimension x check-in) NumPy matrix, NaN where a
+# check-in did not rate a dimension. Check-ins are averaged per day and rolling means/variances
+# are computed from cumulative sums over a trailing window of days. Charts are downsampled with
+# Largest-Triangle-Three-Buckets (LTTB), so a multi-year history is served as a few hundred
+# points that keep its visual shape. Mood is correlated with daily training volume from
+# app.services.training_load.
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.models import MoodCheckIn
+from app.services.training_load import load_set_columns, daily_load
+
+_EPOCH = date(1970, 1, 1)
+_SECONDS_PER_DAY = 86400
+
+# Check-ins of one user, columns ordered by time
+@dataclass
+class MoodSeries:
+    dimensions: List[str]   # row labels of values
+    seconds: np.ndarray     # int64, check-in time as seconds since 1970-01-01
+    values: np.ndarray      # float64 (dimensions x check-ins), NaN where a dimension was not rated
+
+    @property
+    def day(self) -> np.ndarray:
+        return self.seconds // _SECONDS_PER_DAY
+
+    @property
+    def size(self) -> int:
+        return int(self.seconds.size)
+
+# Load the user's check-ins between since and until (dates, inclusive) into a MoodSeries
+def load_mood_series(db: Session, user_id: int, since: Optional[date] = None, until: Optional[date] = None) -> MoodSeries:
+    query = select(MoodCheckIn.created_at, MoodCheckIn.mood).where(MoodCheckIn.user_id == user_id)
+    if since is not None:
+        query = query.where(MoodCheckIn.created_at >= datetime.combine(since, datetime.min.time()))
+    if until is not None:
+        query = query.where(MoodCheckIn.created_at < datetime.combine(until + timedelta(days=1), datetime.min.time()))
+    rows = db.execute(query.order_by(MoodCheckIn.created_at, MoodCheckIn.id)).all()
+
+    dimension_pos: Dict[str, int] = {}
+    cols, dims, values = [], [], []
+    for col, (_, mood) in enumerate(rows):
+        for dimension, value in (mood or {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                cols.append(col)
+                dims.append(dimension_pos.setdefault(dimension, len(dimension_pos)))
+                values.append(value)
+
+    matrix = np.full((len(dimension_pos), len(rows)), np.nan)
+    matrix[np.asarray(dims, dtype=np.int64), np.asarray(cols, dtype=np.int64)] = values
+    seconds = np.array([created_at for created_at, _ in rows], dtype="datetime64[s]").astype(np.int64)
+    return MoodSeries(dimensions=list(dimension_pos), seconds=seconds, values=matrix)
+
+# Per-day sums and counts of every dimension over n_days starting at first_day, NaNs skipped
+def daily_sums(series: MoodSeries, first_day: int, n_days: int) -> tuple:
+    n_dims = len(series.dimensions)
+    offset = series.day - first_day
+    in_range = (offset >= 0) & (offset < n_days)
+    rated = ~np.isnan(series.values[:, in_range])
+    key = (np.arange(n_dims)[:, None] * n_days + offset[in_range][None, :])[rated]
+    values = series.values[:, in_range][rated]
+    size = n_dims * n_days
+    sums = np.bincount(key, weights=values, minlength=size).reshape(n_dims, n_days)
+    squares = np.bincount(key, weights=values * values, minlength=size).reshape(n_dims, n_days)
+    counts = np.bincount(key, minlength=size).reshape(n_dims, n_days).astype(np.float64)
+    return sums, squares, counts
+
+# Trailing-window totals along the last axis
+def _window(totals: np.ndarray, window: int) -> np.ndarray:
+    cumsum = np.cumsum(totals, axis=-1)
+    shifted = np.zeros_like(cumsum)
+    shifted[..., window:] = cumsum[..., :-window]
+    return cumsum - shifted
+
+# Daily means plus trailing `window`-day mean and (population) variance of every check-in in the window
+def rolling_stats(series: MoodSeries, first_day: int, n_days: int, window: int) -> Dict[str, np.ndarray]:
+    sums, squares, counts = daily_sums(series, first_day, n_days)
+    w_sums, w_squares, w_counts = _window(sums, window), _window(squares, window), _window(counts, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily_mean = np.where(counts > 0, sums / counts, np.nan)
+        mean = np.where(w_counts > 0, w_sums / w_counts, np.nan)
+        variance = np.where(w_counts > 1, np.maximum(w_squares / w_counts - mean * mean, 0.0), np.nan)
+    return {"daily_mean": daily_mean, "mean": mean, "variance": variance, "count": counts}
+
+# Indices of the n_out points kept by Largest-Triangle-Three-Buckets, always including both ends.
+# The loop runs once per output point, the area search inside each bucket is vectorized.
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    n = x.size
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:max(n_out, 1)]
+
+    x = x.astype(np.float64) - float(x[0])
+    y = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # n_out - 2 buckets between the ends
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for bucket in range(n_out - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < edges.size:
+            nlo, nhi = edges[bucket + 1], edges[bucket + 2]
+            avg_x = (cx[nhi] - cx[nlo]) / (nhi - nlo)
+            avg_y = (cy[nhi] - cy[nlo]) / (nhi - nlo)
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[bucket + 1] = a
+    return selected
+
+# Pearson correlation of every row of matrix with vector over the days where the row is not NaN
+def masked_pearson(matrix: np.ndarray, vector: np.ndarray) -> tuple:
+    mask = ~np.isnan(matrix)
+    n = mask.sum(axis=1)
+    m = np.where(mask, matrix, 0.0)
+    v = np.where(mask, vector[None, :], 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m_mean = m.sum(axis=1) / n
+        v_mean = v.sum(axis=1) / n
+        dm = np.where(mask, m - m_mean[:, None], 0.0)
+        dv = np.where(mask, v - v_mean[:, None], 0.0)
+        r = (dm * dv).sum(axis=1) / np.sqrt((dm * dm).sum(axis=1) * (dv * dv).sum(axis=1))
+    return np.where(n > 2, r, np.nan), n
+
+def _day_to_date(day: int) -> date:
+    return _EPOCH + timedelta(days=int(day))
+
+# Round to a JSON-friendly list, NaN/inf become None
+def _floats(values: np.ndarray) -> List[Optional[float]]:
+    out = np.round(values, 3).astype(object)
+    out[~np.isfinite(values)] = None
+    return out.tolist()
+
+def _date_range(series: MoodSeries, since: Optional[date], until: Optional[date]) -> tuple:
+    if until is None:
+        until = _day_to_date(int(series.day.max())) if series.size else date.today()
+    if since is None:
+        since = _day_to_date(int(series.day.min())) if series.size else until
+    return since, until, (since - _EPOCH).days, max(1, (until - since).days + 1)
+
+# Chart data for every mood dimension: raw check-ins and the rolling daily series, both
+# downsampled to at most `points` points
+def mood_chart(
+    db: Session,
+    user_id: int,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    points: int = 300,
+    window: int = 7,
+) -> dict:
+    series = load_mood_series(db, user_id, since, until)
+    since, until, first_day, n_days = _date_range(series, since, until)
+    stats = rolling_stats(series, first_day, n_days, window)
+    days = np.arange(n_days)
+
+    dimensions = {}
+    for pos, dimension in enumerate(series.dimensions):
+        rated = ~np.isnan(series.values[pos])
+        seconds, values = series.seconds[rated], series.values[pos][rated]
+        keep = lttb(seconds, values, points)
+
+        mean = stats["mean"][pos]
+        has_mean = np.isfinite(mean)
+        rolling_keep = days[has_mean][lttb(days[has_mean], mean[has_mean], points)]
+
+        dimensions[dimension] = {
+            "count": int(values.size),
+            "mean": round(float(values.mean()), 3) if values.size else None,
+            "std": round(float(values.std()), 3) if values.size else None,
+            "points": [
+                {"t": t, "value": v}
+                for t, v in zip(seconds[keep].astype("datetime64[s]").tolist(), _floats(values[keep]))
+            ],
+            "rolling": [
+                {"date": _day_to_date(first_day + day), "mean": m, "variance": var}
+                for day, m, var in zip(
+                    rolling_keep.tolist(),
+                    _floats(mean[rolling_keep]),
+                    _floats(stats["variance"][pos][rolling_keep]),
+                )
+            ],
+        }
+
+    return {
+        "since": since,
+        "until": until,
+        "days": n_days,
+        "window": window,
+        "check_ins": series.size,
+        "dimensions": dimensions,
+    }
+
+# Correlation of each mood dimension's daily mean with daily training volume (tonnage, sets).
+# lag=1 compares each day's mood with the previous day's training.
+def mood_training_correlation(
+    db: Session,
+    user_id: int,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    lag: int = 0,
+) -> dict:
+    series = load_mood_series(db, user_id, since, until)
+    since, until, first_day, n_days = _date_range(series, since, until)
+    stats = rolling_stats(series, first_day, n_days, 1)
+
+    load_since = since - timedelta(days=lag)
+    load = daily_load(load_set_columns(db, [user_id], load_since, until), first_day - lag, n_days + lag)
+    # mood on day d lines up with training on day d - lag
+    tonnage = load["tonnage"][0][:n_days]
+    sets = load["sets"][0][:n_days].astype(np.float64)
+
+    mood = stats["daily_mean"]
+    r_tonnage, n = masked_pearson(mood, tonnage)
+    r_sets, _ = masked_pearson(mood, sets)
+    r_tonnage, r_sets = _floats(r_tonnage), _floats(r_sets)
+
+    return {
+        "since": since,
+        "until": until,
+        "lag": lag,
+        "dimensions": {
+            dimension: {"days": int(n[pos]), "tonnage": r_tonnage[pos], "sets": r_sets[pos]}
+            for pos, dimension in enumerate(series.dimensions)
+        },
+    }
@@ -0,0 +1,208 @@
+# Extraction of typed MetricObservation rows from the JSON columns of tests, workouts and mood
+# check-ins.
+#
+# Write paths call the extract_* helpers and replace_observations() in the same transaction as
+# the source row, so the observations table always mirrors the JSON. Existing data is mirrored
+# with the backfill command:
+#
+#   python -m app.services.observations backfill [--batch-size N]
+
+import argparse
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.models import MetricObservation, ObservationSourceEnum, Test, Workout, MoodCheckIn
+from app.schemas.test import MetricTypeEnum, CANONICAL_UNITS, to_canonical
+from app.services.leaderboards import result_keys
+from app.services.workout_data import performed_exercises
+
+MOOD_METRIC = "mood"
+
+def _name(value: Optional[str]) -> str:
+    return (value or "").strip().lower()
+
+# Observations for every performed set of a workout: weight (kg) and reps. Same rule as rollups and
+# training load (workout_data.performed_exercises), so assigned copies only count once results exist.
+def extract_workout(
+    user_id: int,
+    workout_id: int,
+    observed_at: datetime,
+    exercises: Optional[list],
+    results: Optional[list],
+    group_workout_id: Optional[int] = None,
+) -> List[dict]:
+    rows = []
+    for exercise in performed_exercises(results, exercises, group_workout_id):
+        name = _name(exercise.get("name"))
+        for position, entry in enumerate(exercise.get("sets") or [], start=1):
+            set_index = entry.get("set") or position
+            base = {
+                "user_id": user_id,
+                "source": ObservationSourceEnum.workout,
+                "source_id": workout_id,
+                "name": name,
+                "set_index": set_index,
+                "observed_at": observed_at,
+            }
+            if entry.get("reps") is not None:
+                rows.append({**base, "metric_type": MetricTypeEnum.reps.value, "value": float(entry["reps"]), "unit": None})
+            if entry.get("weight") is not None:
+                rows.append({**base, "metric_type": MetricTypeEnum.weight.value, "value": float(entry["weight"]), "unit": "kg"})
+    return rows
+
+# Observations for the results of a test, values converted to canonical units
+def extract_test(user_id: int, test_id: int, observed_at: datetime, parameters: Optional[list], results: Optional[list]) -> List[dict]:
+    rows = []
+    for parameter, result in result_keys(parameters, results):
+        try:
+            metric_type = MetricTypeEnum(result.get("type"))
+            value = to_canonical(metric_type, result.get("value"), result.get("unit"))
+        except (TypeError, ValueError):
+            continue
+        rows.append({
+            "user_id": user_id,
+            "source": ObservationSourceEnum.test,
+            "source_id": test_id,
+            "name": _name(parameter),
+            "metric_type": metric_type.value,
+            "value": value,
+            "unit": CANONICAL_UNITS.get(metric_type),
+            "set_index": None,
+            "observed_at": observed_at,
+        })
+    return rows
+
+# Observations for the numeric dimensions of a mood check-in
+def extract_mood(user_id: int, checkin_id: int, observed_at: datetime, mood: Optional[dict]) -> List[dict]:
+    return [
+        {
+            "user_id": user_id,
+            "source": ObservationSourceEnum.mood,
+            "source_id": checkin_id,
+            "name": _name(dimension),
+            "metric_type": MOOD_METRIC,
+            "value": float(value),
+            "unit": None,
+            "set_index": None,
+            "observed_at": observed_at,
+        }
+        for dimension, value in (mood or {}).items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    ]
+
+# Replace the observations of the given source rows, the caller commits
+def replace_observations(db: Session, source: ObservationSourceEnum, source_ids: Iterable[int], rows: List[dict]):
+    source_ids = list(source_ids)
+    if source_ids:
+        db.execute(
+            delete(MetricObservation).where(
+                MetricObservation.source == source,
+                MetricObservation.source_id.in_(source_ids),
+            )
+        )
+    if rows:
+        # Core insert on the table: one executemany for the whole list. The ORM bulk insert starts a
+        # new statement whenever the set of non-NULL keys changes (unit/set_index), i.e. per row
+        # for workouts, whose reps and weight observations alternate
+        db.execute(insert(MetricObservation.__table__), rows)
+
+# Filtered observations of one user, ordered by time, every filter maps onto a composite index
+def query_observations(
+    db: Session,
+    user_id: int,
+    name: Optional[str] = None,
+    metric_type: Optional[str] = None,
+    source: Optional[ObservationSourceEnum] = None,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 500,
+) -> List[MetricObservation]:
+    query = select(MetricObservation).where(MetricObservation.user_id == user_id)
+    if name is not None:
+        query = query.where(MetricObservation.name == _name(name))
+    if metric_type is not None:
+        query = query.where(MetricObservation.metric_type == metric_type)
+    if source is not None:
+        query = query.where(MetricObservation.source == source)
+    if min_value is not None:
+        query = query.where(MetricObservation.value >= min_value)
+    if max_value is not None:
+        query = query.where(MetricObservation.value <= max_value)
+    if since is not None:
+        query = query.where(MetricObservation.observed_at >= since)
+    if until is not None:
+        query = query.where(MetricObservation.observed_at < until)
+    query = query.order_by(MetricObservation.observed_at.desc(), MetricObservation.id.desc()).limit(limit)
+    return list(db.execute(query).scalars())
+
+# Walk a table in id order and rebuild observations batch by batch, returns rows processed
+def _backfill_table(db: Session, columns: tuple, source: ObservationSourceEnum, extract, batch_size: int) -> int:
+    id_column = columns[0]
+    processed = 0
+    last_id = 0
+    while True:
+        batch = db.execute(select(*columns).where(id_column > last_id).order_by(id_column).limit(batch_size)).all()
+        if not batch:
+            return processed
+        rows = []
+        for row in batch:
+            rows.extend(extract(row))
+        replace_observations(db, source, [row[0] for row in batch], rows)
+        db.commit()
+        processed += len(batch)
+        last_id = batch[-1][0]
+
+# Mirror all existing tests, workouts and mood check-ins into metric_observations
+def backfill(db: Session, batch_size: int = 1000) -> dict:
+    counts = {
+        "workouts": _backfill_table(
+            db,
+            (Workout.id, Workout.user_id, Workout.start_date, Workout.created_at, Workout.exercises, Workout.results, Workout.group_workout_id),
+            ObservationSourceEnum.workout,
+            lambda r: extract_workout(r[1], r[0], r[2] or r[3], r[4], r[5], r[6]),
+            batch_size,
+        ),
+        "tests": _backfill_table(
+            db,
+            (Test.id, Test.user_id, Test.taken_at, Test.created_at, Test.parameters, Test.results),
+            ObservationSourceEnum.test,
+            lambda r: extract_test(r[1], r[0], r[2] or r[3], r[4], r[5]),
+            batch_size,
+        ),
+        "mood_checkins": _backfill_table(
+            db,
+            (MoodCheckIn.id, MoodCheckIn.user_id, MoodCheckIn.created_at, MoodCheckIn.mood),
+            ObservationSourceEnum.mood,
+            lambda r: extract_mood(r[1], r[0], r[2], r[3]),
+            batch_size,
+        ),
+    }
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the metric_observations table")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    backfill_parser = subparsers.add_parser("backfill", help="mirror existing rows into metric_observations")
+    backfill_parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        counts = backfill(db, args.batch_size)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(", ".join(f"{name}: {count}" for name, count in counts.items()))
+    print(f"Backfilled {total} source rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+# Incremental rollup of raw user data into Summary rows.
+#
+# Daily summaries are built from Workout, MoodCheckIn, JournalEntry and Goal rows. Weekly and
+# monthly summaries are re-derived from the daily summaries of the affected periods only, so raw
+# tables are never rescanned. Each user has a watermark (SummaryWatermark.summarized_until) and a
+# run only reads rows with watermark < created_at <= cutoff. The watermark row is locked (SELECT ...
+# FOR UPDATE) for the whole run, so concurrent runs for one user are serialized instead of folding
+# the same rows in twice.
+#
+# Summary columns are strings, each one holds a JSON document of additive counters, e.g.
+#   workout: {"sessions": 2, "sets": 14, "reps": 96, "tonnage": 5320.0, "exercises": {"squat": 5}}
+#   mood:    {"count": 1, "sums": {"energy": 7}, "counts": {"energy": 1}, "avg": {"energy": 7.0}}
+#
+# Goals are counted when they are created; later status changes are not folded back in. The same
+# holds for workouts: sets come from workout_data.performed_exercises, so a copy assigned from a
+# GroupWorkout without results yet counts as no session.
+#
+# Usage: python -m app.services.rollup [--workers N] [--user-id ID ...]
+
+import argparse
+import json
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.config import SUMMARY_LAG_SECONDS, SUMMARY_WORKERS
+from app.database import SessionLocal
+from app.models.models import (
+    User,
+    Workout,
+    MoodCheckIn,
+    JournalEntry,
+    Goal,
+    Summary,
+    SummaryWatermark,
+    PeriodEnum,
+)
+from app.services.workout_data import performed_exercises, iter_sets
+
+_SECTIONS = ("mood", "journal", "workout", "goals", "general")
+
+# Start of the day/week/month that contains moment
+def period_start(moment: datetime, period: PeriodEnum) -> datetime:
+    day = datetime(moment.year, moment.month, moment.day)
+    if period == PeriodEnum.weekly:
+        return day - timedelta(days=day.weekday())
+    if period == PeriodEnum.monthly:
+        return day.replace(day=1)
+    return day
+
+# Start of the period following start
+def period_end(start: datetime, period: PeriodEnum) -> datetime:
+    if period == PeriodEnum.weekly:
+        return start + timedelta(days=7)
+    if period == PeriodEnum.monthly:
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+def _empty_stats() -> Dict[str, dict]:
+    return {section: {} for section in _SECTIONS}
+
+# Add the numeric leaves of b into a, nested dicts are merged recursively and averages are skipped
+def _merge(a: dict, b: dict) -> dict:
+    for key, value in b.items():
+        if key == "avg":
+            continue
+        if isinstance(value, dict):
+            _merge(a.setdefault(key, {}), value)
+        else:
+            a[key] = a.get(key, 0) + value
+    return a
+
+# Recompute derived values after merging counters
+def _finalize(stats: Dict[str, dict]) -> Dict[str, dict]:
+    mood = stats["mood"]
+    if mood.get("counts"):
+        mood["avg"] = {
+            dim: round(mood["sums"][dim] / count, 3) for dim, count in mood["counts"].items() if count
+        }
+    return stats
+
+def _decode(summary: Summary) -> Dict[str, dict]:
+    return {section: json.loads(getattr(summary, section) or "{}") for section in _SECTIONS}
+
+def _encode(summary: Summary, stats: Dict[str, dict]):
+    for section in _SECTIONS:
+        setattr(summary, section, json.dumps(stats[section], sort_keys=True, separators=(",", ":")))
+
+# Read rows created inside (since, until] and fold them into per-day counters
+def _collect_daily(db: Session, user_id: int, since: datetime, until: datetime) -> tuple:
+    days: Dict[datetime, Dict[str, dict]] = defaultdict(_empty_stats)
+    rows_read = 0
+
+    def bucket(moment: Optional[datetime], fallback: datetime) -> Dict[str, dict]:
+        return days[period_start(moment or fallback, PeriodEnum.daily)]
+
+    workouts = db.execute(
+        select(Workout.start_date, Workout.created_at, Workout.exercises, Workout.results, Workout.group_workout_id)
+        .where(Workout.user_id == user_id, Workout.created_at > since, Workout.created_at <= until)
+    )
+    for start_date, created_at, exercises, results, group_workout_id in workouts:
+        rows_read += 1
+        stats = bucket(start_date, created_at)
+        performed = performed_exercises(results, exercises, group_workout_id)
+        workout = {"sessions": 1 if performed else 0, "sets": 0, "reps": 0, "tonnage": 0.0, "exercises": {}}
+        for name, reps, weight in iter_sets(performed):
+            workout["sets"] += 1
+            workout["reps"] += reps
+            workout["tonnage"] += reps * weight
+            workout["exercises"][name] = workout["exercises"].get(name, 0) + 1
+        _merge(stats["workout"], workout)
+        _merge(stats["general"], {"source_rows": 1})
+
+    checkins = db.execute(
+        select(MoodCheckIn.created_at, MoodCheckIn.mood)
+        .where(MoodCheckIn.user_id == user_id, MoodCheckIn.created_at > since, MoodCheckIn.created_at <= until)
+    )
+    for created_at, mood in checkins:
+        rows_read += 1
+        values = {
+            dim: float(v) for dim, v in (mood or {}).items() if isinstance(v, (int, float)) and not isinstance(v, bool)
+        }
+        stats = bucket(created_at, created_at)
+        _merge(stats["mood"], {"count": 1, "sums": values, "counts": {dim: 1 for dim in values}})
+        _merge(stats["general"], {"source_rows": 1})
+
+    entries = db.execute(
+        select(JournalEntry.created_at, JournalEntry.entry)
+        .where(JournalEntry.user_id == user_id, JournalEntry.created_at > since, JournalEntry.created_at <= until)
+    )
+    for created_at, entry in entries:
+        rows_read += 1
+        stats = bucket(created_at, created_at)
+        _merge(stats["journal"], {"entries": 1, "words": len((entry or "").split())})
+        _merge(stats["general"], {"source_rows": 1})
+
+    goals = db.execute(
+        select(Goal.created_at, Goal.status)
+        .where(Goal.user_id == user_id, Goal.created_at > since, Goal.created_at <= until)
+    )
+    for created_at, goal_status in goals:
+        rows_read += 1
+        stats = bucket(created_at, created_at)
+        status_key = getattr(goal_status, "value", goal_status) or "pending"
+        _merge(stats["goals"], {"created": 1, "by_status": {status_key: 1}})
+        _merge(stats["general"], {"source_rows": 1})
+
+    return days, rows_read
+
+# Load existing summaries of one period type keyed by period_start
+def _load_summaries(db: Session, user_id: int, period: PeriodEnum, starts: Iterable[datetime]) -> Dict[datetime, Summary]:
+    starts = list(starts)
+    if not starts:
+        return {}
+    rows = db.execute(
+        select(Summary).where(
+            Summary.user_id == user_id,
+            Summary.period == period,
+            Summary.period_start.in_(starts),
+        )
+    ).scalars()
+    return {row.period_start: row for row in rows}
+
+def _upsert(db: Session, existing: Dict[datetime, Summary], user_id: int, period: PeriodEnum, start: datetime, stats: dict):
+    summary = existing.get(start)
+    if summary is None:
+        summary = Summary(user_id=user_id, period=period, period_start=start)
+        db.add(summary)
+        existing[start] = summary
+    _encode(summary, _finalize(stats))
+
+# Rebuild weekly/monthly summaries that cover the given days from their daily summaries
+def _derive(db: Session, user_id: int, period: PeriodEnum, days: Iterable[datetime]):
+    starts = sorted({period_start(day, period) for day in days})
+    existing = _load_summaries(db, user_id, period, starts)
+    for start in starts:
+        dailies = db.execute(
+            select(Summary).where(
+                Summary.user_id == user_id,
+                Summary.period == PeriodEnum.daily,
+                Summary.period_start >= start,
+                Summary.period_start < period_end(start, period),
+            )
+        ).scalars()
+        stats = _empty_stats()
+        for daily in dailies:
+            _merge(stats, _decode(daily))
+        _upsert(db, existing, user_id, period, start, stats)
+
+# Lock the user's watermark row, creating it at datetime.min first if the user has none yet
+def _lock_watermark(db: Session, user_id: int) -> SummaryWatermark:
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        create = postgresql.insert(SummaryWatermark).on_conflict_do_nothing(index_elements=["user_id"])
+    elif dialect == "sqlite":
+        create = sqlite.insert(SummaryWatermark).on_conflict_do_nothing(index_elements=["user_id"])
+    else:
+        create = None
+    if create is not None:
+        db.execute(create.values(user_id=user_id, summarized_until=datetime.min, updated_at=datetime.now()))
+    elif db.get(SummaryWatermark, user_id) is None:
+        db.add(SummaryWatermark(user_id=user_id, summarized_until=datetime.min))
+        db.flush()
+    return db.scalars(
+        select(SummaryWatermark)
+        .where(SummaryWatermark.user_id == user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).one()
+
+# Roll up one user's new rows and advance the watermark, returns the number of raw rows read
+def rollup_user(db: Session, user_id: int, cutoff: Optional[datetime] = None) -> int:
+    cutoff = cutoff or datetime.now() - timedelta(seconds=SUMMARY_LAG_SECONDS)
+    watermark = _lock_watermark(db, user_id)
+    since = watermark.summarized_until
+    if since >= cutoff:
+        db.commit()
+        return 0
+
+    days, rows_read = _collect_daily(db, user_id, since, cutoff)
+    if days:
+        existing = _load_summaries(db, user_id, PeriodEnum.daily, days.keys())
+        for day, new_stats in days.items():
+            stats = _decode(existing[day]) if day in existing else _empty_stats()
+            _merge(stats, new_stats)
+            stats["general"]["days"] = 1
+            _upsert(db, existing, user_id, PeriodEnum.daily, day, stats)
+        db.flush()
+        _derive(db, user_id, PeriodEnum.weekly, days.keys())
+        _derive(db, user_id, PeriodEnum.monthly, days.keys())
+
+    watermark.summarized_until = cutoff
+    db.commit()
+    return rows_read
+
+def _rollup_user_in_own_session(user_id: int, cutoff: datetime) -> int:
+    db = SessionLocal()
+    try:
+        return rollup_user(db, user_id, cutoff)
+    finally:
+        db.close()
+
+# Roll up every user (or the given ones) in parallel, each worker uses its own session
+def rollup_all(user_ids: Optional[List[int]] = None, workers: int = SUMMARY_WORKERS) -> dict:
+    started = time.perf_counter()
+    cutoff = datetime.now() - timedelta(seconds=SUMMARY_LAG_SECONDS)
+    if user_ids is None:
+        db = SessionLocal()
+        try:
+            user_ids = list(db.execute(select(User.id).order_by(User.id)).scalars())
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        rows = sum(pool.map(lambda uid: _rollup_user_in_own_session(uid, cutoff), user_ids))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "users": len(user_ids),
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll up raw user data into daily/weekly/monthly summaries")
+    parser.add_argument("--workers", type=int, default=SUMMARY_WORKERS, help="number of users processed in parallel")
+    parser.add_argument("--user-id", type=int, action="append", dest="user_ids", help="only roll up these users")
+    args = parser.parse_args()
+
+    report = rollup_all(args.user_ids, args.workers)
+    print(
+        f"Rolled up {report['rows']} rows for {report['users']} users in {report['seconds']}s "
+        f"({report['rows_per_second']} rows/s)"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# Vectorized training-load analytics.
+#
+# Workouts of one or many athletes are flattened once into NumPy column arrays (one element per
+# performed set). Daily tonnage, set volume, estimated 1RM trends and the acute:chronic workload
+# ratio are then computed with bincount/reduceat/cumsum instead of Python loops over JSON.
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.models import Workout
+from app.services.workout_data import performed_exercises, iter_sets
+
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+_EPOCH = date(1970, 1, 1)
+
+# One row per performed set, columns are parallel arrays
+@dataclass
+class SetColumns:
+    user_ids: np.ndarray      # athlete ids, index into with user_idx
+    user_idx: np.ndarray      # int32, position of the athlete in user_ids
+    day: np.ndarray           # int32, days since 1970-01-01
+    exercise_names: List[str] # exercise names, index into with exercise_idx
+    exercise_idx: np.ndarray  # int32, position of the exercise in exercise_names
+    reps: np.ndarray          # float64
+    weight: np.ndarray        # float64, kg
+
+    @property
+    def size(self) -> int:
+        return int(self.day.size)
+
+# Load the workouts of the given athletes and flatten their sets into column arrays
+def load_set_columns(db: Session, user_ids: List[int], since: Optional[date] = None, until: Optional[date] = None) -> SetColumns:
+    query = select(
+        Workout.user_id, Workout.start_date, Workout.created_at, Workout.exercises, Workout.results, Workout.group_workout_id
+    ).where(
+        Workout.user_id.in_(user_ids)
+    )
+    if since is not None:
+        query = query.where(Workout.start_date >= datetime.combine(since, datetime.min.time()))
+    if until is not None:
+        query = query.where(Workout.start_date < datetime.combine(until + timedelta(days=1), datetime.min.time()))
+
+    user_pos = {uid: i for i, uid in enumerate(user_ids)}
+    exercise_pos: Dict[str, int] = {}
+    users, days, exercises, reps, weights = [], [], [], [], []
+    for user_id, start_date, created_at, planned, results, group_workout_id in db.execute(query):
+        moment = start_date or created_at
+        day = (moment.date() - _EPOCH).days
+        upos = user_pos[user_id]
+        for name, set_reps, set_weight in iter_sets(performed_exercises(results, planned, group_workout_id)):
+            users.append(upos)
+            days.append(day)
+            exercises.append(exercise_pos.setdefault(name.strip().lower(), len(exercise_pos)))
+            reps.append(set_reps)
+            weights.append(set_weight)
+
+    return SetColumns(
+        user_ids=np.asarray(user_ids, dtype=np.int64),
+        user_idx=np.asarray(users, dtype=np.int32),
+        day=np.asarray(days, dtype=np.int32),
+        exercise_names=list(exercise_pos),
+        exercise_idx=np.asarray(exercises, dtype=np.int32),
+        reps=np.asarray(reps, dtype=np.float64),
+        weight=np.asarray(weights, dtype=np.float64),
+    )
+
+# Epley estimate of the one-repetition maximum, a single rep is the 1RM itself
+def estimated_1rm(weight: np.ndarray, reps: np.ndarray) -> np.ndarray:
+    return np.where(reps <= 1, weight, weight * (1.0 + reps / 30.0))
+
+# Trailing mean over `window` days along the last axis, shorter at the start of the series
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    cumsum = np.cumsum(values, axis=-1, dtype=np.float64)
+    shifted = np.zeros_like(cumsum)
+    shifted[..., window:] = cumsum[..., :-window]
+    counts = np.minimum(np.arange(1, values.shape[-1] + 1), window)
+    return (cumsum - shifted) / counts
+
+# Dense per-athlete daily tonnage/sets plus rolling loads and the acute:chronic ratio
+def daily_load(columns: SetColumns, first_day: int, n_days: int) -> Dict[str, np.ndarray]:
+    n_users = columns.user_ids.size
+    in_range = (columns.day >= first_day) & (columns.day < first_day + n_days)
+    key = columns.user_idx[in_range].astype(np.int64) * n_days + (columns.day[in_range] - first_day)
+    size = n_users * n_days
+
+    tonnage = np.bincount(key, weights=(columns.reps * columns.weight)[in_range], minlength=size).reshape(n_users, n_days)
+    sets = np.bincount(key, minlength=size).reshape(n_users, n_days)
+    reps = np.bincount(key, weights=columns.reps[in_range], minlength=size).reshape(n_users, n_days)
+
+    acute = rolling_mean(tonnage, ACUTE_DAYS)
+    chronic = rolling_mean(tonnage, CHRONIC_DAYS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        acwr = np.where(chronic > 0, acute / chronic, np.nan)
+
+    return {"tonnage": tonnage, "sets": sets, "reps": reps, "acute": acute, "chronic": chronic, "acwr": acwr}
+
+# Best estimated 1RM per (athlete, exercise, day), returned as sorted parallel arrays
+def e1rm_trend(columns: SetColumns) -> Dict[str, np.ndarray]:
+    lifted = (columns.weight > 0) & (columns.reps > 0)
+    if not lifted.any():
+        empty = np.empty(0, dtype=np.int64)
+        return {"user_idx": empty, "exercise_idx": empty, "day": empty, "e1rm": np.empty(0)}
+
+    n_days_key = np.int64(1 << 20)
+    n_ex = np.int64(max(1, len(columns.exercise_names)))
+    key = (columns.user_idx[lifted].astype(np.int64) * n_ex + columns.exercise_idx[lifted]) * n_days_key + columns.day[lifted]
+    values = estimated_1rm(columns.weight[lifted], columns.reps[lifted])
+
+    order = np.argsort(key, kind="stable")
+    key, values = key[order], values[order]
+    unique_keys, starts = np.unique(key, return_index=True)
+    best = np.maximum.reduceat(values, starts)
+
+    pair, day = np.divmod(unique_keys, n_days_key)
+    user_idx, exercise_idx = np.divmod(pair, n_ex)
+    return {"user_idx": user_idx, "exercise_idx": exercise_idx, "day": day, "e1rm": best}
+
+def _day_to_date(day: int) -> date:
+    return _EPOCH + timedelta(days=int(day))
+
+# Round to a JSON-friendly list, NaN/inf become None
+def _floats(values: np.ndarray) -> List[Optional[float]]:
+    out = np.round(values, 3).astype(object)
+    out[~np.isfinite(values)] = None
+    return out.tolist()
+
+# Compute the per-athlete training-load report for the given athletes and date range. Sets from
+# the CHRONIC_DAYS - 1 days before since are loaded too, so the rolling loads on the first days of
+# the range have their full history; the output is trimmed back to [since, until].
+def training_load_report(db: Session, user_ids: List[int], since: Optional[date] = None, until: Optional[date] = None) -> dict:
+    warmup = CHRONIC_DAYS - 1
+    columns = load_set_columns(db, user_ids, since - timedelta(days=warmup) if since is not None else None, until)
+    if until is None:
+        until = _day_to_date(int(columns.day.max())) if columns.size else date.today()
+    if since is None:
+        since = _day_to_date(int(columns.day.min())) if columns.size else until
+    first_day = (since - _EPOCH).days
+    n_days = max(1, (until - since).days + 1)
+
+    load = {key: values[:, warmup:] for key, values in daily_load(columns, first_day - warmup, n_days + warmup).items()}
+    trend = e1rm_trend(columns)
+    in_range = trend["day"] >= first_day
+    trend = {key: values[in_range] for key, values in trend.items()}
+
+    # trend is sorted by athlete first, so each athlete's points are one contiguous slice
+    bounds = np.searchsorted(trend["user_idx"], np.arange(columns.user_ids.size + 1))
+
+    athletes = []
+    for pos, user_id in enumerate(columns.user_ids.tolist()):
+        part = slice(bounds[pos], bounds[pos + 1])
+        e1rm: Dict[str, list] = {}
+        for ex, day, value in zip(trend["exercise_idx"][part].tolist(), trend["day"][part].tolist(), trend["e1rm"][part].tolist()):
+            e1rm.setdefault(columns.exercise_names[ex], []).append(
+                {"date": _day_to_date(day), "e1rm": round(value, 2)}
+            )
+        athletes.append({
+            "user_id": user_id,
+            "total_tonnage": round(float(load["tonnage"][pos].sum()), 2),
+            "total_sets": int(load["sets"][pos].sum()),
+            "tonnage": _floats(load["tonnage"][pos]),
+            "sets": load["sets"][pos].astype(int).tolist(),
+            "acute_load": _floats(load["acute"][pos]),
+            "chronic_load": _floats(load["chronic"][pos]),
+            "acwr": _floats(load["acwr"][pos]),
+            "e1rm": e1rm,
+        })
+
+    return {"since": since, "until": until, "days": n_days, "athletes": athletes}
@@ -0,0 +1,18 @@
+# Helpers for reading the exercises/results JSON stored on Workout rows
+from typing import Iterator, List, Optional, Tuple
+
+# Performed results when they were recorded. Without results a workout the athlete logged themself
+# counts as planned, a copy assigned from a GroupWorkout (group_workout_id set) counts as not done.
+def performed_exercises(results: Optional[list], exercises: Optional[list], group_workout_id: Optional[int] = None) -> List[dict]:
+    if results:
+        return results
+    if group_workout_id is not None:
+        return []
+    return exercises or []
+
+# Yield (exercise name, reps, weight) for every set, missing weight counts as 0 (bodyweight)
+def iter_sets(exercises: List[dict]) -> Iterator[Tuple[str, int, float]]:
+    for exercise in exercises:
+        name = exercise.get("name") or ""
+        for entry in exercise.get("sets") or []:
+            yield name, int(entry.get("reps") or 0), float(entry.get("weight") or 0.0)
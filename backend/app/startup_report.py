@@ -0,0 +1,83 @@
+# Worker cold-start report: per-module import time of app.main and time to the first served
+# request of a fresh uvicorn process.
+#
+# Usage (from backend/): python -m app.startup_report [--top N] [--skip-server]
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import List, Tuple
+
+# Import app.main in a fresh interpreter with -X importtime, returns (cumulative_us, self_us, module)
+def import_times(module: str = "app.main") -> List[Tuple[int, int, str]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=os.getcwd(),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    rows = []
+    for line in proc.stderr.splitlines():
+        # import time:   self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return rows
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+# Start uvicorn on a free port and poll / until it answers, returns seconds from spawn to response
+def time_to_first_request(app: str = "app.main:app", timeout: float = 30.0) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=os.getcwd(),
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    response.read()
+                return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, OSError):
+                time.sleep(0.01)
+        raise RuntimeError(f"no response within {timeout}s")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time and time to first request of a worker")
+    parser.add_argument("--top", type=int, default=20, help="number of slowest modules to list")
+    parser.add_argument("--skip-server", action="store_true", help="only report import times")
+    args = parser.parse_args()
+
+    rows = import_times()
+    total = next((cumulative for cumulative, _, name in rows if name.strip() == "app.main"), 0)
+    print(f"import app.main: {total / 1000:.1f} ms")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, self_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:>14.1f} {self_us / 1000:>9.1f}  {name.strip()}")
+
+    if not args.skip_server:
+        print(f"time to first request: {time_to_first_request() * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# Test helpers for catching N+1 query regressions.
+#
+#   with assert_max_queries(3):
+#       get_team_roster(db, team_id)
+#
+#   assert_endpoint_queries(client, "GET", f"/teams/{team_id}/roster", max_queries=5, headers=auth)
+
+from contextlib import contextmanager
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Records every statement executed while active, on one engine or, by default, on every engine
+# (primary, read replicas and the async engine's sync core). Replica health probes are skipped.
+class QueryCounter:
+    def __init__(self, engine: Optional[Engine] = None):
+        self.engine = engine if engine is not None else Engine
+        self.statements: List[str] = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if conn.get_execution_options().get("health_check"):
+            return
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+        return False
+
+# Fail if the block runs more than max_queries statements, the message lists the statements
+@contextmanager
+def assert_max_queries(max_queries: int, engine: Optional[Engine] = None):
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count > max_queries:
+        listing = "\n".join(f"  {i}. {sql}" for i, sql in enumerate(counter.statements, start=1))
+        raise AssertionError(f"Expected at most {max_queries} queries, got {counter.count}:\n{listing}")
+
+# Call an endpoint through a test client and enforce its query budget, returns the response
+def assert_endpoint_queries(client, method: str, url: str, max_queries: int, engine: Optional[Engine] = None, **kwargs):
+    with assert_max_queries(max_queries, engine):
+        response = client.request(method, url, **kwargs)
+    return response
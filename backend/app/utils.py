@@ -1,5 +1,9 @@
 # Password hashing and verification utilities
 
+import hashlib
+import hmac
+import secrets
+
 from passlib.context import CryptContext
 
 # CryptContext for password hashing using bcrypt
@@ -31,3 +35,14 @@ def create_access_token(data: Dict[str, Any], expires_minutes: Optional[int] = N
 def decode_access_token(token: str) -> Dict[str, Any]:
     # Raises JWTError on invalid/expired token
     return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+# Refresh token creation and hashing utilities
+
+# New opaque refresh token, 256 random bits
+def new_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+# Stored form of a refresh token. The token is random rather than user-chosen, so a keyed SHA-256
+# is as safe as bcrypt here and turns validation into an indexed lookup
+def hash_refresh_token(token: str) -> str:
+    return hmac.new(SECRET_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()
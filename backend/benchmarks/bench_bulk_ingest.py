@@ -0,0 +1,122 @@
+# Throughput of the bulk NDJSON workout upload (POST /workouts/bulk) against the 50k workouts per
+# minute target.
+#
+# Each upload goes through the real route in-process (FastAPI TestClient, so no network): line
+# parsing and validation, the group_workout_id check and the batched multi-row INSERTs with their
+# change log and metric observations. --linked of the workouts reference a GroupWorkout of the
+# bench user's group, so the template check is exercised too. The bench user's workouts are
+# deleted before and after the run.
+#
+# Run against a migrated database (alembic upgrade head), DATABASE_URL as for the app.
+#
+# Usage (from backend/): python -m benchmarks.bench_bulk_ingest [--workouts 50000] [--uploads 5]
+#   [--exercises 4] [--sets 4] [--linked 0.2]
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+
+from app.database import SessionLocal
+from app.main import app
+from app.models.models import Team, Group, User, UserTeams, GroupWorkout, Workout, RoleEnum
+from app.utils import create_access_token
+
+EMAIL = "bench-bulk@example.com"
+TEAM = "bench-bulk"
+TARGET_PER_MINUTE = 50_000
+
+# Bench athlete in a group with one GroupWorkout, created on first run; returns (user_id, template_id)
+def seed(db) -> tuple:
+    user = db.scalar(select(User).where(User.email == EMAIL))
+    if user is None:
+        user = User(name="bench bulk", email=EMAIL, password_hash="-")
+        team = Team(name=TEAM)
+        db.add_all([user, team])
+        db.flush()
+        group = Group(team_id=team.id, name="bench")
+        db.add(group)
+        db.flush()
+        db.add(UserTeams(user_id=user.id, team_id=team.id, group_id=group.id, role=RoleEnum.athlete))
+        db.add(GroupWorkout(group_id=group.id, title="Template", description="bench", exercises=[]))
+        db.commit()
+    template_id = db.scalar(
+        select(GroupWorkout.id).join(UserTeams, UserTeams.group_id == GroupWorkout.group_id).where(UserTeams.user_id == user.id)
+    )
+    return user.id, template_id
+
+def make_upload(rng: random.Random, n: int, n_exercises: int, n_sets: int, linked: float, template_id: int) -> bytes:
+    start = datetime(2024, 1, 1)
+    lines = []
+    for i in range(n):
+        exercises = [
+            {
+                "name": f"Exercise {rng.randrange(50)}",
+                "sets": [{"set": s, "reps": rng.randint(3, 12), "weight": float(rng.randint(20, 200))} for s in range(1, n_sets + 1)],
+            }
+            for _ in range(n_exercises)
+        ]
+        workout = {
+            "title": f"Session {i}",
+            "description": "bench",
+            "start_date": (start + timedelta(minutes=i)).isoformat(),
+            "exercises": exercises,
+            "results": exercises,
+        }
+        if rng.random() < linked:
+            workout["group_workout_id"] = template_id
+        lines.append(json.dumps(workout))
+    return "\n".join(lines).encode()
+
+def clear(user_id: int):
+    db = SessionLocal()
+    try:
+        db.execute(delete(Workout).where(Workout.user_id == user_id))
+        db.commit()
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workouts", type=int, default=50_000, help="workouts uploaded in total")
+    parser.add_argument("--uploads", type=int, default=5, help="requests the workouts are split over")
+    parser.add_argument("--exercises", type=int, default=4)
+    parser.add_argument("--sets", type=int, default=4)
+    parser.add_argument("--linked", type=float, default=0.2, help="share of workouts referencing a GroupWorkout")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_id, template_id = seed(db)
+    finally:
+        db.close()
+    clear(user_id)
+
+    rng = random.Random(0)
+    per_upload = max(1, args.workouts // args.uploads)
+    bodies = [make_upload(rng, per_upload, args.exercises, args.sets, args.linked, template_id) for _ in range(args.uploads)]
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}", "Content-Type": "application/x-ndjson"}
+
+    inserted = failed = 0
+    try:
+        with TestClient(app) as client:
+            started = time.perf_counter()
+            for body in bodies:
+                result = client.post("/workouts/bulk", content=body, headers=headers).json()
+                inserted += result["inserted"]
+                failed += result["failed"]
+            elapsed = time.perf_counter() - started
+    finally:
+        clear(user_id)
+
+    size = sum(len(body) for body in bodies)
+    per_minute = inserted / elapsed * 60
+    print(f"{inserted} workouts inserted ({failed} failed) from {size / 1e6:.1f} MB in {elapsed:.2f}s")
+    print(f"{per_minute:,.0f} workouts/minute, target {TARGET_PER_MINUTE:,} ({'met' if per_minute >= TARGET_PER_MINUTE else 'missed'})")
+
+if __name__ == "__main__":
+    main()
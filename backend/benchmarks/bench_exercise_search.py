@@ -0,0 +1,146 @@
+# "Which workouts contain exercise X": indexed lookup against the previous Python scan.
+#
+# "scan" reproduces the previous approach: read the exercises JSON of every workout of the user
+# and filter in Python. "indexed" is app.services.exercise_search, which on Postgres filters on
+# the GIN index over exercise_names(exercises) from migration 0004 and only reads the matches.
+# Both walk every match, the indexed path page by page through its keyset cursor.
+#
+# Run against a migrated database (alembic upgrade head). --seed first inserts --workouts
+# synthetic workouts spread over --users bench users, each with --exercises exercises drawn
+# from a vocabulary of --vocabulary names, so "exercise 0" is common and the last name is rare.
+#
+# Usage (from backend/): python -m benchmarks.bench_exercise_search [--seed] [--workouts 1000000] [--users 10]
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, text
+
+from app.database import SessionLocal
+from app.models.models import User, Workout
+from app.services.exercise_search import find_workouts, exercise_history, normalize_names, _names_match
+
+EMAIL = "bench-exercise-{}@example.com"
+SEED_BATCH = 5000
+
+def _exercise(name: str) -> dict:
+    return {"name": name, "sets": [{"set": s, "reps": 5, "weight": 100.0, "rest_sec": 120} for s in range(1, 4)]}
+
+# Zipf-like pick so low-numbered exercises are common and the tail is rare
+def _pick(rng: random.Random, vocabulary: int, count: int) -> list:
+    picked = set()
+    while len(picked) < count:
+        picked.add(min(int(rng.paretovariate(1.0)) - 1, vocabulary - 1))
+    return [f"Exercise {i}" for i in sorted(picked)]
+
+def seed(db, n_workouts: int, n_users: int, n_exercises: int, vocabulary: int) -> list:
+    emails = [EMAIL.format(i) for i in range(n_users)]
+    old_ids = db.scalars(select(User.id).where(User.email.in_(emails))).all()
+    if old_ids:
+        db.execute(delete(Workout).where(Workout.user_id.in_(old_ids)))
+        db.execute(delete(User).where(User.id.in_(old_ids)))
+    user_ids = db.scalars(
+        insert(User).returning(User.id, sort_by_parameter_order=True),
+        [{"name": f"Bench {i}", "email": email, "password_hash": "-"} for i, email in enumerate(emails)],
+    ).all()
+
+    rng = random.Random(42)
+    started = datetime(2020, 1, 1)
+    for offset in range(0, n_workouts, SEED_BATCH):
+        rows = []
+        for i in range(offset, min(offset + SEED_BATCH, n_workouts)):
+            created_at = started + timedelta(minutes=i)
+            exercises = [_exercise(name) for name in _pick(rng, vocabulary, n_exercises)]
+            rows.append({
+                "user_id": user_ids[i % n_users],
+                "title": f"Workout {i}",
+                "description": "Benchmark workout",
+                "start_date": created_at,
+                "exercises": exercises,
+                "results": exercises,
+                "created_at": created_at,
+            })
+        db.execute(insert(Workout), rows)
+        db.commit()
+        print(f"\rseeded {offset + len(rows)}/{n_workouts} workouts", end="", flush=True)
+    print()
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("ANALYZE workouts"))
+        db.commit()
+    return list(user_ids)
+
+# Previous approach: decode every workout of the user and test the names in Python
+def scan(db, user_id: int, names: list) -> list:
+    wanted = set(normalize_names(names))
+    rows = db.execute(select(Workout.id, Workout.exercises).where(Workout.user_id == user_id))
+    return [
+        workout_id
+        for workout_id, exercises in rows
+        if wanted & {(exercise.get("name") or "").strip().lower() for exercise in exercises or []}
+    ]
+
+def indexed(db, user_id: int, names: list, limit: int = 500) -> list:
+    ids, cursor = [], None
+    while True:
+        page = find_workouts(db, user_id, names, "any", cursor, limit)
+        ids.extend(row.id for row in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+def history_page(db, user_id: int, names: list) -> list:
+    return exercise_history(db, user_id, names[0], limit=50)["items"]
+
+def bench(name: str, fn, db, user_id: int, names: list, repeat: int):
+    fn(db, user_id, names)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        found = fn(db, user_id, names)
+    per_call = (time.perf_counter() - started) / repeat
+    print(f"{name:<24} {per_call * 1000:10.1f} ms/query  {len(found):8d} workouts")
+
+def explain(db, user_id: int, names: list):
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    query = select(Workout.id).where(
+        Workout.user_id == user_id, _names_match(db, Workout.exercises, normalize_names(names), "any")
+    )
+    compiled = query.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = db.execute(text(f"EXPLAIN {compiled}")).scalars().all()
+    print("plan: " + "\n      ".join(plan[:6]))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", action="store_true", help="insert the synthetic workouts first")
+    parser.add_argument("--workouts", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--exercises", type=int, default=6)
+    parser.add_argument("--vocabulary", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.seed:
+            user_ids = seed(db, args.workouts, args.users, args.exercises, args.vocabulary)
+        else:
+            user_ids = db.scalars(select(User.id).where(User.email == EMAIL.format(0))).all()
+            if not user_ids:
+                parser.error("no bench users found, run with --seed first")
+        user_id = user_ids[0]
+        total = db.scalar(select(func.count()).select_from(Workout).where(Workout.user_id == user_id))
+        print(f"user {user_id}: {total} workouts, {db.get_bind().dialect.name}")
+
+        for label, names in (("common", ["Exercise 0"]), ("rare", [f"Exercise {args.vocabulary - 1}"])):
+            print(f"-- {label} exercise {names[0]!r}")
+            explain(db, user_id, names)
+            bench("scan (previous)", scan, db, user_id, names, args.repeat)
+            bench("indexed, all pages", indexed, db, user_id, names, args.repeat)
+            bench("history, first page", history_page, db, user_id, names, args.repeat)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Validation cost per 1,000 metric results of a PUT /tests/{id}/results body, before and after the
+# precomputed unit table. Both cases validate the parsed JSON body with TestResult.model_validate,
+# which is what FastAPI does for the route.
+#
+# "before" is the previous TestResult/MetricResult: a field validator on unit that rebuilt the
+# allowed-unit set from the enum on every call. As shipped it read the type with a pydantic v1
+# `values.get` and raised AttributeError for every result with a unit, so here it reads the type
+# from info.data instead; the per-call work is otherwise unchanged.
+# "after" is the current TestResult/MetricResult (model validator + ALLOWED_UNITS).
+#
+# Usage (from backend/): python -m benchmarks.bench_metric_validation [--metrics 1000]
+
+import argparse
+import json
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
+
+from app.schemas.test import METRIC_UNITS, MetricTypeEnum, TestResult
+
+# Previous behaviour, kept here for comparison only
+def _legacy_validate_unit_for_type(metric_type, unit):
+    unit_enum = METRIC_UNITS.get(metric_type)
+    if unit_enum:
+        allowed = {e.value for e in unit_enum}
+        if unit not in allowed:
+            raise ValueError(f"Invalid unit '{unit}' for metric type '{metric_type}'. Allowed: {allowed}")
+    elif unit is not None:
+        raise ValueError(f"Metric type '{metric_type}' should not have a unit")
+    return unit
+
+class LegacyMetricResult(BaseModel):
+    type: MetricTypeEnum
+    value: float = Field(..., ge=0)
+    unit: Optional[str] = None
+
+    @field_validator("unit")
+    @classmethod
+    def validate_unit(cls, v, info: ValidationInfo):
+        metric_type = info.data.get("type")
+        if metric_type is None:
+            return v
+        return _legacy_validate_unit_for_type(metric_type, v)
+
+class LegacyTestResult(BaseModel):
+    taken_at: datetime = Field(default_factory=datetime.now)
+    results: List[LegacyMetricResult]
+
+    @field_validator("results")
+    @classmethod
+    def results_must_have_at_least_one(cls, v):
+        if not v or len(v) < 1:
+            raise ValueError("At least one result is required")
+        return v
+
+_SAMPLES = [
+    {"type": "weight", "value": 100.0, "unit": "kg"},
+    {"type": "distance", "value": 5.0, "unit": "km"},
+    {"type": "time", "value": 1320.0, "unit": "s"},
+    {"type": "reps", "value": 25.0},
+    {"type": "height", "value": 62.0, "unit": "cm"},
+]
+
+def make_payload(n: int) -> bytes:
+    return json.dumps({"results": [_SAMPLES[i % len(_SAMPLES)] for i in range(n)]}).encode()
+
+def bench(name: str, fn, payload: bytes, n_metrics: int, repeat: int):
+    fn(payload)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(payload)
+    per_call = (time.perf_counter() - started) / repeat
+    print(f"{name:<40} {per_call * 1e3 * 1000 / n_metrics:8.3f} ms per 1,000 metrics")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--metrics", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    payload = make_payload(args.metrics)
+    bench("before: field validator, set per call", lambda p: LegacyTestResult.model_validate(json.loads(p)), payload, args.metrics, args.repeat)
+    bench("after: model validator, ALLOWED_UNITS", lambda p: TestResult.model_validate(json.loads(p)), payload, args.metrics, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Micro-benchmark of response serialization for a list of large workouts.
+#
+# Compares FastAPI's default path (validate every row through WorkoutOut with from_attributes,
+# then jsonable_encoder + stdlib json) with the trusted path used by app.serialization
+# (copy columns as is, encode with orjson).
+#
+# Usage (from backend/): python -m benchmarks.bench_serialization [--workouts 50] [--exercises 100]
+
+import argparse
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas.workout import WorkoutOut
+from app.serialization import trusted_dump_many
+
+# Stand-ins for Workout ORM rows with n_exercises exercises of 4 sets each
+def make_workouts(n_workouts: int, n_exercises: int) -> list:
+    exercises = [
+        {
+            "name": f"exercise {e}",
+            "sets": [{"set": s, "reps": 8, "weight": 60.0 + s, "rest_sec": 90, "note": None} for s in range(1, 5)],
+        }
+        for e in range(n_exercises)
+    ]
+    now = datetime.now()
+    return [
+        SimpleNamespace(
+            id=i,
+            user_id=1,
+            group_workout_id=None,
+            title=f"Workout {i}",
+            description="Benchmark workout",
+            start_date=now,
+            end_date=None,
+            exercises=exercises,
+            results=exercises,
+            update_log=None,
+            created_at=now,
+        )
+        for i in range(n_workouts)
+    ]
+
+def default_path(rows) -> bytes:
+    validated = [WorkoutOut.model_validate(row, from_attributes=True) for row in rows]
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+_LIST_ADAPTER = TypeAdapter(list[WorkoutOut])
+
+def adapter_path(rows) -> bytes:
+    return _LIST_ADAPTER.dump_json(_LIST_ADAPTER.validate_python(rows, from_attributes=True))
+
+def trusted_path(rows) -> bytes:
+    return orjson.dumps(trusted_dump_many(rows, WorkoutOut))
+
+def bench(name: str, fn, rows, repeat: int):
+    fn(rows)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = fn(rows)
+    elapsed = time.perf_counter() - started
+    per_call = elapsed / repeat
+    print(f"{name:<28} {per_call * 1000:8.2f} ms/response  {1 / per_call:8.1f} responses/s  {len(body) / 1024:8.0f} KiB")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workouts", type=int, default=50)
+    parser.add_argument("--exercises", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_workouts(args.workouts, args.exercises)
+    print(f"{args.workouts} workouts x {args.exercises} exercises x 4 sets (exercises and results)")
+    bench("validate + jsonable_encoder", default_path, rows, args.repeat)
+    bench("TypeAdapter dump_json", adapter_path, rows, args.repeat)
+    bench("trusted + orjson", trusted_path, rows, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# CPU cost of renewing an access token: password login against /auth/refresh.
+#
+# "login" is what a client re-sending its password costs the server: bcrypt verification plus
+# signing a JWT. "refresh" is the work /auth/refresh does besides its two indexed statements:
+# hashing the presented token with HMAC-SHA256, creating the successor token and signing a JWT.
+# Database time is left out of both.
+#
+# Usage (from backend/): python -m benchmarks.bench_token_renewal [--repeat 20]
+
+import argparse
+import time
+
+from app.utils import (
+    hash_password,
+    verify_password,
+    create_access_token,
+    new_refresh_token,
+    hash_refresh_token,
+)
+
+PASSWORD = "correct horse battery staple"
+
+def login(password_hash: str, token: str) -> str:
+    assert verify_password(PASSWORD, password_hash)
+    return create_access_token({"sub": "1"})
+
+def refresh(password_hash: str, token: str) -> str:
+    hash_refresh_token(token)
+    hash_refresh_token(new_refresh_token())
+    return create_access_token({"sub": "1"})
+
+def bench(name: str, fn, password_hash: str, token: str, repeat: int) -> float:
+    fn(password_hash, token)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(password_hash, token)
+    per_call = (time.perf_counter() - started) / repeat
+    print(f"{name:<10} {per_call * 1000:10.3f} ms/renewal  {1 / per_call:10.0f} renewals/s per core")
+    return per_call
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    password_hash = hash_password(PASSWORD)
+    token = new_refresh_token()
+    slow = bench("login", login, password_hash, token, args.repeat)
+    fast = bench("refresh", refresh, password_hash, token, args.repeat * 100)
+    print(f"refresh is {slow / fast:.0f}x cheaper")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# Load test of the live group-session hub (app.services.live) against one running worker.
+#
+# Seeds a team with --groups groups, each with one coach and --athletes athletes (reused across
+# runs), then opens --subscribers coach connections spread over the groups, --sse of them as
+# server-sent events and the rest as WebSockets, plus one publishing WebSocket per athlete.
+# Every athlete sends a completed set --rate times per second for --duration seconds. Reports the
+# connections held, events sent and received, the hub counters from /metrics and the
+# publish-to-receive latency (each set carries its send time in "note").
+#
+# The worker must use the same DATABASE_URL and JWT_SECRET as this script, and both processes
+# need a file descriptor limit above the connection count, e.g.:
+#   ulimit -n 65536; uvicorn app.main:app --port 8000 --ws-ping-interval 0 --backlog 4096
+#   ulimit -n 65536; python -m benchmarks.load_live_sessions --subscribers 5000
+#
+# Usage (from backend/): python -m benchmarks.load_live_sessions [--url http://127.0.0.1:8000]
+#   [--subscribers 2000] [--sse 500] [--groups 50] [--athletes 10] [--rate 1] [--duration 30]
+
+import argparse
+import asyncio
+import json
+import resource
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+import websockets
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.models import Team, Group, User, UserTeams, RoleEnum
+from app.utils import create_access_token
+
+TEAM = "live-load-test"
+CONNECT_BATCH = 200
+
+def _user(db, email: str) -> User:
+    user = db.scalar(select(User).where(User.email == email))
+    if user is None:
+        user = User(name=email.split("@")[0], email=email, password_hash="-")
+        db.add(user)
+        db.flush()
+    return user
+
+def _member(db, user: User, team: Team, group: Group, role: RoleEnum):
+    exists = db.scalar(
+        select(UserTeams.id).where(UserTeams.user_id == user.id, UserTeams.group_id == group.id, UserTeams.role == role)
+    )
+    if exists is None:
+        db.add(UserTeams(user_id=user.id, team_id=team.id, group_id=group.id, role=role))
+
+# [(group_id, coach_id, [athlete_id, ...])] of the load-test team, created on first run
+def seed(n_groups: int, n_athletes: int) -> list:
+    db = SessionLocal()
+    try:
+        team = db.scalar(select(Team).where(Team.name == TEAM))
+        if team is None:
+            team = Team(name=TEAM)
+            db.add(team)
+            db.flush()
+        layout = []
+        for g in range(n_groups):
+            group = db.scalar(select(Group).where(Group.team_id == team.id, Group.name == f"group {g}"))
+            if group is None:
+                group = Group(team_id=team.id, name=f"group {g}")
+                db.add(group)
+                db.flush()
+            coach = _user(db, f"live-coach-{g}@example.com")
+            _member(db, coach, team, group, RoleEnum.coach)
+            athletes = []
+            for a in range(n_athletes):
+                athlete = _user(db, f"live-athlete-{g}-{a}@example.com")
+                _member(db, athlete, team, group, RoleEnum.athlete)
+                athletes.append(athlete.id)
+            layout.append((group.id, coach.id, athletes))
+        db.commit()
+        return layout
+    finally:
+        db.close()
+
+def _token(user_id: int) -> str:
+    return create_access_token({"sub": str(user_id)}, expires_minutes=24 * 60)
+
+class Stats:
+    def __init__(self):
+        self.connected = 0
+        self.failed = 0
+        self.sent = 0
+        self.received = 0
+        self.frames = 0
+        self.dropped = 0
+        self.latencies = []
+
+    def on_batch(self, batch: dict):
+        now = time.time()
+        self.frames += 1
+        self.dropped += batch.get("dropped", 0)
+        for event in batch["events"]:
+            self.received += 1
+            self.latencies.append(now - float(event["note"]))
+
+async def ws_subscriber(url: str, stats: Stats, stop: asyncio.Event):
+    try:
+        async with websockets.connect(url, max_size=None, ping_interval=None, open_timeout=60) as ws:
+            stats.connected += 1
+            receiver = asyncio.ensure_future(_ws_receive(ws, stats))
+            await stop.wait()
+            receiver.cancel()
+    except (OSError, asyncio.TimeoutError, websockets.WebSocketException):
+        stats.failed += 1
+
+async def _ws_receive(ws, stats: Stats):
+    async for message in ws:
+        stats.on_batch(json.loads(message))
+
+# Minimal SSE client over a raw HTTP/1.1 connection (uvicorn streams with chunked encoding)
+async def sse_subscriber(base: str, path: str, stats: Stats, stop: asyncio.Event):
+    parts = urlsplit(base)
+    try:
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    except OSError:
+        stats.failed += 1
+        return
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nAccept: text/event-stream\r\n\r\n".encode())
+        status = await reader.readline()
+        if b" 200 " not in status:
+            stats.failed += 1
+            return
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        stats.connected += 1
+        reading = asyncio.ensure_future(_sse_receive(reader, stats))
+        await stop.wait()
+        reading.cancel()
+    finally:
+        writer.close()
+
+async def _sse_receive(reader, stats: Stats):
+    buffer = b""
+    while True:
+        size = int((await reader.readline()).strip() or b"0", 16)
+        if size == 0:
+            return
+        buffer += (await reader.readexactly(size + 2))[:-2]
+        *events, buffer = buffer.split(b"\n\n")
+        for event in events:
+            for line in event.split(b"\n"):
+                if line.startswith(b"data: "):
+                    stats.on_batch(json.loads(line[6:]))
+
+async def athlete(url: str, rate: float, stats: Stats, stop: asyncio.Event):
+    try:
+        async with websockets.connect(url, ping_interval=None, open_timeout=60) as ws:
+            stats.connected += 1
+            set_index = 0
+            while not stop.is_set():
+                set_index += 1
+                message = {"exercise": "Squat", "set": set_index, "reps": 5, "weight": 100.0, "note": f"{time.time():.6f}"}
+                await ws.send(json.dumps(message))
+                stats.sent += 1
+                await asyncio.sleep(1.0 / rate)
+    except (OSError, asyncio.TimeoutError, websockets.WebSocketException):
+        stats.failed += 1
+
+def _percentile(values: list, q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def _hub_metrics(base: str) -> dict:
+    with urllib.request.urlopen(f"{base}/metrics", timeout=10) as response:
+        lines = response.read().decode().splitlines()
+    out = {}
+    for line in lines:
+        if line.startswith("live_hub{"):
+            labels, value = line.rsplit(" ", 1)
+            out[labels.split('"')[1]] = float(value)
+    return out
+
+async def run(args, layout: list):
+    base = args.url.rstrip("/")
+    ws_base = "ws" + base[len("http"):]
+    stop, stop_publishing = asyncio.Event(), asyncio.Event()
+    coaches, athletes = Stats(), Stats()
+
+    connections = []
+    for i in range(args.subscribers):
+        group_id, coach_id, _ = layout[i % len(layout)]
+        path = f"/live/groups/{group_id}"
+        if i < args.sse:
+            connections.append(sse_subscriber(base, f"{path}/events?token={_token(coach_id)}", coaches, stop))
+        else:
+            connections.append(ws_subscriber(f"{ws_base}{path}/ws?token={_token(coach_id)}", coaches, stop))
+
+    started = time.perf_counter()
+    tasks = []
+    for offset in range(0, len(connections), CONNECT_BATCH):
+        tasks.extend(asyncio.ensure_future(c) for c in connections[offset:offset + CONNECT_BATCH])
+        await asyncio.sleep(0.05)
+    while coaches.connected + coaches.failed < args.subscribers and time.perf_counter() - started < 120:
+        await asyncio.sleep(0.2)
+    print(f"{coaches.connected} subscribers connected ({coaches.failed} failed) in {time.perf_counter() - started:.1f}s")
+
+    for group_id, _, athlete_ids in layout:
+        for athlete_id in athlete_ids:
+            url = f"{ws_base}/live/groups/{group_id}/ws?token={_token(athlete_id)}"
+            tasks.append(asyncio.ensure_future(athlete(url, args.rate, athletes, stop_publishing)))
+    await asyncio.sleep(args.duration)
+    # let the last batches arrive and read the hub while the subscribers are still connected
+    stop_publishing.set()
+    await asyncio.sleep(1.0)
+    try:
+        hub_stats = {key: int(value) for key, value in _hub_metrics(base).items()}
+    except OSError as exc:
+        hub_stats = f"unavailable: {exc}"
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    per_group = args.subscribers / len(layout)
+    print(f"{athletes.connected} athletes published {athletes.sent} sets ({athletes.failed} failed), "
+          f"~{athletes.sent * per_group:.0f} deliveries expected")
+    print(f"received {coaches.received} events in {coaches.frames} frames, {coaches.dropped} reported dropped")
+    latencies = coaches.latencies
+    print("latency ms: p50 {:.1f}  p95 {:.1f}  p99 {:.1f}  max {:.1f}".format(
+        *(1000 * _percentile(latencies, q) for q in (0.5, 0.95, 0.99, 1.0))
+    ))
+    print("hub:", hub_stats)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--subscribers", type=int, default=2000)
+    parser.add_argument("--sse", type=int, default=500, help="how many of the subscribers use SSE")
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--athletes", type=int, default=10, help="publishing athletes per group")
+    parser.add_argument("--rate", type=float, default=1.0, help="sets per second per athlete")
+    parser.add_argument("--duration", type=float, default=30.0)
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, args.subscribers + args.groups * args.athletes + 1024)
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+    layout = seed(args.groups, args.athletes)
+    asyncio.run(run(args, layout))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""initial schema
+
+Creates exactly the schema the old create_all() call at import time produced, before any of the
+later additions (those start with 0001a). Databases that were created by create_all() are brought
+under Alembic with:
+
+    alembic stamp 0001
+    alembic upgrade head
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+role_enum = sa.Enum("athlete", "coach", name="roleenum")
+period_enum = sa.Enum("daily", "weekly", "monthly", name="periodenum")
+status_enum = sa.Enum("pending", "in_progress", "completed", name="statusenum")
+
+def _id():
+    return sa.Column("id", sa.Integer(), primary_key=True)
+
+def _user_fk(nullable=False):
+    return sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=nullable)
+
+def upgrade():
+    op.create_table(
+        "users",
+        _id(),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("password_hash", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "teams",
+        _id(),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("city", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_teams_id", "teams", ["id"])
+    op.create_index("ix_teams_name", "teams", ["name"], unique=True)
+
+    op.create_table(
+        "groups",
+        _id(),
+        sa.Column("team_id", sa.Integer(), sa.ForeignKey("teams.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.UniqueConstraint("team_id", "name", name="_team_group_name_uc"),
+        sa.UniqueConstraint("id", "team_id", name="uq_group_id_team"),
+    )
+    op.create_index("ix_groups_id", "groups", ["id"])
+    op.create_index("ix_groups_team_id", "groups", ["team_id"])
+
+    op.create_table(
+        "user_teams",
+        _id(),
+        _user_fk(),
+        sa.Column("team_id", sa.Integer(), sa.ForeignKey("teams.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id", ondelete="CASCADE"), nullable=True),
+        sa.Column("role", role_enum, nullable=False),
+        sa.Column("is_team_admin", sa.Boolean()),
+        sa.Column("joined_at", sa.DateTime()),
+        sa.UniqueConstraint("user_id", "group_id", "role", name="uq_user_group_role"),
+        sa.ForeignKeyConstraint(["group_id", "team_id"], ["groups.id", "groups.team_id"], name="fk_group_team"),
+    )
+    op.create_index("ix_user_teams_id", "user_teams", ["id"])
+    op.create_index("ix_user_teams_user_id", "user_teams", ["user_id"])
+    op.create_index("ix_user_teams_team_id", "user_teams", ["team_id"])
+    op.create_index("ix_user_teams_group_id", "user_teams", ["group_id"])
+
+    op.create_table(
+        "group_workouts",
+        _id(),
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL")),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("start_date", sa.DateTime()),
+        sa.Column("end_date", sa.DateTime()),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("exercises", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_group_workouts_id", "group_workouts", ["id"])
+    op.create_index("ix_group_workouts_group_id", "group_workouts", ["group_id"])
+
+    op.create_table(
+        "group_tests",
+        _id(),
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL")),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("instructions", sa.String()),
+        sa.Column("parameters", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_group_tests_id", "group_tests", ["id"])
+    op.create_index("ix_group_tests_group_id", "group_tests", ["group_id"])
+
+    op.create_table(
+        "workouts",
+        _id(),
+        _user_fk(),
+        sa.Column("group_workout_id", sa.Integer(), sa.ForeignKey("group_workouts.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("start_date", sa.DateTime()),
+        sa.Column("end_date", sa.DateTime()),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("exercises", sa.JSON(), nullable=False),
+        sa.Column("results", sa.JSON(), nullable=True),
+        sa.Column("update_log", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_workouts_id", "workouts", ["id"])
+    op.create_index("ix_workouts_user_id", "workouts", ["user_id"])
+    op.create_index("ix_workouts_group_workout_id", "workouts", ["group_workout_id"])
+
+    op.create_table(
+        "tests",
+        _id(),
+        _user_fk(),
+        sa.Column("group_test_id", sa.Integer(), sa.ForeignKey("group_tests.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("instructions", sa.String()),
+        sa.Column("parameters", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("taken_at", sa.DateTime()),
+        sa.Column("results", sa.JSON()),
+    )
+    op.create_index("ix_tests_id", "tests", ["id"])
+    op.create_index("ix_tests_user_id", "tests", ["user_id"])
+    op.create_index("ix_tests_group_test_id", "tests", ["group_test_id"])
+
+    op.create_table(
+        "goals",
+        _id(),
+        _user_fk(),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("start_date", sa.DateTime()),
+        sa.Column("end_date", sa.DateTime()),
+        sa.Column("status", status_enum, nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_goals_id", "goals", ["id"])
+    op.create_index("ix_goals_user_id", "goals", ["user_id"])
+
+    op.create_table(
+        "mood_checkins",
+        _id(),
+        _user_fk(),
+        sa.Column("mood", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_mood_checkins_id", "mood_checkins", ["id"])
+    op.create_index("ix_mood_checkins_user_id", "mood_checkins", ["user_id"])
+
+    op.create_table(
+        "journal_entries",
+        _id(),
+        _user_fk(),
+        sa.Column("entry", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_journal_entries_id", "journal_entries", ["id"])
+    op.create_index("ix_journal_entries_user_id", "journal_entries", ["user_id"])
+
+    op.create_table(
+        "summaries",
+        _id(),
+        _user_fk(),
+        sa.Column("period", period_enum, nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("mood", sa.String(), nullable=False),
+        sa.Column("journal", sa.String(), nullable=False),
+        sa.Column("workout", sa.String(), nullable=False),
+        sa.Column("goals", sa.String(), nullable=False),
+        sa.Column("general", sa.String(), nullable=False),
+    )
+    op.create_index("ix_summaries_id", "summaries", ["id"])
+    op.create_index("ix_summaries_user_id", "summaries", ["user_id"])
+
+def downgrade():
+    for table in (
+        "summaries",
+        "journal_entries",
+        "mood_checkins",
+        "goals",
+        "tests",
+        "workouts",
+        "group_tests",
+        "group_workouts",
+        "user_teams",
+        "groups",
+        "teams",
+        "users",
+    ):
+        op.drop_table(table)
+    bind = op.get_bind()
+    for enum in (status_enum, period_enum, role_enum):
+        enum.drop(bind, checkfirst=True)
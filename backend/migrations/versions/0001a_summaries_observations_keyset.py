@@ -0,0 +1,69 @@
+"""summaries, metric observations and keyset indexes
+
+Schema added on top of the create_all() baseline (0001) before 0002:
+  - summaries.period_start/updated_at and one summary per (user, period, period_start), plus
+    summary_watermarks for the incremental rollup
+  - metric_observations, the typed mirror of the JSON metrics, and its indexes
+  - (user_id, created_at, id) indexes for keyset pagination of workouts, mood and journal
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001a"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+source_enum = sa.Enum("test", "workout", "mood", name="observationsourceenum")
+
+def upgrade():
+    with op.batch_alter_table("summaries") as batch:
+        batch.add_column(sa.Column("period_start", sa.DateTime(), nullable=True))
+        batch.add_column(sa.Column("updated_at", sa.DateTime()))
+        batch.create_unique_constraint("uq_summary_user_period_start", ["user_id", "period", "period_start"])
+
+    op.create_table(
+        "summary_watermarks",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("summarized_until", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+    op.create_table(
+        "metric_observations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("source", source_enum, nullable=False),
+        sa.Column("source_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("metric_type", sa.String(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False),
+        sa.Column("unit", sa.String(), nullable=True),
+        sa.Column("set_index", sa.Integer(), nullable=True),
+        sa.Column("observed_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_observations_user_name_metric_time", "metric_observations", ["user_id", "name", "metric_type", "observed_at"])
+    op.create_index("ix_observations_name_metric_value", "metric_observations", ["name", "metric_type", "value"])
+    op.create_index("ix_observations_user_time", "metric_observations", ["user_id", "observed_at"])
+    op.create_index("ix_observations_source", "metric_observations", ["source", "source_id"])
+
+    op.create_index("ix_workouts_user_created_id", "workouts", ["user_id", "created_at", "id"])
+    op.create_index("ix_mood_checkins_user_created_id", "mood_checkins", ["user_id", "created_at", "id"])
+    op.create_index("ix_journal_entries_user_created_id", "journal_entries", ["user_id", "created_at", "id"])
+
+def downgrade():
+    op.drop_index("ix_journal_entries_user_created_id", table_name="journal_entries")
+    op.drop_index("ix_mood_checkins_user_created_id", table_name="mood_checkins")
+    op.drop_index("ix_workouts_user_created_id", table_name="workouts")
+    op.drop_table("metric_observations")
+    source_enum.drop(op.get_bind(), checkfirst=True)
+    op.drop_table("summary_watermarks")
+    with op.batch_alter_table("summaries") as batch:
+        batch.drop_constraint("uq_summary_user_period_start", type_="unique")
+        batch.drop_column("updated_at")
+        batch.drop_column("period_start")
@@ -0,0 +1,44 @@
+"""journal full-text search
+
+Adds journal_entries.search_vector, a stored generated tsvector column, and its GIN index on
+Postgres. Other databases search through app.services.journal_search's in-process index, so the
+migration is a no-op there. Adding a stored generated column rewrites the table once.
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001a"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.add_column(
+        "journal_entries",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', coalesce(entry, ''))", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_journal_entries_search_vector",
+        "journal_entries",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_journal_entries_search_vector", table_name="journal_entries")
+    op.drop_column("journal_entries", "search_vector")
@@ -0,0 +1,110 @@
+"""append-only workout change log
+
+Moves Workout.update_log (a JSON array rewritten on every logged change) into the
+workout_changes table, one row per entry, then drops the column. The copy streams workouts in
+batches so it does not load the whole table.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+workouts = sa.table(
+    "workouts",
+    sa.column("id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("created_at", sa.DateTime),
+    sa.column("update_log", sa.JSON),
+)
+
+workout_changes = sa.table(
+    "workout_changes",
+    sa.column("id", sa.Integer),
+    sa.column("workout_id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("at", sa.DateTime),
+    sa.column("change", sa.String),
+    sa.column("meta", sa.JSON),
+    sa.column("created_at", sa.DateTime),
+)
+
+def _at(value, fallback):
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return fallback or datetime.now()
+
+def upgrade():
+    op.create_table(
+        "workout_changes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("workout_id", sa.Integer(), sa.ForeignKey("workouts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("at", sa.DateTime(), nullable=False),
+        sa.Column("change", sa.String(), nullable=False),
+        sa.Column("meta", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_workout_changes_workout_created_id", "workout_changes", ["workout_id", "created_at", "id"])
+
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(workouts.c.id, workouts.c.user_id, workouts.c.created_at, workouts.c.update_log)
+            .where(workouts.c.id > last_id, workouts.c.update_log.isnot(None))
+            .order_by(workouts.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        changes = [
+            {
+                "workout_id": workout_id,
+                "user_id": user_id,
+                "at": _at(entry.get("at"), created_at),
+                "change": entry.get("change") or "",
+                "meta": entry.get("meta"),
+                "created_at": created_at,
+            }
+            for workout_id, user_id, created_at, update_log in rows
+            for entry in (update_log or [])
+            if isinstance(entry, dict)
+        ]
+        if changes:
+            bind.execute(workout_changes.insert(), changes)
+        last_id = rows[-1][0]
+
+    with op.batch_alter_table("workouts") as batch:
+        batch.drop_column("update_log")
+
+def downgrade():
+    with op.batch_alter_table("workouts") as batch:
+        batch.add_column(sa.Column("update_log", sa.JSON(), nullable=True))
+
+    bind = op.get_bind()
+    logs = {}
+    for workout_id, at, change, meta in bind.execute(
+        sa.select(workout_changes.c.workout_id, workout_changes.c.at, workout_changes.c.change, workout_changes.c.meta)
+        .order_by(workout_changes.c.workout_id, workout_changes.c.created_at, workout_changes.c.id)
+    ):
+        logs.setdefault(workout_id, []).append({"at": at.isoformat(), "change": change, "meta": meta})
+    for workout_id, update_log in logs.items():
+        bind.execute(workouts.update().where(workouts.c.id == workout_id).values(update_log=update_log))
+
+    op.drop_index("ix_workout_changes_workout_created_id", table_name="workout_changes")
+    op.drop_table("workout_changes")
@@ -0,0 +1,69 @@
+"""JSONB exercises with exercise name indexes
+
+Converts workouts.exercises and group_workouts.exercises from json to jsonb on Postgres and adds
+exercise_names(jsonb), an immutable function returning the distinct lowercased exercise names
+of a list as text[], with a GIN index on exercise_names(exercises) for both tables. Queries in
+app.services.exercise_search must use the same expression to hit the indexes. Other databases
+keep plain JSON and the migration is a no-op there. Changing the column type rewrites both
+tables once under an exclusive lock.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+TABLES = ("workouts", "group_workouts")
+
+CREATE_FUNCTION = """
+CREATE OR REPLACE FUNCTION exercise_names(exercises jsonb) RETURNS text[]
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+AS $$
+    SELECT coalesce(array_agg(DISTINCT lower(btrim(e ->> 'name'))), '{}')
+    FROM jsonb_array_elements(CASE WHEN jsonb_typeof(exercises) = 'array' THEN exercises ELSE '[]' END) AS e
+    WHERE e ->> 'name' IS NOT NULL
+$$
+"""
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(CREATE_FUNCTION)
+    for table in TABLES:
+        op.alter_column(
+            table,
+            "exercises",
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            existing_nullable=False,
+            postgresql_using="exercises::jsonb",
+        )
+        op.create_index(
+            f"ix_{table}_exercise_names",
+            table,
+            [sa.text("exercise_names(exercises)")],
+            postgresql_using="gin",
+        )
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table in TABLES:
+        op.drop_index(f"ix_{table}_exercise_names", table_name=table)
+        op.alter_column(
+            table,
+            "exercises",
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            existing_nullable=False,
+            postgresql_using="exercises::json",
+        )
+    op.execute("DROP FUNCTION IF EXISTS exercise_names(jsonb)")
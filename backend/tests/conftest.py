@@ -0,0 +1,64 @@
+# Shared fixtures: a throwaway SQLite database configured before the app is imported, since
+# app.config reads the environment at import time
+
+import os
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="fitness-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ["DB_MODE"] = "sync"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import Base, SessionLocal, get_engine
+from app.main import app
+from app.models.models import User, Team, Group, UserTeams, RoleEnum
+from app.utils import create_access_token
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    Base.metadata.create_all(get_engine())
+    yield
+    Base.metadata.drop_all(get_engine())
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+def auth_headers(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+# A team with n_groups groups of one coach and n_athletes athletes each, an admin and one member
+# without a group. Returns (team, admin).
+def make_team(db, name: str, n_groups: int, n_athletes: int):
+    team = Team(name=name)
+    admin = User(name=f"{name} admin", email=f"admin@{name}.example.com", password_hash="-")
+    loner = User(name=f"{name} loner", email=f"loner@{name}.example.com", password_hash="-")
+    db.add_all([team, admin, loner])
+    db.flush()
+    db.add(UserTeams(user_id=admin.id, team_id=team.id, role=RoleEnum.coach, is_team_admin=True))
+    db.add(UserTeams(user_id=loner.id, team_id=team.id, role=RoleEnum.athlete))
+    for g in range(n_groups):
+        group = Group(team_id=team.id, name=f"group {g}")
+        coach = User(name=f"coach {g}", email=f"coach{g}@{name}.example.com", password_hash="-")
+        db.add_all([group, coach])
+        db.flush()
+        db.add(UserTeams(user_id=coach.id, team_id=team.id, group_id=group.id, role=RoleEnum.coach))
+        for a in range(n_athletes):
+            athlete = User(name=f"athlete {g}.{a}", email=f"athlete{g}.{a}@{name}.example.com", password_hash="-")
+            db.add(athlete)
+            db.flush()
+            db.add(UserTeams(user_id=athlete.id, team_id=team.id, group_id=group.id, role=RoleEnum.athlete))
+    db.commit()
+    return team, admin
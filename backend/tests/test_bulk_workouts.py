@@ -0,0 +1,44 @@
+# Bulk NDJSON workout upload: group_workout_id must reference a template of one of the uploader's
+# groups, other lines are reported per line and the rest of the upload goes through
+
+import json
+
+from sqlalchemy import func, select
+
+from app.models.models import GroupWorkout, RoleEnum, UserTeams, Workout
+
+from tests.conftest import auth_headers, make_team
+
+EXERCISES = [{"name": "Squat", "sets": [{"set": 1, "reps": 5, "weight": 100.0}]}]
+
+def _template(db, group_id: int) -> int:
+    template = GroupWorkout(group_id=group_id, title="Legs", description="Leg day", exercises=EXERCISES)
+    db.add(template)
+    db.commit()
+    return template.id
+
+def _line(**fields) -> str:
+    return json.dumps({"title": "Legs", "description": "Leg day", "exercises": EXERCISES, **fields})
+
+def test_bulk_rejects_templates_of_other_groups(client, db):
+    team, _ = make_team(db, "bulk-own", n_groups=1, n_athletes=1)
+    other, _ = make_team(db, "bulk-other", n_groups=1, n_athletes=1)
+    athlete_id, group_id = db.execute(
+        select(UserTeams.user_id, UserTeams.group_id)
+        .where(UserTeams.team_id == team.id, UserTeams.role == RoleEnum.athlete, UserTeams.group_id.isnot(None))
+    ).first()
+    other_group_id = db.scalar(
+        select(UserTeams.group_id).where(UserTeams.team_id == other.id, UserTeams.group_id.isnot(None)).limit(1)
+    )
+    own, foreign = _template(db, group_id), _template(db, other_group_id)
+
+    body = "\n".join([_line(group_workout_id=own), _line(group_workout_id=foreign), _line(), _line(group_workout_id=10**9)])
+    response = client.post("/workouts/bulk", content=body, headers=auth_headers(athlete_id))
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["received"], result["inserted"], result["failed"]) == (4, 2, 2)
+    assert [error["line"] for error in result["errors"]] == [2, 4]
+    linked = db.scalars(select(Workout.group_workout_id).where(Workout.user_id == athlete_id)).all()
+    assert sorted(linked, key=lambda gid: gid or 0) == [None, own]
+    assert db.scalar(select(func.count()).select_from(Workout).where(Workout.group_workout_id == foreign)) == 0
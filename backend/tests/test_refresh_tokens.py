@@ -0,0 +1,61 @@
+# Refresh token rotation through POST /auth/refresh: each token is exchanged once, a replayed
+# token is refused and logs its whole family out, expired tokens are refused
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.models.models import RefreshToken, User
+from app.utils import hash_password, hash_refresh_token
+
+PASSWORD = "correct horse battery staple"
+
+def _login(client, db, name: str) -> dict:
+    email = f"{name}@refresh.example.com"
+    db.add(User(name=name, email=email, password_hash=hash_password(PASSWORD)))
+    db.commit()
+    response = client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200
+    return response.json()
+
+def _refresh(client, refresh_token: str):
+    return client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+def test_refresh_rotates_the_token(client, db):
+    tokens = _login(client, db, "rotate")
+    response = _refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    me = client.get("/users/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.status_code == 200
+    assert _refresh(client, rotated["refresh_token"]).status_code == 200
+
+def test_replayed_token_is_rejected(client, db):
+    tokens = _login(client, db, "replay")
+    assert _refresh(client, tokens["refresh_token"]).status_code == 200
+    response = _refresh(client, tokens["refresh_token"])
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+def test_replay_revokes_the_family(client, db):
+    tokens = _login(client, db, "family")
+    successor = _refresh(client, tokens["refresh_token"]).json()["refresh_token"]
+    other_device = _login(client, db, "family-other")
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+    # the legitimate holder of the successor is logged out too, other families are untouched
+    assert _refresh(client, successor).status_code == 401
+    assert _refresh(client, other_device["refresh_token"]).status_code == 200
+
+def test_expired_token_is_rejected(client, db):
+    tokens = _login(client, db, "expired")
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == hash_refresh_token(tokens["refresh_token"]))
+        .values(expires_at=datetime.now() - timedelta(seconds=1))
+    )
+    db.commit()
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+
+def test_unknown_token_is_rejected(client):
+    assert _refresh(client, "not-a-token").status_code == 401
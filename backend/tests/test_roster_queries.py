@@ -0,0 +1,70 @@
+# Query budgets of the team roster: the number of statements must not grow with the number of
+# groups or members (N+1 regression guard for get_team_roster and GET /teams/{id}/roster)
+
+from sqlalchemy import select
+
+from app.crud.teams import get_team_roster
+from app.models.models import RoleEnum, UserTeams
+from app.testing import QueryCounter, assert_endpoint_queries, assert_max_queries
+
+from tests.conftest import auth_headers, make_team
+
+# team, its groups, its memberships joined to their users
+ROSTER_QUERIES = 3
+
+def test_roster_loads_in_fixed_number_of_queries(db):
+    small, _ = make_team(db, "roster-small", n_groups=1, n_athletes=2)
+    large, _ = make_team(db, "roster-large", n_groups=8, n_athletes=25)
+    small_id, large_id = small.id, large.id
+    db.expire_all()
+
+    with assert_max_queries(ROSTER_QUERIES) as small_counter:
+        small_roster = get_team_roster(db, small_id)
+    db.expire_all()
+    with assert_max_queries(ROSTER_QUERIES) as large_counter:
+        large_roster = get_team_roster(db, large_id)
+
+    assert small_counter.count == large_counter.count
+    assert len(small_roster["groups"]) == 1
+    assert len(large_roster["groups"]) == 8
+    assert all(len(group["members"]) == 26 for group in large_roster["groups"])
+    assert len(large_roster["unassigned"]) == 2
+
+def test_roster_unknown_team(db):
+    with assert_max_queries(1):
+        assert get_team_roster(db, 10**9) is None
+
+def test_roster_endpoint_query_budget(client, db):
+    small, small_admin = make_team(db, "endpoint-small", n_groups=1, n_athletes=2)
+    large, large_admin = make_team(db, "endpoint-large", n_groups=8, n_athletes=25)
+
+    counts = []
+    for team, admin, groups in ((small, small_admin, 1), (large, large_admin, 8)):
+        headers = auth_headers(admin.id)
+        # first request warms the identity and membership caches
+        assert client.get(f"/teams/{team.id}/roster", headers=headers).status_code == 200
+        response = assert_endpoint_queries(client, "GET", f"/teams/{team.id}/roster", max_queries=ROSTER_QUERIES + 2, headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()["groups"]) == groups
+        with QueryCounter() as counter:
+            client.get(f"/teams/{team.id}/roster", headers=headers)
+        counts.append(counter.count)
+
+    assert counts[0] == counts[1]
+
+def test_roster_endpoint_hides_other_teams(client, db):
+    team, _ = make_team(db, "private", n_groups=1, n_athletes=1)
+    _, outsider = make_team(db, "outsiders", n_groups=1, n_athletes=1)
+    response = client.get(f"/teams/{team.id}/roster", headers=auth_headers(outsider.id))
+    assert response.status_code == 404
+
+def test_roster_endpoint_is_for_coaches(client, db):
+    team, _ = make_team(db, "coaches-only", n_groups=1, n_athletes=1)
+    athlete_id = db.scalar(
+        select(UserTeams.user_id).where(UserTeams.team_id == team.id, UserTeams.role == RoleEnum.athlete).limit(1)
+    )
+    coach_id = db.scalar(
+        select(UserTeams.user_id).where(UserTeams.team_id == team.id, UserTeams.group_id.isnot(None), UserTeams.role == RoleEnum.coach)
+    )
+    assert client.get(f"/teams/{team.id}/roster", headers=auth_headers(athlete_id)).status_code == 404
+    assert client.get(f"/teams/{team.id}/roster", headers=auth_headers(coach_id)).status_code == 200